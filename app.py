@@ -1,6 +1,6 @@
 import os
 import logging
-from flask import Flask
+from flask import Flask, Request, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate
@@ -14,12 +14,26 @@ class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
+
+class UploadRequest(Request):
+    """Request whose body size limit can be raised for the endpoints of large uploads."""
+
+    # Endpoint -> config key of its limit, instead of MAX_CONTENT_LENGTH
+    UPLOAD_LIMITS = {'main.upload_csv': 'CSV_MAX_CONTENT_LENGTH'}
+
+    @property
+    def max_content_length(self):
+        key = self.UPLOAD_LIMITS.get(self.endpoint)
+        if key and current_app:
+            return current_app.config[key]
+        return super().max_content_length
 login_manager = LoginManager()
 migrate = Migrate()
 
 def create_app():
     # create the app
     app = Flask(__name__)
+    app.request_class = UploadRequest
     app.secret_key = os.environ.get("SESSION_SECRET") or "dev-secret-key-change-in-production"
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1) # needed for url_for to generate with https
 
@@ -32,12 +46,83 @@ def create_app():
     
     # Upload configuration
     app.config['UPLOAD_FOLDER'] = os.path.join(app.instance_path, 'uploads')
-    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB max file size by default
+    # CSV uploads have a limit of their own: large ones are profiled in chunks, see CSV_STREAMING_THRESHOLD
+    app.config['CSV_MAX_CONTENT_LENGTH'] = int(os.environ.get('CSV_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+    
+    # Skill lexicon data file, re-read by running workers when it changes
+    app.config['SKILL_LEXICON_PATH'] = os.environ.get('SKILL_LEXICON_PATH')
+    app.config['SKILL_LEXICON_RELOAD_INTERVAL'] = float(os.environ.get('SKILL_LEXICON_RELOAD_INTERVAL', 30))
+    
+    # Cached keyword sets for repeated job descriptions
+    app.config['JOB_KEYWORD_CACHE_SIZE'] = int(os.environ.get('JOB_KEYWORD_CACHE_SIZE', 512))
+    
+    # Process pool for text extraction and analysis (0 workers runs them inline)
+    app.config['ANALYSIS_POOL_WORKERS'] = int(os.environ.get('ANALYSIS_POOL_WORKERS', 2))
+    app.config['ANALYSIS_TASK_TIMEOUT'] = float(os.environ.get('ANALYSIS_TASK_TIMEOUT', 60))
+    app.config['ANALYSIS_POOL_MAX_PENDING'] = int(os.environ.get('ANALYSIS_POOL_MAX_PENDING', 4))
+    # Pool tasks for report generation, on top of (and never taken from) the upload slots above
+    app.config['ANALYSIS_POOL_BACKGROUND_SLOTS'] = int(os.environ.get('ANALYSIS_POOL_BACKGROUND_SLOTS', 1))
+    
+    # PDF extraction budgets; long PDFs are split across the worker pool when possible
+    app.config['PDF_MAX_PAGES'] = int(os.environ.get('PDF_MAX_PAGES', 50))
+    app.config['PDF_MAX_CHARS'] = int(os.environ.get('PDF_MAX_CHARS', 200000))
+    app.config['PDF_TIME_BUDGET'] = float(os.environ.get('PDF_TIME_BUDGET', 20))
+    app.config['PDF_PARALLEL_MIN_PAGES'] = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 16))
+    app.config['PDF_PAGES_PER_TASK'] = int(os.environ.get('PDF_PAGES_PER_TASK', 8))
+    
+    # Compressed cache of extracted resume text, keyed by file content and parser version
+    app.config['TEXT_CACHE_FOLDER'] = os.environ.get('TEXT_CACHE_FOLDER') or os.path.join(app.instance_path, 'text_cache')
+    app.config['TEXT_CACHE_MAX_BYTES'] = int(os.environ.get('TEXT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    
+    # Per-column binary copies of CSV uploads for the chart API
+    app.config['COLUMN_STORE_FOLDER'] = os.environ.get('COLUMN_STORE_FOLDER') or os.path.join(app.instance_path, 'columns')
+    
+    # CSVs from this size on, too large to load whole, are profiled in chunks with approximate statistics
+    app.config['CSV_STREAMING_THRESHOLD'] = int(os.environ.get('CSV_STREAMING_THRESHOLD', 64 * 1024 * 1024))
+    app.config['CSV_CHUNK_ROWS'] = int(os.environ.get('CSV_CHUNK_ROWS', 100000))
+    # CSV loading: 'default', 'optimized' (categories and downcast integers) or 'pyarrow'
+    app.config['CSV_LOADER_MODE'] = os.environ.get('CSV_LOADER_MODE', 'optimized')
+    app.config['CSV_SAMPLE_ROWS'] = int(os.environ.get('CSV_SAMPLE_ROWS', 10000))
+    
+    # Correlations of CSV uploads: rows sampled, columns with full matrices, top pairs of wider tables
+    app.config['CORRELATION_MAX_ROWS'] = int(os.environ.get('CORRELATION_MAX_ROWS', 10000))
+    app.config['CORRELATION_MAX_COLUMNS'] = int(os.environ.get('CORRELATION_MAX_COLUMNS', 50))
+    app.config['CORRELATION_TOP_PAIRS'] = int(os.environ.get('CORRELATION_TOP_PAIRS', 50))
+    app.config['CORRELATION_CACHE_FOLDER'] = os.environ.get('CORRELATION_CACHE_FOLDER') or os.path.join(app.instance_path, 'correlations')
+    
+    # Generated analysis reports, built in the background after each analysis
+    app.config['REPORTS_FOLDER'] = os.environ.get('REPORTS_FOLDER') or os.path.join(app.instance_path, 'reports')
+    
+    # Bump to invalidate cached result pages, charts and reports (template changes do so automatically)
+    app.config['RESULT_CACHE_VERSION'] = os.environ.get('RESULT_CACHE_VERSION', '1')
+    
+    # Background jobs for async uploads; run `flask run-jobs` for a dedicated worker process
+    app.config['JOB_WORKER_THREADS'] = int(os.environ.get('JOB_WORKER_THREADS', 1))
+    app.config['JOB_POLL_INTERVAL'] = float(os.environ.get('JOB_POLL_INTERVAL', 5))
+    # Running jobs not renewed for this long (their process died) are requeued
+    app.config['JOB_LEASE_SECONDS'] = float(os.environ.get('JOB_LEASE_SECONDS', 300))
+    # Server-sent progress streams hold a web worker each, so they are off by default
+    # (clients poll the job status) and closed after a short time (clients then poll)
+    app.config['JOB_EVENTS_ENABLED'] = os.environ.get('JOB_EVENTS_ENABLED', '0') == '1'
+    app.config['JOB_EVENTS_TIMEOUT'] = float(os.environ.get('JOB_EVENTS_TIMEOUT', 30))
     
     # Ensure upload directory exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     os.makedirs(app.instance_path, exist_ok=True)
 
+    # Analysis services, in this process and in the worker pool
+    from services.config import configure_services, service_settings
+    from services.worker_pool import configure_worker_pool
+    configure_services(app.config)
+    configure_worker_pool(
+        app.config['ANALYSIS_POOL_WORKERS'],
+        app.config['ANALYSIS_TASK_TIMEOUT'],
+        app.config['ANALYSIS_POOL_MAX_PENDING'],
+        service_settings(app.config),
+        app.config['ANALYSIS_POOL_BACKGROUND_SLOTS']
+    )
+
     # Initialize the app with the extension
     db.init_app(app)
     login_manager.init_app(app)
@@ -66,6 +151,20 @@ def create_app():
         app.register_blueprint(main_bp)
         app.register_blueprint(auth_bp, url_prefix='/auth')
         
+        # Background job workers start with the first request a process serves, so jobs
+        # left queued by a restart resume without waiting for a new upload (but CLI
+        # commands and the pre-fork master never run them)
+        from services.job_queue import ensure_job_workers
+        app.before_request(lambda: ensure_job_workers(app))
+        
+        # Register maintenance CLI commands
+        from cli import register_commands
+        register_commands(app)
+        
+        # Links to immutable results carry their version, so they can be cached for good
+        from http_cache import result_version, versioned_url_for
+        app.jinja_env.globals.update(result_version=result_version, versioned_url_for=versioned_url_for)
+        
         # Add number formatting filter for templates
         @app.template_filter('number_format')
         def number_format(value):
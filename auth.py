@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import User
+from services.user_history import activity_counts, csv_history, decode_cursor, resume_history
 from app import db
 
 auth_bp = Blueprint('auth', __name__)
@@ -96,7 +97,12 @@ def logout():
 @auth_bp.route('/profile')
 @login_required
 def profile():
-    return render_template('auth/profile.html')
+    resumes, resumes_next = resume_history(current_user.id, decode_cursor(request.args.get('resumes_before')))
+    csv_uploads, csv_next = csv_history(current_user.id, decode_cursor(request.args.get('csv_before')))
+    return render_template('auth/profile.html',
+                           counts=activity_counts(current_user.id),
+                           resumes=resumes, resumes_next=resumes_next,
+                           csv_uploads=csv_uploads, csv_next=csv_next)
 
 @auth_bp.route('/profile/edit', methods=['GET', 'POST'])
 @login_required
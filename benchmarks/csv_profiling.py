@@ -0,0 +1,119 @@
+"""
+Time to profile wide CSV tables with analyze_csv.
+
+Compares the vectorized numeric statistics in services.csv_analyzer with the
+previous per-column loop (each statistic computed, and checked for NaN, with
+its own pandas call), and checks that both give the same output.
+
+Usage: python benchmarks/csv_profiling.py [rows] [numeric columns]
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import csv_analyzer  # noqa: E402
+
+def legacy_numeric_stats(df: pd.DataFrame, columns: list) -> dict:
+    """Numeric statistics as analyze_csv computed them before vectorization."""
+    results = {}
+    for column in columns:
+        all_null = df[column].isnull().all()
+        results[column] = {
+            'mean': float(round(df[column].mean(), 2)) if not all_null and not pd.isna(df[column].mean()) else None,
+            'median': float(round(df[column].median(), 2)) if not all_null and not pd.isna(df[column].median()) else None,
+            'std': float(round(df[column].std(), 2)) if not all_null and not pd.isna(df[column].std()) else None,
+            'min': float(round(df[column].min(), 2)) if not all_null and not pd.isna(df[column].min()) else None,
+            'max': float(round(df[column].max(), 2)) if not all_null and not pd.isna(df[column].max()) else None,
+            'q25': float(round(df[column].quantile(0.25), 2)) if not all_null and not pd.isna(df[column].quantile(0.25)) else None,
+            'q75': float(round(df[column].quantile(0.75), 2)) if not all_null and not pd.isna(df[column].quantile(0.75)) else None
+        }
+    return results
+
+def legacy_analyze(df: pd.DataFrame) -> dict:
+    """analyze_csv's column loop before vectorization."""
+    columns_info = {}
+    stats = {}
+    for column in df.columns:
+        col_info = {
+            'name': str(column),
+            'type': csv_analyzer._reported_dtype(df[column]),
+            'non_null_count': int(df[column].count()),
+            'null_count': int(df[column].isnull().sum()),
+            'unique_count': int(df[column].nunique())
+        }
+        if pd.api.types.is_numeric_dtype(df[column]):
+            col_info['is_numeric'] = True
+            col_stats = legacy_numeric_stats(df, [column])[column]
+            col_info.update(col_stats)
+            stats[column] = col_stats
+        else:
+            col_info['is_numeric'] = False
+            # Same tie order as analyze_csv, which no longer depends on the column's dtype
+            value_counts = csv_analyzer._value_counts(df[column]).head(10)
+            top_values_dict = {str(k): int(v) for k, v in value_counts.items()}
+            col_info['top_values'] = top_values_dict
+            stats[column] = {
+                'top_values': top_values_dict,
+                'most_common': str(value_counts.index[0]) if len(value_counts) > 0 else None
+            }
+        columns_info[column] = col_info
+    return {'columns_info': columns_info, 'stats': stats}
+
+def make_table(rows: int, numeric_columns: int, text_columns: int = 20) -> pd.DataFrame:
+    """Floats of mixed scales with missing values, small integers, and a few text columns."""
+    rng = np.random.default_rng(0)
+    data = {}
+    for i in range(numeric_columns):
+        if i % 3 == 2:
+            data[f'n{i}'] = rng.integers(0, 1000, rows)
+        else:
+            values = rng.normal(rng.uniform(-1e3, 1e3), rng.uniform(0.01, 1e4), rows)
+            values[rng.random(rows) < 0.1] = np.nan
+            data[f'n{i}'] = values
+    data['empty'] = np.full(rows, np.nan)
+    for i in range(text_columns):
+        data[f't{i}'] = rng.choice([f'value {j}' for j in range(50)], rows)
+    return pd.DataFrame(data)
+
+def best_time(func, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    numeric_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+
+    # Compare the in-memory path, not the chunked profiler used for large files
+    csv_analyzer.configure_csv_analysis(streaming_threshold=2 ** 62)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, 'wide.csv')
+        make_table(rows, numeric_columns).to_csv(file_path, index=False)
+        df = csv_analyzer.load_csv(file_path)
+
+        numeric = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+        legacy = best_time(lambda: legacy_numeric_stats(df, numeric))
+        vectorized = best_time(lambda: csv_analyzer.numeric_column_stats(df, numeric))
+        analysis = csv_analyzer.analyze_csv(file_path)
+        full = best_time(lambda: csv_analyzer.analyze_csv(file_path))
+
+    expected = legacy_analyze(df)
+    identical = (analysis['columns_info'] == expected['columns_info'] and analysis['stats'] == expected['stats'])
+
+    print(f"table: {rows} rows x {len(df.columns)} columns ({len(numeric)} numeric)")
+    print(f"{'per-column numeric stats':<28}{legacy:>10.3f} s")
+    print(f"{'vectorized numeric stats':<28}{vectorized:>10.3f} s")
+    print(f"{'analyze_csv (incl. parsing)':<28}{full:>10.3f} s")
+    print(f"identical output: {identical}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-document latency of resume language detection.
+
+Compares the script-histogram classifier in services.language_detector with
+the previous approach of running langdetect on the full normalized text.
+
+Usage: python benchmarks/language_detection.py [documents per language]
+"""
+import os
+import re
+import sys
+import time
+import random
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.language_detector import LANGDETECT_AVAILABLE, detect_language, warm_up  # noqa: E402
+from services.text_normalizer import NormalizedDocument  # noqa: E402
+
+if LANGDETECT_AVAILABLE:
+    from langdetect import detect
+
+WORDS = {
+    'en': ('experience education skills project developer engineer manager team delivered designed '
+           'improved performance customers services responsible for building reliable systems').split(),
+    'ru': ('опыт образование навыки проект разработчик инженер менеджер команда внедрил разработал '
+           'улучшил производительность клиентов сервисы отвечал за создание надежных систем').split(),
+    'ka': ('გამოცდილება განათლება უნარები პროექტი დეველოპერი ინჟინერი მენეჯერი გუნდი შევქმენი '
+           'გავაუმჯობესე სისტემები მომხმარებლები სერვისები').split(),
+}
+TECH_TERMS = 'python django docker kubernetes postgresql aws react git linux ci/cd'.split()
+
+def make_resume(language: str, words: int = 800, tech_share: float = 0.15) -> str:
+    """A synthetic resume: words of one language mixed with English tech terms."""
+    rng = random.Random(f"{language}-{words}-{tech_share}")
+    tokens = [rng.choice(TECH_TERMS) if rng.random() < tech_share else rng.choice(WORDS[language])
+              for _ in range(words)]
+    return '\n'.join(' '.join(tokens[i:i + 12]) for i in range(0, len(tokens), 12))
+
+def legacy_detect(document: NormalizedDocument) -> str:
+    """langdetect on the whole text, as before the script pre-classifier."""
+    if LANGDETECT_AVAILABLE:
+        try:
+            detected = detect(document.text)
+            if detected in ('en', 'ru', 'ka'):
+                return detected
+        except Exception:
+            pass
+    counts = {script: len(re.findall(pattern, document.text))
+              for script, pattern in (('latin', '[a-z]'), ('cyrillic', '[а-яё]'), ('georgian', '[ა-ჰ]'))}
+    total = sum(counts.values()) or 1
+    if counts['georgian'] / total > 0.1:
+        return 'ka'
+    if counts['cyrillic'] / total > 0.3:
+        return 'ru'
+    return 'en'
+
+def time_per_document(func, documents, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            func(document)
+        best = min(best, (time.perf_counter() - start) / len(documents))
+    return best
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    warm_up()
+
+    cases = {
+        'en': [make_resume('en', 600 + 20 * i) for i in range(count)],
+        'ru': [make_resume('ru', 600 + 20 * i) for i in range(count)],
+        'ka': [make_resume('ka', 600 + 20 * i) for i in range(count)],
+        'ru, 80% English terms': [make_resume('ru', 600 + 20 * i, tech_share=0.8) for i in range(count)],
+    }
+
+    print(f"{'documents':<24}{'legacy ms/doc':>16}{'new ms/doc':>14}{'speed-up':>10}{'agreement':>11}")
+    for name, texts in cases.items():
+        # Fresh documents per run, so cached properties do not carry over
+        legacy = time_per_document(lambda text: legacy_detect(NormalizedDocument(text)), texts)
+        new = time_per_document(lambda text: detect_language(NormalizedDocument(text)), texts)
+        agreement = statistics.mean(
+            legacy_detect(NormalizedDocument(text)) == detect_language(NormalizedDocument(text)) for text in texts
+        )
+        print(f"{name:<24}{legacy * 1e3:>16.3f}{new * 1e3:>14.3f}{legacy / new:>9.1f}x{agreement:>10.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import click
+from sqlalchemy import inspect, text
+from app import db
+
+def add_missing_columns():
+    """
+    Add columns declared on tables that existed before them (``create_all`` skips those).
+
+    Only nullable columns are added, which is what later versions of a table
+    declare. Returns the added columns as ``table.column``.
+    """
+    inspector = inspect(db.engine)
+    preparer = db.engine.dialect.identifier_preparer
+    added = []
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise click.ClickException(f"Cannot add required column {table.name}.{column.name}")
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+                ))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+def create_missing_indexes():
+    """Create indexes declared on tables that existed before them (``create_all`` skips those)."""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+def upgrade_schema():
+    """Bring a database created by an earlier version up to the models: new tables, columns and indexes."""
+    db.create_all()
+    added = add_missing_columns()
+    create_missing_indexes()
+    return added
+
+def register_commands(app):
+    """Register maintenance commands on the Flask CLI."""
+
+    @app.cli.command('reindex-resumes')
+    @click.option('--all', 'reindex_all', is_flag=True, help='Also re-index resumes that are already indexed.')
+    def reindex_resumes_command(reindex_all):
+        """Build the resume search index for stored resumes."""
+        from services.search_index import reindex_resumes
+        # Databases from before the search index lack resumes.indexed_length
+        upgrade_schema()
+        count = reindex_resumes(only_missing=not reindex_all)
+        click.echo(f"Indexed {count} resumes")
+
+    @app.cli.command('upgrade-db')
+    def upgrade_db_command():
+        """Add the tables, columns and indexes introduced after the database was created."""
+        for column in upgrade_schema():
+            click.echo(f"Added column {column}")
+        click.echo('Database schema is up to date')
+
+    @app.cli.command('backfill-skills')
+    def backfill_skills_command():
+        """Fill the skill and keyword tables for analyses stored before them."""
+        from services.skill_analytics import backfill_analysis_terms
+        upgrade_schema()
+        count = backfill_analysis_terms()
+        click.echo(f"Filled skills and keywords of {count} analyses")
+
+    @app.cli.command('migrate-resume-texts')
+    def migrate_resume_texts_command():
+        """Move resume text into the compressed resume_texts table."""
+        from services.uploads import migrate_resume_texts
+        count = migrate_resume_texts()
+        click.echo(f"Moved the text of {count} resumes")
+
+    @app.cli.command('run-jobs')
+    @click.option('--poll-interval', default=None, type=float, help='Seconds between queue polls.')
+    def run_jobs_command(poll_interval):
+        """Process queued upload jobs until interrupted."""
+        from services.job_queue import work_jobs
+        click.echo('Processing queued jobs, press Ctrl+C to stop')
+        work_jobs(app, poll_interval or app.config['JOB_POLL_INTERVAL'])
@@ -0,0 +1,103 @@
+import os
+import hashlib
+from functools import wraps
+from typing import Optional
+from flask import current_app, request, session, url_for
+
+# Responses at a URL carrying the current version never change: kept for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_template_digest: Optional[str] = None
+
+def _templates_version() -> str:
+    """Digest of the template files, so a deploy with changed templates invalidates cached pages."""
+    global _template_digest
+    if _template_digest is None:
+        digest = hashlib.sha256()
+        template_folder = os.path.join(current_app.root_path, current_app.template_folder or 'templates')
+        for directory, _, filenames in sorted(os.walk(template_folder)):
+            for filename in sorted(filenames):
+                with open(os.path.join(directory, filename), 'rb') as file:
+                    digest.update(filename.encode('utf-8'))
+                    digest.update(file.read())
+        _template_digest = digest.hexdigest()
+    return _template_digest
+
+def result_version(endpoint: str) -> str:
+    """
+    Version token of an immutable result endpoint: the result cache version,
+    template digest and the view's own ``version``. It goes in the ``v`` query
+    parameter of the endpoint's URLs, so the URL changes when the content does.
+    """
+    view = current_app.view_functions[endpoint]
+    parts = [
+        str(current_app.config.get('RESULT_CACHE_VERSION', '1')),
+        _templates_version(),
+        getattr(view, 'result_version', ''),
+    ]
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+def versioned_url_for(endpoint: str, **values) -> str:
+    """``url_for`` of an immutable result endpoint, carrying its current version token."""
+    return url_for(endpoint, v=result_version(endpoint), **values)
+
+def result_etag(per_user: bool = False) -> str:
+    """
+    Strong ETag of an immutable result, computed from the request alone.
+
+    The URL carries the record id (and the chart column or bin count), which
+    with the endpoint's version token identifies the content, so a
+    revalidation is answered without reading the database or any file. Pages
+    that show the signed-in user also depend on the session's user id.
+    """
+    parts = [
+        result_version(request.endpoint),
+        request.path,
+        request.query_string.decode('latin-1'),
+    ]
+    if per_user:
+        parts.append(str(session.get('_user_id', '')))
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+def immutable_result(per_user: bool = False, version: str = ''):
+    """
+    Answer conditional GETs of a view returning an immutable result.
+
+    A matching ``If-None-Match`` gets a 304 before the view runs. Successful
+    responses get a strong ETag. Requested through a URL carrying the current
+    version token (see ``versioned_url_for``) they are cached for a year
+    without revalidation, by shared caches too unless ``per_user`` (HTML pages
+    showing who is signed in), which are private to the browser and vary on
+    the session cookie. Unversioned or stale URLs keep the same content
+    address across a version bump, so their responses are revalidated on every
+    use. Other responses are left alone.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if per_user and '_flashes' in session:
+                # The page will show one-off messages: not the cacheable result
+                response = current_app.make_response(view(*args, **kwargs))
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+
+            etag = result_etag(per_user)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            scope = 'private' if per_user else 'public'
+            if request.args.get('v') == result_version(request.endpoint):
+                response.headers['Cache-Control'] = f'{scope}, max-age={IMMUTABLE_MAX_AGE}, immutable'
+            else:
+                response.headers['Cache-Control'] = f'{scope}, no-cache'
+            if per_user:
+                response.vary.add('Cookie')
+            return response
+        wrapper.result_version = version
+        return wrapper
+    return decorator
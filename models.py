@@ -1,3 +1,4 @@
+import zlib
 from datetime import datetime
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -36,40 +37,153 @@ class User(UserMixin, db.Model):
 
 class Resume(db.Model):
     __tablename__ = 'resumes'
+    # A user's uploads, newest first (profile history)
+    __table_args__ = (db.Index('ix_resumes_user_upload_time', 'user_id', 'upload_time', 'id'),)
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
     file_type = db.Column(db.String(10), nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded file
     upload_time = db.Column(db.DateTime, default=datetime.utcnow)
-    text_content = db.Column(db.Text)
+    # Text stored before resume_texts existed, until `flask migrate-resume-texts` moves it
+    legacy_text_content = db.deferred(db.Column('text_content', db.Text))
     language = db.Column(db.String(10), default='en')
+    indexed_length = db.Column(db.Integer)  # Term count in the search index, None if not indexed
     
     # Relationship to analysis
     analyses = db.relationship('Analysis', backref='resume', lazy=True, cascade='all, delete-orphan')
+    index_terms = db.relationship('ResumeTerm', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    stored_text = db.relationship('ResumeText', uselist=False, lazy=True, cascade='all, delete-orphan',
+                                  passive_deletes=True)
+    
+    @property
+    def text_content(self):
+        """Extracted text, loaded (and decompressed) only when read."""
+        if self.stored_text is not None:
+            return self.stored_text.text
+        return self.legacy_text_content
+    
+    @text_content.setter
+    def text_content(self, value):
+        self.legacy_text_content = None
+        if value is None:
+            self.stored_text = None
+        elif self.stored_text is None:
+            self.stored_text = ResumeText(text=value)
+        else:
+            self.stored_text.text = value
+
+class ResumeText(db.Model):
+    """Extracted text of a resume, zlib-compressed, kept apart so resume listings never load it."""
+    __tablename__ = 'resume_texts'
+    
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True)
+    compressed = db.Column(db.LargeBinary, nullable=False)
+    
+    @property
+    def text(self):
+        return zlib.decompress(self.compressed).decode('utf-8')
+    
+    @text.setter
+    def text(self, value):
+        self.compressed = zlib.compress(value.encode('utf-8'), 6)
+
+class ResumeTerm(db.Model):
+    """Posting list entry of the resume search index: one row per (term, resume)."""
+    __tablename__ = 'resume_terms'
+    
+    term = db.Column(db.String(100), primary_key=True)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id', ondelete='CASCADE'), primary_key=True, index=True)
+    term_frequency = db.Column(db.Integer, nullable=False)
 
 class Analysis(db.Model):
     __tablename__ = 'analysis'
     
     id = db.Column(db.Integer, primary_key=True)
-    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False)
+    resume_id = db.Column(db.Integer, db.ForeignKey('resumes.id'), nullable=False, index=True)
     job_description = db.Column(db.Text)
+    job_description_hash = db.Column(db.String(64), index=True)  # Cache key, see services.uploads
     ats_score = db.Column(db.Float)
     extracted_skills = db.Column(db.Text)  # JSON string
     missing_keywords = db.Column(db.Text)  # JSON string
     suggestions = db.Column(db.Text)  # JSON string
-    analysis_time = db.Column(db.DateTime, default=datetime.utcnow)
+    analysis_time = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    # Normalized copies of the skills and keywords above, for analytics queries
+    skills = db.relationship('AnalysisSkill', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+    keywords = db.relationship('AnalysisKeyword', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+
+class Skill(db.Model):
+    """A skill or job keyword referenced by analyses, stored once."""
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)  # Lowercased lookup key
+    label = db.Column(db.String(100), nullable=False)  # Display form, as first seen
+
+class AnalysisSkill(db.Model):
+    """A skill found in the analyzed resume."""
+    __tablename__ = 'analysis_skills'
+    __table_args__ = (db.Index('ix_analysis_skills_skill_kind', 'skill_id', 'kind'),)
+    
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id', ondelete='CASCADE'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # 'technical' or 'soft'
+
+class AnalysisKeyword(db.Model):
+    """A job description keyword the analyzed resume matched or missed."""
+    __tablename__ = 'analysis_keywords'
+    __table_args__ = (db.Index('ix_analysis_keywords_skill_status', 'skill_id', 'status'),)
+    
+    analysis_id = db.Column(db.Integer, db.ForeignKey('analysis.id', ondelete='CASCADE'), primary_key=True)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), primary_key=True)
+    status = db.Column(db.String(10), nullable=False)  # 'matched' or 'missing'
 
 class CSVUpload(db.Model):
     __tablename__ = 'csv_uploads'
+    __table_args__ = (db.Index('ix_csv_uploads_user_upload_time', 'user_id', 'upload_time', 'id'),)
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     filename = db.Column(db.String(255), nullable=False)
     original_filename = db.Column(db.String(255), nullable=False)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded file
     upload_time = db.Column(db.DateTime, default=datetime.utcnow)
     columns_info = db.Column(db.Text)  # JSON string
     stats_summary = db.Column(db.Text)  # JSON string
     row_count = db.Column(db.Integer)
     column_count = db.Column(db.Integer)
+    
+    charts = db.relationship('CSVChart', lazy=True, cascade='all, delete-orphan', passive_deletes=True)
+
+class CSVChart(db.Model):
+    """Chart payload of one column of a CSV upload, computed when the upload is profiled."""
+    __tablename__ = 'csv_charts'
+    
+    upload_id = db.Column(db.Integer, db.ForeignKey('csv_uploads.id', ondelete='CASCADE'), primary_key=True)
+    column = db.Column(db.Text, primary_key=True)
+    payload = db.Column(db.Text, nullable=False)  # JSON string, as served by /api/chart-data
+
+class AnalysisJob(db.Model):
+    """Queued background processing of an uploaded resume or CSV file."""
+    __tablename__ = 'analysis_jobs'
+    
+    id = db.Column(db.String(36), primary_key=True)  # UUID
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    kind = db.Column(db.String(10), nullable=False)  # 'resume' or 'csv'
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, done, failed
+    stage = db.Column(db.String(20), nullable=False, default='queued')
+    filename = db.Column(db.String(255), nullable=False)
+    original_filename = db.Column(db.String(255), nullable=False)
+    file_type = db.Column(db.String(10))
+    content_hash = db.Column(db.String(64))
+    job_description = db.Column(db.Text)
+    result_id = db.Column(db.Integer)  # Analysis.id or CSVUpload.id once saved
+    error = db.Column(db.Text)
+    notice = db.Column(db.Text)  # Message shown with the result, e.g. that only part of the file was read
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    lease_expires_at = db.Column(db.DateTime)  # A running job past this is requeued (its worker died)
+    attempts = db.Column(db.Integer, default=0)
@@ -1,26 +1,80 @@
 import os
 import json
-import uuid
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, send_file
+import time
+from datetime import datetime, timedelta
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, send_file, \
+    Response, stream_with_context, abort
 from flask_login import login_required, current_user
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
-from services.parser import extract_text_from_file
-from services.ats_engine import analyze_resume
-from services.csv_analyzer import analyze_csv
-from services.report_generator import generate_pdf_report
+from services.csv_analyzer import DEFAULT_CHART_BINS, MAX_CHART_BINS, analyze_csv
+from services.report_generator import REPORT_TEMPLATE_VERSION, find_report, generate_pdf_report, report_data, stream_reports_zip
 from services.language_detector import detect_language
-from models import Resume, Analysis, CSVUpload
+from services.text_normalizer import NormalizedDocument
+from services.search_index import search_resumes
+from services.skill_analytics import KEYWORD_STATUSES, SKILL_KINDS, analyses_with_skill, top_keywords, top_skills
+from services.correlations import upload_correlations
+from services.resume_pipeline import process_resume_upload
+from services.worker_pool import TaskTimeoutError
+from services.uploads import store_upload, discard_upload, csv_store_key, find_cached_analysis, find_extracted_resume, \
+    reuse_csv_upload, save_resume_analysis, save_csv_upload, find_chart_payload, save_chart
+from services.job_queue import FINISHED_STATUSES, TRUNCATED_RESUME_NOTICE, enqueue_job, job_to_dict
+from models import Resume, Analysis, CSVUpload, AnalysisJob
+from http_cache import immutable_result, versioned_url_for
 from app import db
 
 main_bp = Blueprint('main', __name__)
 
 ALLOWED_RESUME_EXTENSIONS = {'pdf', 'docx'}
 ALLOWED_CSV_EXTENSIONS = {'csv'}
+MAX_EXPORT_REPORTS = 500
 
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
+def wants_async_upload():
+    """Async mode is requested with async=1 or by asking for a JSON response."""
+    return request.values.get('async') == '1' or \
+           request.accept_mimetypes.best == 'application/json'
+
+def upload_error(message, endpoint, status=400):
+    """Report an upload error as JSON for async clients, or flash it and redirect back."""
+    if wants_async_upload():
+        return jsonify({'error': message}), status
+    flash(message, 'error')
+    return redirect(url_for(endpoint))
+
+def job_result_url(job):
+    if job.kind == 'resume':
+        return versioned_url_for('main.resume_results', analysis_id=job.result_id)
+    return versioned_url_for('main.csv_results', upload_id=job.result_id)
+
+def job_payload(job):
+    payload = job_to_dict(job)
+    payload['status_url'] = url_for('main.job_status', job_id=job.id)
+    if current_app.config['JOB_EVENTS_ENABLED']:
+        payload['events_url'] = url_for('main.job_events', job_id=job.id)
+    if job.status == 'done' and job.result_id:
+        # A result with a notice is reached through a redirect that flashes it
+        payload['result_url'] = url_for('main.job_result', job_id=job.id) if job.notice else job_result_url(job)
+    return payload
+
+def job_accepted_response(job):
+    return jsonify(job_payload(job)), 202
+
+def finished_upload_response(result_url):
+    """Respond to an upload whose result already exists, e.g. identical content uploaded before."""
+    if wants_async_upload():
+        return jsonify({'status': 'done', 'progress': 100, 'result_url': result_url})
+    return redirect(result_url)
+
+def analysis_redirect(analysis):
+    return finished_upload_response(versioned_url_for('main.resume_results', analysis_id=analysis.id))
+
+def csv_upload_redirect(csv_upload):
+    return finished_upload_response(versioned_url_for('main.csv_results', upload_id=csv_upload.id))
+
 @main_bp.route('/')
 def index():
     return render_template('index.html')
@@ -37,140 +91,140 @@ def data_explorer():
 def upload_resume():
     try:
         if 'resume_file' not in request.files:
-            flash('No file selected', 'error')
-            return redirect(url_for('main.resume_analyzer'))
+            return upload_error('No file selected', 'main.resume_analyzer')
         
         file = request.files['resume_file']
         job_description = request.form.get('job_description', '').strip()
         
         if file.filename == '':
-            flash('No file selected', 'error')
-            return redirect(url_for('main.resume_analyzer'))
+            return upload_error('No file selected', 'main.resume_analyzer')
         
         if file and file.filename and allowed_file(file.filename, ALLOWED_RESUME_EXTENSIONS):
-            # Generate unique filename
+            user_id = current_user.id if current_user and current_user.is_authenticated else None
+            upload_folder = current_app.config['UPLOAD_FOLDER']
+            
+            # Save file under its content hash
             file_ext = file.filename.rsplit('.', 1)[1].lower()
-            unique_filename = f"{uuid.uuid4()}.{file_ext}"
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+            stored_filename, content_hash = store_upload(file, upload_folder, file_ext)
+            file_path = os.path.join(upload_folder, stored_filename)
+            
+            # Identical resume and job description: show the existing analysis
+            cached_analysis = find_cached_analysis(content_hash, job_description, user_id)
+            if cached_analysis is not None:
+                return analysis_redirect(cached_analysis)
             
-            # Save file
-            file.save(file_path)
+            if wants_async_upload():
+                job = enqueue_job(
+                    'resume', stored_filename, file.filename,
+                    user_id=user_id,
+                    file_type=file_ext,
+                    job_description=job_description,
+                    content_hash=content_hash
+                )
+                return job_accepted_response(job)
             
-            # Extract text
-            text_content = extract_text_from_file(file_path)
+            # Identical content uploaded before: reuse its text and language
+            extracted = find_extracted_resume(content_hash)
             
-            if not text_content.strip():
-                flash('Could not extract text from the file. Please ensure it contains readable text.', 'error')
-                os.remove(file_path)
-                return redirect(url_for('main.resume_analyzer'))
+            # Extract text, detect language and analyze in the worker pool
+            try:
+                processed = process_resume_upload(
+                    file_path, job_description,
+                    text_content=extracted.text_content if extracted else None,
+                    language=extracted.language if extracted else None,
+                    content_hash=content_hash
+                )
+            except TaskTimeoutError:
+                current_app.logger.warning(f"Resume processing timed out: {stored_filename}")
+                discard_upload(upload_folder, stored_filename)
+                return upload_error('Your resume took too long to process. Please try a smaller file.', 'main.resume_analyzer')
             
-            # Detect language
-            detected_language = detect_language(text_content)
+            if processed['analysis'] is None:
+                discard_upload(upload_folder, stored_filename)
+                return upload_error('Could not extract text from the file. Please ensure it contains readable text.', 'main.resume_analyzer')
             
-            # Save to database
-            resume = Resume(
-                user_id=current_user.id if current_user and current_user.is_authenticated else None,
-                filename=unique_filename,
+            # Save resume, search index entries and analysis
+            analysis = save_resume_analysis(
+                processed,
+                user_id=user_id,
+                filename=stored_filename,
                 original_filename=file.filename,
                 file_type=file_ext,
-                text_content=text_content,
-                language=detected_language
-            )
-            db.session.add(resume)
-            db.session.commit()
-            
-            # Analyze resume with language support
-            analysis_result = analyze_resume(text_content, job_description, detected_language)
-            
-            # Ensure data is JSON serializable
-            try:
-                skills_json = json.dumps(analysis_result.get('skills', {}))
-                missing_keywords_json = json.dumps(analysis_result.get('missing_keywords', []))
-                suggestions_json = json.dumps(analysis_result.get('suggestions', []))
-            except (TypeError, ValueError) as e:
-                current_app.logger.error(f"JSON serialization error: {str(e)}")
-                # Fallback to string representations
-                skills_json = json.dumps({})
-                missing_keywords_json = json.dumps([])
-                suggestions_json = json.dumps([])
-            
-            # Save analysis
-            analysis = Analysis(
-                resume_id=resume.id,
                 job_description=job_description,
-                ats_score=float(analysis_result.get('ats_score', 0)),
-                extracted_skills=skills_json,
-                missing_keywords=missing_keywords_json,
-                suggestions=suggestions_json
+                content_hash=content_hash
             )
-            db.session.add(analysis)
-            db.session.commit()
             
-            return redirect(url_for('main.resume_results', analysis_id=analysis.id))
+            if processed['truncated']:
+                flash(TRUNCATED_RESUME_NOTICE, 'info')
+            
+            return analysis_redirect(analysis)
         
         else:
-            flash('Invalid file type. Please upload PDF or DOCX files only.', 'error')
-            return redirect(url_for('main.resume_analyzer'))
+            return upload_error('Invalid file type. Please upload PDF or DOCX files only.', 'main.resume_analyzer')
             
     except Exception as e:
         current_app.logger.error(f"Error processing resume: {str(e)}")
-        flash('An error occurred while processing your resume. Please try again.', 'error')
-        return redirect(url_for('main.resume_analyzer'))
+        return upload_error('An error occurred while processing your resume. Please try again.', 'main.resume_analyzer', 500)
 
 @main_bp.route('/upload-csv', methods=['POST'])
 def upload_csv():
     try:
         if 'csv_file' not in request.files:
-            flash('No file selected', 'error')
-            return redirect(url_for('main.data_explorer'))
+            return upload_error('No file selected', 'main.data_explorer')
         
         file = request.files['csv_file']
         
         if file.filename == '':
-            flash('No file selected', 'error')
-            return redirect(url_for('main.data_explorer'))
+            return upload_error('No file selected', 'main.data_explorer')
         
         if file and allowed_file(file.filename, ALLOWED_CSV_EXTENSIONS):
-            # Generate unique filename
-            unique_filename = f"{uuid.uuid4()}.csv"
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
+            user_id = current_user.id if current_user and current_user.is_authenticated else None
+            upload_folder = current_app.config['UPLOAD_FOLDER']
+            
+            # Save file under its content hash
+            stored_filename, content_hash = store_upload(file, upload_folder, 'csv')
+            file_path = os.path.join(upload_folder, stored_filename)
+            
+            # Identical content uploaded before: reuse its profile
+            csv_upload = reuse_csv_upload(content_hash, user_id, file.filename)
+            if csv_upload is not None:
+                return csv_upload_redirect(csv_upload)
             
-            # Save file
-            file.save(file_path)
+            if wants_async_upload():
+                job = enqueue_job(
+                    'csv', stored_filename, file.filename,
+                    user_id=user_id,
+                    content_hash=content_hash
+                )
+                return job_accepted_response(job)
             
             # Analyze CSV
-            analysis_result = analyze_csv(file_path)
+            analysis_result = analyze_csv(file_path, store_key=content_hash)
             
             if analysis_result is None:
-                flash('Error analyzing CSV file. Please ensure it\'s a valid CSV with proper formatting.', 'error')
-                os.remove(file_path)
-                return redirect(url_for('main.data_explorer'))
+                discard_upload(upload_folder, stored_filename)
+                return upload_error('Error analyzing CSV file. Please ensure it\'s a valid CSV with proper formatting.', 'main.data_explorer')
             
             # Save to database
-            csv_upload = CSVUpload(
-                user_id=current_user.id if current_user and current_user.is_authenticated else None,
-                filename=unique_filename,
+            csv_upload = save_csv_upload(
+                analysis_result,
+                user_id=user_id,
+                filename=stored_filename,
                 original_filename=file.filename,
-                columns_info=json.dumps(analysis_result['columns_info']),
-                stats_summary=json.dumps(analysis_result['stats']),
-                row_count=analysis_result['row_count'],
-                column_count=analysis_result['column_count']
+                content_hash=content_hash
             )
-            db.session.add(csv_upload)
-            db.session.commit()
             
-            return redirect(url_for('main.csv_results', upload_id=csv_upload.id))
+            return csv_upload_redirect(csv_upload)
         
         else:
-            flash('Invalid file type. Please upload CSV files only.', 'error')
-            return redirect(url_for('main.data_explorer'))
+            return upload_error('Invalid file type. Please upload CSV files only.', 'main.data_explorer')
             
     except Exception as e:
         current_app.logger.error(f"Error processing CSV: {str(e)}")
-        flash('An error occurred while processing your CSV file. Please try again.', 'error')
-        return redirect(url_for('main.data_explorer'))
+        return upload_error('An error occurred while processing your CSV file. Please try again.', 'main.data_explorer', 500)
 
 @main_bp.route('/resume-results/<int:analysis_id>')
+@immutable_result(per_user=True)
 def resume_results(analysis_id):
     analysis = Analysis.query.get_or_404(analysis_id)
     
@@ -187,6 +241,7 @@ def resume_results(analysis_id):
                          result_type='resume')
 
 @main_bp.route('/csv-results/<int:upload_id>')
+@immutable_result(per_user=True)
 def csv_results(upload_id):
     csv_upload = CSVUpload.query.get_or_404(upload_id)
     
@@ -201,36 +256,240 @@ def csv_results(upload_id):
                          result_type='csv')
 
 @main_bp.route('/download-report/<int:analysis_id>')
+@immutable_result(version=REPORT_TEMPLATE_VERSION)
 def download_report(analysis_id):
     try:
-        analysis = Analysis.query.get_or_404(analysis_id)
-        
-        # Generate PDF report
-        report_path = generate_pdf_report(analysis)
+        # Reports are generated after the analysis; a stored one is sent without a database query
+        report_path = find_report(analysis_id)
+        if report_path is None:
+            analysis = Analysis.query.get_or_404(analysis_id)
+            report_path = generate_pdf_report(analysis)
         
         if report_path and os.path.exists(report_path):
+            extension = os.path.splitext(report_path)[1]
             return send_file(report_path, as_attachment=True, 
-                           download_name=f"resume_analysis_report_{analysis_id}.pdf")
+                           download_name=f"resume_analysis_report_{analysis_id}{extension}")
         else:
             flash('Error generating report. Please try again.', 'error')
-            return redirect(url_for('main.resume_results', analysis_id=analysis_id))
+            return redirect(versioned_url_for('main.resume_results', analysis_id=analysis_id))
             
+    except HTTPException:
+        raise
     except Exception as e:
         current_app.logger.error(f"Error generating report: {str(e)}")
         flash('Error generating report. Please try again.', 'error')
-        return redirect(url_for('main.resume_results', analysis_id=analysis_id))
+        return redirect(versioned_url_for('main.resume_results', analysis_id=analysis_id))
 
 @main_bp.route('/api/chart-data/<int:upload_id>/<column>')
+@immutable_result()
 def get_chart_data(upload_id, column):
     try:
+        bins = request.args.get('bins', DEFAULT_CHART_BINS, type=int)
+        if bins is None or not 1 <= bins <= MAX_CHART_BINS:
+            return jsonify({'error': f'bins must be between 1 and {MAX_CHART_BINS}'}), 400
+        
+        # Charts are stored when the upload is profiled; only other bin counts need the data
+        payload = find_chart_payload(upload_id, column)
+        if payload is not None and (bins == DEFAULT_CHART_BINS or json.loads(payload)['type'] != 'histogram'):
+            return current_app.response_class(payload, mimetype='application/json')
+        
         csv_upload = CSVUpload.query.get_or_404(upload_id)
         file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], csv_upload.filename)
         
         from services.csv_analyzer import get_column_chart_data
-        chart_data = get_column_chart_data(file_path, column)
+        chart_data = get_column_chart_data(file_path, column, store_key=csv_store_key(csv_upload), bins=bins)
         
+        if 'error' in chart_data:
+            # Not cached: only successful responses are immutable
+            return jsonify(chart_data), 404 if chart_data['error'] == 'Column not found' else 500
+        if bins == DEFAULT_CHART_BINS:
+            return current_app.response_class(save_chart(upload_id, column, chart_data), mimetype='application/json')
         return jsonify(chart_data)
         
     except Exception as e:
         current_app.logger.error(f"Error getting chart data: {str(e)}")
         return jsonify({'error': 'Failed to generate chart data'}), 500
+
+@main_bp.route('/api/correlations/<int:upload_id>')
+@immutable_result()
+def get_correlations(upload_id):
+    csv_upload = CSVUpload.query.get_or_404(upload_id)
+    try:
+        columns_info = json.loads(csv_upload.columns_info) if csv_upload.columns_info else {}
+        numeric_columns = [name for name, info in columns_info.items() if info.get('is_numeric')]
+        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], csv_upload.filename)
+        
+        result = upload_correlations(file_path, csv_store_key(csv_upload), numeric_columns, csv_upload.row_count or 0)
+        if result is None:
+            return jsonify({'error': 'Failed to compute correlations'}), 500
+        return jsonify(result)
+        
+    except Exception as e:
+        current_app.logger.error(f"Error computing correlations: {str(e)}")
+        return jsonify({'error': 'Failed to compute correlations'}), 500
+
+def parse_date_range(payload):
+    """``since`` and ``until`` days (YYYY-MM-DD) of a request as a half-open datetime range."""
+    since = datetime.strptime(payload['since'], '%Y-%m-%d') if payload.get('since') else None
+    # The whole last day is included
+    until = datetime.strptime(payload['until'], '%Y-%m-%d') + timedelta(days=1) if payload.get('until') else None
+    return since, until
+
+def parse_export_filters(payload, user_id):
+    """Query of a user's analyses in a report export request: explicit ids, or a date range."""
+    query = (Analysis.query
+             .join(Resume, Resume.id == Analysis.resume_id)
+             .filter(Resume.user_id == user_id))
+    # A JSON list, repeated parameters or comma-separated values
+    ids = payload.getlist('ids') if hasattr(payload, 'getlist') else payload.get('ids') or []
+    if isinstance(ids, (str, int)):
+        ids = [ids]
+    ids = [part for value in ids for part in str(value).split(',') if part.strip()]
+    if ids:
+        query = query.filter(Analysis.id.in_([int(analysis_id) for analysis_id in ids]))
+    elif not (payload.get('since') or payload.get('until')):
+        raise ValueError('Give analysis ids, or a since or until filter')
+    
+    since, until = parse_date_range(payload)
+    if since:
+        query = query.filter(Analysis.analysis_time >= since)
+    if until:
+        query = query.filter(Analysis.analysis_time < until)
+    return query.order_by(Analysis.id)
+
+@main_bp.route('/api/reports/export', methods=['GET', 'POST'])
+@login_required
+def export_reports():
+    try:
+        payload = request.get_json(silent=True) or request.values
+        analyses = parse_export_filters(payload, current_user.id).limit(MAX_EXPORT_REPORTS + 1).all()
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid export request: {str(e)}'}), 400
+    
+    if not analyses:
+        return jsonify({'error': 'No analyses match the request'}), 404
+    if len(analyses) > MAX_EXPORT_REPORTS:
+        return jsonify({'error': f'At most {MAX_EXPORT_REPORTS} reports can be exported at once'}), 400
+    
+    # Parsed up front: the archive is streamed after the request's database session is gone
+    reports = [report_data(analysis) for analysis in analyses]
+    filename = f"resume_reports_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(stream_reports_zip(reports), mimetype='application/zip',
+                    headers={'Content-Disposition': f'attachment; filename={filename}', 'X-Accel-Buffering': 'no'})
+
+@main_bp.route('/api/search', methods=['GET', 'POST'])
+@login_required
+def search_candidates():
+    try:
+        payload = request.get_json(silent=True) or request.values
+        job_description = (payload.get('job_description') or payload.get('q') or '').strip()
+        
+        if not job_description:
+            return jsonify({'error': 'A job description is required'}), 400
+        
+        try:
+            limit = int(payload.get('limit', 20))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid limit'}), 400
+        
+        document = NormalizedDocument(job_description)
+        language = payload.get('language') or detect_language(document)
+        # Users only search their own resumes
+        results = search_resumes(document, language, limit, user_id=current_user.id)
+        
+        return jsonify({'language': language, 'count': len(results), 'results': results})
+        
+    except Exception as e:
+        current_app.logger.error(f"Error searching resumes: {str(e)}")
+        return jsonify({'error': 'Failed to search resumes'}), 500
+
+@main_bp.route('/api/analytics/skills')
+@login_required
+def skill_analytics():
+    kind = request.args.get('kind')
+    if kind and kind not in SKILL_KINDS:
+        return jsonify({'error': f"kind must be one of: {', '.join(SKILL_KINDS)}"}), 400
+    try:
+        since, until = parse_date_range(request.args)
+        limit = int(request.args.get('limit', 20))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid analytics request: {str(e)}'}), 400
+    return jsonify({'kind': kind, 'skills': top_skills(kind, since, until, limit, user_id=current_user.id)})
+
+@main_bp.route('/api/analytics/keywords')
+@login_required
+def keyword_analytics():
+    status = request.args.get('status', 'missing')
+    if status not in KEYWORD_STATUSES:
+        return jsonify({'error': f"status must be one of: {', '.join(KEYWORD_STATUSES)}"}), 400
+    try:
+        since, until = parse_date_range(request.args)
+        limit = int(request.args.get('limit', 20))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid analytics request: {str(e)}'}), 400
+    return jsonify({'status': status, 'keywords': top_keywords(status, since, until, limit, user_id=current_user.id)})
+
+@main_bp.route('/api/analytics/skills/<path:skill>/analyses')
+@login_required
+def skill_analyses(skill):
+    kind = request.args.get('kind')
+    if kind and kind not in SKILL_KINDS:
+        return jsonify({'error': f"kind must be one of: {', '.join(SKILL_KINDS)}"}), 400
+    try:
+        limit = int(request.args.get('limit', 50))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid limit'}), 400
+    analyses = analyses_with_skill(skill, kind, limit, user_id=current_user.id)
+    return jsonify({'skill': skill, 'count': len(analyses), 'analyses': analyses})
+
+@main_bp.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_payload(job))
+
+@main_bp.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None or job.status != 'done' or not job.result_id:
+        abort(404)
+    if job.notice:
+        flash(job.notice, 'info')
+    return redirect(job_result_url(job))
+
+@main_bp.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    # Each open stream holds a web worker, so streams are opt-in and short
+    if not current_app.config['JOB_EVENTS_ENABLED'] or db.session.get(AnalysisJob, job_id) is None:
+        abort(404)
+    
+    timeout = current_app.config['JOB_EVENTS_TIMEOUT']
+    
+    def stream():
+        deadline = time.monotonic() + timeout
+        last_state = None
+        last_sent = time.monotonic()
+        while True:
+            job = db.session.get(AnalysisJob, job_id, populate_existing=True)
+            if job is None:
+                break
+            payload = job_payload(job)
+            # End the read transaction so the next poll sees the worker's commits
+            db.session.rollback()
+            
+            state = (payload['status'], payload['stage'])
+            if state != last_state:
+                yield f"event: progress\ndata: {json.dumps(payload)}\n\n"
+                last_state = state
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent > 15:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            
+            if payload['status'] in FINISHED_STATUSES or time.monotonic() > deadline:
+                break
+            time.sleep(0.5)
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -1,144 +1,39 @@
-import re
 import logging
-from typing import Dict, List, Any
+import hashlib
+from typing import Dict, List, Any, Optional, Union
 from collections import Counter
+from services.lru_cache import LRUCache
+from services.skill_lexicon import SkillLexicon, get_lexicon
+from services.text_normalizer import NormalizedDocument, as_document, normalize_text
 
-# Technical skills by language
-TECHNICAL_SKILLS = {
-    'en': [
-    # Programming Languages
-    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust',
-    'swift', 'kotlin', 'scala', 'r', 'matlab', 'sql', 'html', 'css', 'sass', 'less',
-    
-    # Frameworks and Libraries
-    'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring', 'laravel',
-    'rails', 'asp.net', '.net', 'jquery', 'bootstrap', 'tailwind', 'material-ui',
-    
-    # Databases
-    'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'oracle', 'sqlite',
-    'cassandra', 'dynamodb', 'neo4j',
-    
-    # Cloud and DevOps
-    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'github', 'gitlab',
-    'terraform', 'ansible', 'puppet', 'chef', 'vagrant', 'nginx', 'apache',
-    
-    # Data Science and AI
-    'machine learning', 'deep learning', 'artificial intelligence', 'data science',
-    'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'keras', 'opencv',
-    'nlp', 'computer vision', 'statistics', 'analytics',
-    
-    # Tools and Platforms
-    'jira', 'confluence', 'slack', 'teams', 'figma', 'sketch', 'photoshop', 'illustrator',
-    'excel', 'powerpoint', 'tableau', 'power bi', 'splunk', 'datadog', 'new relic',
-    
-    # Methodologies
-        'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'tdd', 'bdd', 'microservices',
-        'rest api', 'graphql', 'soap', 'oauth', 'jwt', 'mvp', 'mvc'
-    ],
-    'ru': [
-        # Programming Languages (Russian)
-        'питон', 'джава', 'джаваскрипт', 'typescript', 'с++', 'с#', 'пхп', 'руби', 'го', 'раст',
-        'свифт', 'котлин', 'скала', 'эр', 'матлаб', 'эскьюэл', 'хтмл', 'цсс',
-        
-        # Frameworks and Libraries (Russian)
-        'реакт', 'ангуляр', 'вью', 'node.js', 'экспресс', 'джанго', 'фласк', 'спринг', 'ларавел',
-        'рейлс', 'asp.net', '.net', 'джейквери', 'бутстрап', 'тейлвинд',
-        
-        # Databases (Russian)
-        'майэскьюэл', 'постгресэскьюэл', 'монгодб', 'редис', 'эластиксерч', 'оракл', 'эсэкэлайт',
-        
-        # Cloud and DevOps (Russian)
-        'авс', 'азуре', 'гсп', 'докер', 'кубернетес', 'дженкинс', 'гит', 'гитхаб', 'гитлаб',
-        'террафом', 'ансибл', 'паппет', 'чеф', 'вагрант', 'нжинкс', 'апач',
-        
-        # Data Science and AI (Russian)
-        'машинное обучение', 'глубокое обучение', 'искусственный интеллект', 'наука о данных',
-        'пандас', 'нампи', 'сайкит-лерн', 'тензорфлоу', 'пайторч', 'керас',
-        'компьютерное зрение', 'статистика', 'аналитика',
-        
-        # Methodologies (Russian)
-        'аджайл', 'скрам', 'канбан', 'девопс', 'непрерывная интеграция', 'микросервисы',
-        'рест апи', 'графэкьюэл', 'соап', 'оаут', 'жвт'
-    ],
-    'ka': [
-        # Programming Languages (Georgian)
-        'პითონი', 'ჯავა', 'ჯავასკრიპტი', 'ტაიპსკრიპტი', 'სი++', 'სი#', 'პი-ჰ-პი', 'რუბი',
-        'სვიფტი', 'კოტლინი', 'სკალა', 'ჰ-ტ-მ-ლ', 'ც-ს-ს',
-        
-        # Frameworks (Georgian)
-        'რეაქტი', 'ანგულარი', 'ვიუ', 'ნოუდ.ჯს', 'ექსპრესი', 'ჯანგო', 'ფლასკი',
-        'სპრინგი', 'ლარაველი', 'რეილსი',
-        
-        # Databases (Georgian)
-        'მაისქლი', 'პოსტგრესქლი', 'მონგოდბ', 'რედისი',
-        
-        # Cloud and DevOps (Georgian)
-        'ეიდაბლიუსი', 'აზურე', 'დოკერი', 'კუბერნეტესი', 'ჯენკინსი', 'გითი', 'გითჰაბი',
-        
-        # Data Science (Georgian)
-        'მანქანური სწავლება', 'ღრმა სწავლება', 'ხელოვნური ინტელექტი', 'მონაცემთა მეცნიერება',
-        'სტატისტიკა', 'ანალიტიკა',
-        
-        # Methodologies (Georgian)
-        'აჯაილი', 'სკრამი', 'კანბანი', 'დევოფსი', 'მიკროსერვისები'
-    ]
-}
+# Longest term stored in the resume search index
+MAX_INDEX_TERM_LENGTH = 100
+
+# Keywords extracted from job descriptions; the same postings are scored over and over
+_job_keyword_cache = LRUCache(maxsize=512)
 
-# Soft skills by language
-SOFT_SKILLS = {
-    'en': [
-        'leadership', 'communication', 'teamwork', 'problem solving', 'analytical',
-        'creative', 'innovative', 'adaptable', 'flexible', 'organized', 'detail-oriented',
-        'time management', 'project management', 'collaboration', 'mentoring',
-        'customer service', 'presentation', 'negotiation', 'strategic thinking'
-    ],
-    'ru': [
-        'лидерство', 'коммуникация', 'командная работа', 'решение проблем', 'аналитический',
-        'креативный', 'инновационный', 'адаптивный', 'гибкий', 'организованный',
-        'внимание к деталям', 'управление временем', 'управление проектами', 'сотрудничество',
-        'менторство', 'обслуживание клиентов', 'презентация', 'переговоры', 'стратегическое мышление'
-    ],
-    'ka': [
-        'ლიდერობა', 'კომუნიკაცია', 'გუნდური მუშაობა', 'პრობლემების გადაწყვეტა', 'ანალიტიკური',
-        'კრეატიული', 'ინოვაციური', 'ადაპტირებადი', 'მოქნილი', 'ორგანიზებული',
-        'დეტალებზე ყურადღება', 'დროის მართვა', 'პროექტის მართვა', 'თანამშრომლობა',
-        'მენტორინგი', 'მომხმარებელთა სერვისი', 'პრეზენტაცია', 'მოლაპარაკება', 'სტრატეგიული აზროვნება'
-    ]
-}
+def configure_job_keyword_cache(maxsize: int) -> None:
+    """Set the job keyword cache size (0 disables it)."""
+    _job_keyword_cache.resize(maxsize)
+
+def get_job_keyword_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and size of the job keyword cache."""
+    return _job_keyword_cache.stats()
 
 def clean_text(text: str) -> str:
     """Clean and normalize text for analysis."""
-    # Convert to lowercase and remove extra whitespace
-    text = re.sub(r'\s+', ' ', text.lower().strip())
-    # Remove special characters but keep alphanumeric and spaces
-    text = re.sub(r'[^\w\s.-]', ' ', text)
-    return text
+    return normalize_text(text)
 
-def extract_skills(text: str, language: str = 'en') -> Dict[str, List[str]]:
+def extract_skills(text: Union[str, NormalizedDocument], language: str = 'en',
+                   lexicon: Optional[SkillLexicon] = None) -> Dict[str, List[str]]:
     """Extract technical and soft skills from text."""
-    clean_content = clean_text(text)
-    
-    found_technical = []
-    found_soft = []
+    document = as_document(text)
+    lexicon = lexicon or get_lexicon()
     
-    # Get skills for the detected language, fallback to English
-    tech_skills = TECHNICAL_SKILLS.get(language, TECHNICAL_SKILLS['en'])
-    soft_skills = SOFT_SKILLS.get(language, SOFT_SKILLS['en'])
-    
-    # Also include English skills for broader matching
-    if language != 'en':
-        tech_skills.extend(TECHNICAL_SKILLS['en'])
-        soft_skills.extend(SOFT_SKILLS['en'])
-    
-    # Find technical skills
-    for skill in tech_skills:
-        if skill.lower() in clean_content:
-            found_technical.append(skill.title())
-    
-    # Find soft skills
-    for skill in soft_skills:
-        if skill.lower() in clean_content:
-            found_soft.append(skill.title())
+    # Single pass over the text for both skill kinds, English skills included
+    found = document.find_skills(lexicon, language)
+    found_technical = [skill.title() for skill in found.get('technical', [])]
+    found_soft = [skill.title() for skill in found.get('soft', [])]
     
     # Remove duplicates while preserving order
     found_technical = list(dict.fromkeys(found_technical))
@@ -149,9 +44,41 @@ def extract_skills(text: str, language: str = 'en') -> Dict[str, List[str]]:
         'soft': found_soft[:10]  # Limit to top 10
     }
 
-def calculate_ats_score(resume_text: str, job_description: str = "", language: str = 'en') -> Dict[str, Any]:
+def extract_job_keywords(job_description: Union[str, NormalizedDocument], language: str = 'en',
+                         lexicon: Optional[SkillLexicon] = None) -> List[str]:
+    """Keywords a resume is scored against: lexicon skills in the job description plus its longer words."""
+    job_document = as_document(job_description)
+    lexicon = lexicon or get_lexicon()
+    
+    if job_document.is_empty:
+        # Use common industry keywords if no job description
+        return list(lexicon.default_keywords(language))
+    
+    key = hashlib.sha256(f"{lexicon.version}\0{language}\0{job_document.text}".encode('utf-8')).hexdigest()
+    keywords = _job_keyword_cache.get_or_compute(
+        key, lambda: tuple(_extract_job_keywords(job_document, language, lexicon))
+    )
+    return list(keywords)
+
+def _extract_job_keywords(job_document: NormalizedDocument, language: str, lexicon: SkillLexicon) -> List[str]:
+    """Uncached keyword extraction for a non-empty job description."""
+    # Find technical terms in job description
+    found = job_document.find_skills(lexicon, language)
+    job_keywords = found.get('technical', []) + found.get('soft', [])
+    
+    # Add other important words from job description
+    common_job_words = [word for word in job_document.words if len(word) > 4]
+    job_keywords.extend(common_job_words[:20])  # Add top 20 words
+    
+    # Remove duplicates
+    return list(dict.fromkeys(job_keywords))
+
+def calculate_ats_score(resume_text: Union[str, NormalizedDocument],
+                        job_description: Union[str, NormalizedDocument] = "", language: str = 'en',
+                        lexicon: Optional[SkillLexicon] = None) -> Dict[str, Any]:
     """Calculate ATS score based on keyword matching."""
-    if not resume_text.strip():
+    document = as_document(resume_text)
+    if document.is_empty:
         return {
             'score': 0,
             'total_keywords': 0,
@@ -159,42 +86,19 @@ def calculate_ats_score(resume_text: str, job_description: str = "", language: s
             'missing_keywords': []
         }
     
-    resume_clean = clean_text(resume_text)
+    lexicon = lexicon or get_lexicon()
+    job_keywords = extract_job_keywords(job_description, language, lexicon)
     
-    if job_description.strip():
-        # Extract keywords from job description
-        job_clean = clean_text(job_description)
-        job_words = set(word for word in job_clean.split() if len(word) > 2)
-        
-        # Get skills for language
-        tech_skills = TECHNICAL_SKILLS.get(language, TECHNICAL_SKILLS['en'])
-        soft_skills = SOFT_SKILLS.get(language, SOFT_SKILLS['en'])
-        all_skills = tech_skills + soft_skills
-        
-        # Find technical terms in job description
-        job_keywords = []
-        for skill in all_skills:
-            if skill.lower() in job_clean:
-                job_keywords.append(skill)
-        
-        # Add other important words from job description
-        common_job_words = [word for word in job_words if len(word) > 4]
-        job_keywords.extend(common_job_words[:20])  # Add top 20 words
-        
-        # Remove duplicates
-        job_keywords = list(set(job_keywords))
-    else:
-        # Use common industry keywords if no job description
-        tech_skills = TECHNICAL_SKILLS.get(language, TECHNICAL_SKILLS['en'])
-        soft_skills = SOFT_SKILLS.get(language, SOFT_SKILLS['en'])
-        job_keywords = tech_skills[:30] + soft_skills[:15]
+    # Skills the resume contains, from the scan shared with extract_skills
+    found = document.find_skills(lexicon, language)
+    resume_skills = set(found.get('technical', [])) | set(found.get('soft', []))
     
     # Count matches
     matched = []
     missing = []
     
     for keyword in job_keywords:
-        if keyword.lower() in resume_clean:
+        if keyword in resume_skills or document.contains(keyword):
             matched.append(keyword.title())
         else:
             missing.append(keyword.title())
@@ -211,7 +115,23 @@ def calculate_ats_score(resume_text: str, job_description: str = "", language: s
         'missing_keywords': missing[:15]   # Limit display
     }
 
-def generate_suggestions(skills: Dict[str, List[str]], missing_keywords: List[str], language: str = 'en') -> List[str]:
+def extract_index_terms(document: Union[str, NormalizedDocument], language: str = 'en',
+                        lexicon: Optional[SkillLexicon] = None) -> Counter:
+    """
+    Term frequencies indexed for a resume by the search index.
+
+    Indexes every lexicon skill occurrence plus the longer words that job
+    descriptions contribute as keywords, i.e. the terms a search can ask for.
+    """
+    document = as_document(document)
+    lexicon = lexicon or get_lexicon()
+    frequencies = Counter(match.skill for match in lexicon.matcher(language).iter_matches(document.text))
+    skills = set(frequencies)
+    frequencies.update(token.text for token in document.tokens if len(token.text) > 4 and token.text not in skills)
+    return Counter({term: count for term, count in frequencies.items() if len(term) <= MAX_INDEX_TERM_LENGTH})
+
+def generate_suggestions(skills: Dict[str, List[str]], missing_keywords: List[str], language: str = 'en',
+                         document: Optional[NormalizedDocument] = None) -> List[str]:
     """Generate LinkedIn headline suggestions."""
     technical_skills = skills.get('technical', [])
     soft_skills = skills.get('soft', [])
@@ -232,7 +152,11 @@ def generate_suggestions(skills: Dict[str, List[str]], missing_keywords: List[st
             suggestions.append(f"{top_tech[0]} & {top_tech[1]} Specialist | Full-Stack Developer")
         
         # Leadership-focused headline
-        if 'leadership' in [s.lower() for s in soft_skills]:
+        # Any mention counts, 'thought-leadership' included, as it did before
+        # skills were matched on whole words
+        leadership = 'leadership' in [s.lower() for s in soft_skills] or \
+            (document is not None and 'leadership' in document.text)
+        if leadership:
             suggestions.append(f"Tech Lead | {tech_str} Expert | Team Builder")
         else:
             suggestions.append(f"Senior Developer | {tech_str} | Problem Solver")
@@ -246,10 +170,15 @@ def generate_suggestions(skills: Dict[str, List[str]], missing_keywords: List[st
     
     return suggestions[:3]
 
-def analyze_resume(resume_text: str, job_description: str = "", language: str = 'en') -> Dict[str, Any]:
+def analyze_resume(resume_text: Union[str, NormalizedDocument],
+                   job_description: Union[str, NormalizedDocument] = "", language: str = 'en') -> Dict[str, Any]:
     """Main function to analyze resume and return comprehensive results."""
     try:
-        if not resume_text.strip():
+        # Normalize each text once; every step below works on the same documents
+        document = as_document(resume_text)
+        job_document = as_document(job_description)
+        
+        if document.is_empty:
             return {
                 'ats_score': 0.0,
                 'skills': {'technical': [], 'soft': []},
@@ -257,14 +186,17 @@ def analyze_resume(resume_text: str, job_description: str = "", language: str =
                 'suggestions': ["Please provide a resume with readable text content."]
             }
         
+        # Use one lexicon snapshot for the whole analysis, even if it is reloaded meanwhile
+        lexicon = get_lexicon()
+        
         # Extract skills
-        skills = extract_skills(resume_text, language)
+        skills = extract_skills(document, language, lexicon)
         
         # Calculate ATS score
-        ats_result = calculate_ats_score(resume_text, job_description, language)
+        ats_result = calculate_ats_score(document, job_document, language, lexicon)
         
         # Generate suggestions
-        suggestions = generate_suggestions(skills, ats_result['missing_keywords'], language)
+        suggestions = generate_suggestions(skills, ats_result['missing_keywords'], language, document)
         
         return {
             'ats_score': float(ats_result['score']),
@@ -0,0 +1,106 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from sklearn.preprocessing import MultiLabelBinarizer
+
+from services.ats_engine import extract_job_keywords
+from services.skill_lexicon import SkillLexicon, get_lexicon
+from services.text_normalizer import NormalizedDocument, as_document
+
+ResumeInput = Union[str, NormalizedDocument, Any]
+
+def _resume_document(resume: ResumeInput, default_language: str):
+    """Accept raw text, a NormalizedDocument or a stored Resume row."""
+    if isinstance(resume, (str, NormalizedDocument)) or resume is None:
+        return as_document(resume), default_language
+    return as_document(resume.text_content), resume.language or default_language
+
+def _resume_terms(document: NormalizedDocument, vocabulary: frozenset, language: str,
+                  lexicon: SkillLexicon) -> List[str]:
+    """Vocabulary terms present in a resume: matched skills plus whole-word n-grams."""
+    found = document.find_skills(lexicon, language)
+    terms = vocabulary & document.ngrams
+    terms |= vocabulary.intersection(found.get('technical', []))
+    terms |= vocabulary.intersection(found.get('soft', []))
+    return list(terms)
+
+def analyze_batch(resumes: Sequence[ResumeInput], job_descriptions: Sequence[Union[str, NormalizedDocument]],
+                  language: str = 'en', include_keywords: bool = True,
+                  lexicon: Optional[SkillLexicon] = None) -> Dict[str, Any]:
+    """
+    Score many resumes against many job descriptions at once.
+
+    Resumes may be raw text, NormalizedDocuments or ``Resume`` rows (whose stored
+    language is used). Job keywords are extracted once per job description and
+    language, resumes and job descriptions are turned into sparse keyword
+    incidence matrices, and all matched-keyword counts come from one sparse
+    matrix product per language. Scores are identical to ``calculate_ats_score``.
+
+    Returns ``scores`` and ``total_keywords`` as (resumes x job descriptions)
+    arrays and, unless ``include_keywords`` is False, ``pairs`` with the full
+    matched/missing keyword lists for every resume/job pair.
+    """
+    lexicon = lexicon or get_lexicon()
+    documents = [_resume_document(resume, language) for resume in resumes]
+    job_documents = [as_document(job_description) for job_description in job_descriptions]
+
+    n_resumes, n_jobs = len(documents), len(job_documents)
+    scores = np.zeros((n_resumes, n_jobs), dtype=float)
+    totals = np.zeros((n_resumes, n_jobs), dtype=int)
+    pairs: List[List[Optional[Dict[str, List[str]]]]] = [[None] * n_jobs for _ in range(n_resumes)]
+
+    # Job keywords depend on the resume language, so score each language group separately
+    groups: Dict[str, List[int]] = {}
+    for index, (document, resume_language) in enumerate(documents):
+        if document.is_empty:
+            if include_keywords:
+                pairs[index] = [{'matched_keywords': [], 'missing_keywords': []} for _ in range(n_jobs)]
+            continue
+        groups.setdefault(resume_language, []).append(index)
+
+    for group_language, rows in groups.items():
+        job_keywords = [extract_job_keywords(job_document, group_language, lexicon) for job_document in job_documents]
+        vocabulary = list(dict.fromkeys(keyword for keywords in job_keywords for keyword in keywords))
+        if not vocabulary:
+            if include_keywords:
+                for row in rows:
+                    pairs[row] = [{'matched_keywords': [], 'missing_keywords': []} for _ in range(n_jobs)]
+            continue
+
+        vocabulary_set = frozenset(vocabulary)
+        binarizer = MultiLabelBinarizer(classes=vocabulary, sparse_output=True)
+        job_matrix = binarizer.fit_transform(job_keywords)
+        resume_matrix = binarizer.transform([
+            _resume_terms(documents[row][0], vocabulary_set, group_language, lexicon) for row in rows
+        ])
+
+        matched_counts = (resume_matrix @ job_matrix.T).toarray()
+        job_totals = np.asarray(job_matrix.sum(axis=1)).ravel()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            group_scores = np.where(job_totals > 0, matched_counts / job_totals * 100, 0.0)
+
+        scores[rows] = np.round(group_scores, 1)
+        totals[rows] = job_totals
+
+        if include_keywords:
+            term_index = {term: position for position, term in enumerate(vocabulary)}
+            job_terms = [[(keyword.title(), term_index[keyword]) for keyword in keywords] for keywords in job_keywords]
+            resume_matrix = resume_matrix.tocsr()
+            for position, row in enumerate(rows):
+                start, end = resume_matrix.indptr[position], resume_matrix.indptr[position + 1]
+                present = set(resume_matrix.indices[start:end].tolist())
+                pairs[row] = [
+                    {
+                        'matched_keywords': [keyword for keyword, term in terms if term in present],
+                        'missing_keywords': [keyword for keyword, term in terms if term not in present],
+                    }
+                    for terms in job_terms
+                ]
+
+    logging.debug(f"Scored {n_resumes} resumes against {n_jobs} job descriptions")
+
+    result: Dict[str, Any] = {'scores': scores, 'total_keywords': totals}
+    if include_keywords:
+        result['pairs'] = pairs
+    return result
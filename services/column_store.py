@@ -0,0 +1,145 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Bump when the on-disk layout changes; stores of another version are rebuilt
+COLUMN_STORE_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+_store_root: Optional[str] = None
+
+def configure_column_store(directory: Optional[str]) -> None:
+    """Keep columnar copies of CSV uploads in ``directory`` (None disables them)."""
+    global _store_root
+    _store_root = directory or None
+
+def column_store_path(key: str) -> Optional[str]:
+    """Directory of the columnar copy of an upload, None if the store is disabled."""
+    if _store_root is None or not key:
+        return None
+    return os.path.join(_store_root, key)
+
+def _read_manifest(store_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(store_path, MANIFEST_NAME), encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != COLUMN_STORE_VERSION:
+        return None
+    return manifest
+
+def has_column_store(key: str) -> bool:
+    store_path = column_store_path(key)
+    return store_path is not None and _read_manifest(store_path) is not None
+
+def write_column_store(df: pd.DataFrame, key: str) -> bool:
+    """
+    Write a parsed CSV as one ``.npy`` file per column plus a manifest.
+
+    Numeric columns are stored as they are. Other columns are factorized into
+    int32 codes (-1 for missing values) with their categories stored beside
+    them. Stores are keyed by the upload's content hash, so identical uploads
+    share one; an existing store is left alone. Returns whether a store exists
+    afterwards.
+    """
+    store_path = column_store_path(key)
+    if store_path is None:
+        return False
+    if _read_manifest(store_path) is not None:
+        return True
+
+    os.makedirs(_store_root, exist_ok=True)
+    temp_path = tempfile.mkdtemp(dir=_store_root, prefix=f'.{key}-')
+    try:
+        columns: List[Dict[str, Any]] = []
+        for index, column in enumerate(df.columns):
+            series = df[column]
+            entry = {'name': str(column), 'file': f'c{index}.npy', 'dtype': str(series.dtype)}
+            if pd.api.types.is_numeric_dtype(series):
+                entry['kind'] = 'numeric'
+                values = series.to_numpy()
+            else:
+                entry['kind'] = 'codes'
+                codes, categories = pd.factorize(series, use_na_sentinel=True)
+                values = codes.astype(np.int32, copy=False)
+                entry['categories'] = f'c{index}.categories.json'
+                with open(os.path.join(temp_path, entry['categories']), 'w', encoding='utf-8') as file:
+                    json.dump([str(category) for category in categories], file, ensure_ascii=False)
+            np.save(os.path.join(temp_path, entry['file']), values, allow_pickle=False)
+            columns.append(entry)
+
+        with open(os.path.join(temp_path, MANIFEST_NAME), 'w', encoding='utf-8') as file:
+            json.dump({'version': COLUMN_STORE_VERSION, 'row_count': int(len(df)), 'columns': columns}, file)
+
+        if os.path.isdir(store_path):
+            # A stale store from another layout version
+            shutil.rmtree(store_path, ignore_errors=True)
+        try:
+            os.rename(temp_path, store_path)
+        except OSError:
+            # Another process stored the same content first
+            shutil.rmtree(temp_path, ignore_errors=True)
+        return _read_manifest(store_path) is not None
+    except Exception as e:
+        shutil.rmtree(temp_path, ignore_errors=True)
+        logging.error(f"Error writing column store for {key}: {str(e)}")
+        return False
+
+class StoredColumn:
+    """
+    One column of a column store, memory-mapped.
+
+    ``values`` is the numeric array, or the int32 category codes of a
+    non-numeric column, with ``categories`` listing the values of the codes.
+    """
+
+    def __init__(self, name: str, kind: str, values: np.ndarray, categories: Optional[List[str]] = None):
+        self.name = name
+        self.kind = kind
+        self.values = values
+        self.categories = categories
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.kind == 'numeric'
+
+    def non_null_values(self) -> np.ndarray:
+        """Numeric values without missing ones."""
+        if self.values.dtype.kind == 'f':
+            return self.values[~np.isnan(self.values)]
+        return self.values
+
+    def value_counts(self) -> pd.Series:
+        """Counts per category, most common first (ties in order of first appearance)."""
+        codes = self.values[self.values >= 0]
+        counts = np.bincount(codes, minlength=len(self.categories))
+        order = np.argsort(-counts, kind='stable')
+        order = order[counts[order] > 0]
+        return pd.Series(counts[order], index=[self.categories[i] for i in order])
+
+def load_column(key: str, column: str) -> Optional[StoredColumn]:
+    """Memory-map one column of an upload's store; None if there is no store for it."""
+    store_path = column_store_path(key)
+    manifest = _read_manifest(store_path) if store_path else None
+    if manifest is None:
+        return None
+
+    for entry in manifest['columns']:
+        if entry['name'] == column:
+            break
+    else:
+        raise KeyError(column)
+
+    values = np.load(os.path.join(store_path, entry['file']), mmap_mode='r', allow_pickle=False)
+    categories = None
+    if entry['kind'] == 'codes':
+        with open(os.path.join(store_path, entry['categories']), encoding='utf-8') as file:
+            categories = json.load(file)
+    return StoredColumn(entry['name'], entry['kind'], values, categories)
@@ -0,0 +1,67 @@
+from typing import Any, Dict, Mapping
+
+# App config keys read by the analysis services. They are also handed to
+# pool worker processes, which do not create the Flask app.
+SERVICE_CONFIG_KEYS = (
+    'SKILL_LEXICON_PATH',
+    'SKILL_LEXICON_RELOAD_INTERVAL',
+    'JOB_KEYWORD_CACHE_SIZE',
+    'PDF_MAX_PAGES',
+    'PDF_MAX_CHARS',
+    'PDF_TIME_BUDGET',
+    'PDF_PARALLEL_MIN_PAGES',
+    'PDF_PAGES_PER_TASK',
+    'TEXT_CACHE_FOLDER',
+    'TEXT_CACHE_MAX_BYTES',
+    'COLUMN_STORE_FOLDER',
+    'CSV_STREAMING_THRESHOLD',
+    'CSV_CHUNK_ROWS',
+    'CSV_LOADER_MODE',
+    'CSV_SAMPLE_ROWS',
+    'CORRELATION_MAX_ROWS',
+    'CORRELATION_MAX_COLUMNS',
+    'CORRELATION_TOP_PAIRS',
+    'CORRELATION_CACHE_FOLDER',
+    'REPORTS_FOLDER',
+)
+
+def service_settings(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """Plain, picklable copy of the service-related app configuration."""
+    return {key: config.get(key) for key in SERVICE_CONFIG_KEYS}
+
+def configure_services(config: Mapping[str, Any]) -> None:
+    """Apply configuration to the analysis services of the current process."""
+    from services.skill_lexicon import configure_lexicon
+    from services.ats_engine import configure_job_keyword_cache
+    from services.parser import configure_pdf_extraction
+    from services.text_cache import configure_text_cache
+    from services.column_store import configure_column_store
+    from services.csv_analyzer import configure_csv_analysis
+    from services.correlations import configure_correlations
+    from services.report_generator import configure_reports
+    
+    configure_lexicon(config.get('SKILL_LEXICON_PATH'), config.get('SKILL_LEXICON_RELOAD_INTERVAL'))
+    if config.get('JOB_KEYWORD_CACHE_SIZE') is not None:
+        configure_job_keyword_cache(config['JOB_KEYWORD_CACHE_SIZE'])
+    configure_pdf_extraction(
+        max_pages=config.get('PDF_MAX_PAGES'),
+        max_chars=config.get('PDF_MAX_CHARS'),
+        time_budget=config.get('PDF_TIME_BUDGET'),
+        parallel_min_pages=config.get('PDF_PARALLEL_MIN_PAGES'),
+        pages_per_task=config.get('PDF_PAGES_PER_TASK')
+    )
+    configure_text_cache(config.get('TEXT_CACHE_FOLDER'), config.get('TEXT_CACHE_MAX_BYTES'))
+    configure_column_store(config.get('COLUMN_STORE_FOLDER'))
+    configure_csv_analysis(
+        streaming_threshold=config.get('CSV_STREAMING_THRESHOLD'),
+        chunk_rows=config.get('CSV_CHUNK_ROWS'),
+        loader_mode=config.get('CSV_LOADER_MODE'),
+        sample_rows=config.get('CSV_SAMPLE_ROWS')
+    )
+    configure_correlations(
+        max_rows=config.get('CORRELATION_MAX_ROWS'),
+        max_columns=config.get('CORRELATION_MAX_COLUMNS'),
+        top_pairs=config.get('CORRELATION_TOP_PAIRS'),
+        cache_folder=config.get('CORRELATION_CACHE_FOLDER')
+    )
+    configure_reports(config.get('REPORTS_FOLDER'))
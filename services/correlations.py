@@ -0,0 +1,313 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import warnings
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.column_store import has_column_store, load_column
+from services.csv_analyzer import is_large_csv, load_csv, read_csv_chunks
+from services.lru_cache import LRUCache
+
+# Bump when the computation or the result format changes; cached results of other versions are ignored
+CORRELATION_VERSION = 1
+# Pairs with fewer rows where both values are present get no coefficient
+MIN_PAIR_ROWS = 3
+# Cells of a block of the wide-table computation (block columns x all columns)
+PAIR_BLOCK_CELLS = 1024 * 1024
+# Wide tables are sampled further, to about this many values (but at least MIN_SAMPLE_ROWS rows)
+SAMPLE_MAX_CELLS = 4_000_000
+MIN_SAMPLE_ROWS = 1000
+SAMPLE_SEED = 0
+
+_settings: Dict[str, Any] = {
+    'max_rows': 10_000,
+    'max_columns': 50,
+    'top_pairs': 50,
+    'cache_folder': None,
+}
+_memory_cache = LRUCache(maxsize=32)
+
+def configure_correlations(max_rows: Optional[int] = None, max_columns: Optional[int] = None,
+                           top_pairs: Optional[int] = None, cache_folder: Optional[str] = None) -> None:
+    """
+    Configure correlation analysis.
+
+    At most ``max_rows`` rows are used, sampled at random from larger files.
+    Full matrices are returned for up to ``max_columns`` numeric columns;
+    wider tables only get their ``top_pairs`` strongest pairs. Results are
+    kept in memory and, with a ``cache_folder``, on disk.
+    """
+    if max_rows is not None:
+        _settings['max_rows'] = max(int(max_rows), MIN_PAIR_ROWS)
+    if max_columns is not None:
+        _settings['max_columns'] = max(int(max_columns), 0)
+    if top_pairs is not None:
+        _settings['top_pairs'] = max(int(top_pairs), 0)
+    _settings['cache_folder'] = cache_folder or None
+    _memory_cache.clear()
+
+def _sample_positions(row_count: int, max_rows: int) -> Optional[np.ndarray]:
+    """Sorted row positions of a fixed random sample, None to use every row."""
+    if row_count <= max_rows:
+        return None
+    rng = np.random.default_rng(SAMPLE_SEED)
+    return np.sort(rng.choice(row_count, size=max_rows, replace=False))
+
+def load_numeric_sample(file_path: str, store_key: Optional[str], columns: List[str],
+                        row_count: int) -> Tuple[np.ndarray, bool]:
+    """
+    The numeric columns as a float64 (rows x columns) array with NaN for
+    missing values, on at most ``max_rows`` sampled rows (fewer for wide
+    tables, see SAMPLE_MAX_CELLS).
+
+    Reads the memory-mapped column store when there is one, the CSV file
+    otherwise; large files are read in chunks, sampling each chunk.
+    Returns the array and whether it is a sample.
+    """
+    max_rows = min(_settings['max_rows'], max(SAMPLE_MAX_CELLS // max(len(columns), 1), MIN_SAMPLE_ROWS))
+    positions = _sample_positions(row_count, max_rows)
+    block = np.empty((min(row_count, max_rows), len(columns)), dtype=np.float64, order='F')
+
+    if store_key and has_column_store(store_key):
+        for index, column in enumerate(columns):
+            values = load_column(store_key, column).values
+            block[:, index] = values if positions is None else values[positions]
+        return block, positions is not None
+
+    if not is_large_csv(file_path):
+        df = load_csv(file_path, usecols=columns)[columns]
+        values = df.to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.asfortranarray(values if positions is None else values[positions]), positions is not None
+
+    # Large file: keep the sampled positions of each chunk, in bounded memory
+    filled = 0
+    offset = 0
+    for chunk in read_csv_chunks(file_path, usecols=columns):
+        values = chunk[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        if positions is None:
+            selected = values
+        else:
+            start, end = np.searchsorted(positions, (offset, offset + len(chunk)))
+            selected = values[positions[start:end] - offset]
+        block[filled:filled + len(selected)] = selected
+        filled += len(selected)
+        offset += len(chunk)
+    return block[:filled], positions is not None
+
+def _ranks(block: np.ndarray) -> np.ndarray:
+    """Average ranks of each column's present values, NaN kept, as Spearman's coefficient uses."""
+    return np.asfortranarray(pd.DataFrame(block).rank(method='average').to_numpy(dtype=np.float64))
+
+class _Columns(NamedTuple):
+    """Columns prepared for pairwise sums: centered values and squares, zero where missing."""
+    centered: np.ndarray
+    squares: np.ndarray
+    present: np.ndarray  # 1.0 where a value is present
+    complete: bool  # no missing values
+
+    def __getitem__(self, columns: slice) -> '_Columns':
+        return _Columns(self.centered[:, columns], self.squares[:, columns], self.present[:, columns], self.complete)
+
+def _prepare(values: np.ndarray) -> _Columns:
+    present = ~np.isnan(values)
+    # Centering first keeps the sums of squares from cancelling catastrophically
+    with warnings.catch_warnings():
+        # Columns without values have a NaN mean; their pairs have no rows anyway
+        warnings.simplefilter('ignore', RuntimeWarning)
+        centered = np.asfortranarray(np.where(present, values - np.nanmean(values, axis=0), 0.0))
+    return _Columns(centered, centered * centered, present.astype(np.float64), bool(present.all()))
+
+def _pearson(x: _Columns, y: _Columns, counts: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Pairwise coefficients and row counts; ``counts`` may be passed in when the presence masks are known to match."""
+    rows = x.present.shape[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if x.complete and y.complete:
+            # Every pair uses every row, and the centered sums are zero
+            counts = np.full((x.centered.shape[1], y.centered.shape[1]), float(rows))
+            covariance = x.centered.T @ y.centered
+            variance_x = x.squares.sum(axis=0)[:, None]
+            variance_y = y.squares.sum(axis=0)[None, :]
+        else:
+            if counts is None:
+                counts = x.present.T @ y.present
+            sum_x = x.centered.T @ y.present
+            sum_y = x.present.T @ y.centered
+            covariance = x.centered.T @ y.centered - sum_x * sum_y / counts
+            variance_x = x.squares.T @ y.present - sum_x * sum_x / counts
+            variance_y = x.present.T @ y.squares - sum_y * sum_y / counts
+        coefficients = covariance / np.sqrt(variance_x * variance_y)
+        undefined = (counts < MIN_PAIR_ROWS) | (variance_x <= 0) | (variance_y <= 0)
+    coefficients[undefined] = np.nan
+    return np.clip(coefficients, -1.0, 1.0), counts
+
+def pairwise_pearson(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson correlation of every column of ``x`` with every column of ``y``,
+    each pair over the rows where both values are present.
+
+    Computed from matrix products of the zero-filled values and presence
+    masks, so all pairs take a few BLAS calls. Returns the coefficients
+    (NaN where undefined) and the number of rows used per pair.
+    """
+    return _pearson(_prepare(x), _prepare(y))
+
+def _missing_together(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Rows where both columns are missing, for every pair of columns of ``x`` and ``y``."""
+    return np.isnan(x).astype(np.float64).T @ np.isnan(y).astype(np.float64)
+
+def _rounded(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(round(value, 4))
+
+def _matrix(values: np.ndarray) -> List[List[Optional[float]]]:
+    return [[_rounded(value) for value in row] for row in values]
+
+def _pair(columns: List[str], i: int, j: int, pearson: float, spearman: float, rows: float, missing: float) -> Dict[str, Any]:
+    return {
+        'x': columns[i],
+        'y': columns[j],
+        'pearson': _rounded(pearson),
+        'spearman': _rounded(spearman),
+        'rows': int(rows),
+        'missing_together': int(missing),
+    }
+
+def _strength(pearson: np.ndarray, spearman: np.ndarray) -> np.ndarray:
+    """Larger absolute coefficient of a pair, -1 where neither is defined."""
+    with np.errstate(invalid='ignore'):
+        strength = np.fmax(np.abs(pearson), np.abs(spearman))
+    return np.where(np.isnan(strength), -1.0, strength)
+
+def _top_pairs(block: np.ndarray, ranks: np.ndarray, columns: List[str], k: int) -> List[Dict[str, Any]]:
+    """
+    The ``k`` pairs with the strongest Pearson or Spearman correlation,
+    computed block of columns by block, keeping only each block's best pairs.
+    """
+    width = block.shape[1]
+    if k == 0 or width < 2:
+        return []
+    step = max(PAIR_BLOCK_CELLS // width, 1)
+    values, ranked = _prepare(block), _prepare(ranks)
+    candidates: List[Tuple[float, int, int, float, float, float]] = []
+    for start in range(0, width, step):
+        stop = min(start + step, width)
+        pearson, counts = _pearson(values[start:stop], values)
+        # Ranks are missing where the values are, so the pair counts are the same
+        spearman, _ = _pearson(ranked[start:stop], ranked, counts)
+        strength = _strength(pearson, spearman)
+        # Each pair once: only columns after the row's own column
+        strength[np.arange(start, stop)[:, None] >= np.arange(width)[None, :]] = -1.0
+
+        flat = strength.ravel()
+        best = np.argpartition(flat, -k)[-k:] if len(flat) > k else np.arange(len(flat))
+        best = best[flat[best] >= 0]
+        for row, column in zip(*np.unravel_index(best, strength.shape)):
+            candidates.append((strength[row, column], start + row, column, pearson[row, column],
+                               spearman[row, column], counts[row, column]))
+        candidates = sorted(candidates, key=lambda candidate: -candidate[0])[:k]
+
+    # Missing-value co-occurrence of the selected pairs only
+    absent = np.isnan(block)
+    firsts = [candidate[1] for candidate in candidates]
+    seconds = [candidate[2] for candidate in candidates]
+    missing = (absent[:, firsts] & absent[:, seconds]).sum(axis=0)
+    return [_pair(columns, i, j, pearson, spearman, rows, missing_count)
+            for (_, i, j, pearson, spearman, rows), missing_count in zip(candidates, missing)]
+
+def compute_correlations(block: np.ndarray, columns: List[str]) -> Dict[str, Any]:
+    """
+    Pearson and Spearman correlations and missing-value co-occurrence of the
+    columns of a float64 block (NaN for missing values).
+
+    Up to ``max_columns`` columns, the result holds full matrices; wider
+    tables only get the ``top_pairs`` strongest pairs. Spearman's coefficient
+    ranks each column over all its present values, which matches the
+    pairwise definition exactly when values are missing in neither column.
+    """
+    ranks = _ranks(block)
+    result: Dict[str, Any] = {
+        'columns': columns,
+        'rows_used': int(block.shape[0]),
+        'missing_counts': [int(count) for count in np.isnan(block).sum(axis=0)],
+        'pearson': None,
+        'spearman': None,
+        'missing_together': None,
+    }
+
+    if len(columns) <= _settings['max_columns']:
+        values = _prepare(block)
+        pearson, counts = _pearson(values, values)
+        ranked = _prepare(ranks)
+        spearman, _ = _pearson(ranked, ranked, counts)
+        missing = _missing_together(block, block)
+        result['pearson'] = _matrix(pearson)
+        result['spearman'] = _matrix(spearman)
+        result['missing_together'] = [[int(value) for value in row] for row in missing]
+
+        strength = _strength(pearson, spearman)
+        strength[np.tril_indices(len(columns))] = -1.0
+        order = np.argsort(-strength, axis=None, kind='stable')[:_settings['top_pairs']]
+        result['top_pairs'] = [
+            _pair(columns, i, j, pearson[i, j], spearman[i, j], counts[i, j], missing[i, j])
+            for i, j in zip(*np.unravel_index(order, strength.shape)) if strength[i, j] >= 0
+        ]
+    else:
+        result['top_pairs'] = _top_pairs(block, ranks, columns, _settings['top_pairs'])
+    return result
+
+def _cache_key(store_key: str) -> str:
+    settings = f"{CORRELATION_VERSION}:{_settings['max_rows']}:{_settings['max_columns']}:{_settings['top_pairs']}"
+    return f"{store_key}-{hashlib.sha256(settings.encode('utf-8')).hexdigest()[:12]}"
+
+def _read_cached(key: str) -> Optional[Dict[str, Any]]:
+    if _settings['cache_folder'] is None:
+        return None
+    try:
+        with open(os.path.join(_settings['cache_folder'], f"{key}.json"), encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.error(f"Unreadable correlation cache entry {key}: {str(e)}")
+        return None
+
+def _write_cached(key: str, result: Dict[str, Any]) -> None:
+    folder = _settings['cache_folder']
+    if folder is None:
+        return
+    try:
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.part')
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(result, file)
+        os.replace(temp_path, os.path.join(folder, f"{key}.json"))
+    except OSError as e:
+        logging.error(f"Error writing correlation cache entry {key}: {str(e)}")
+
+def upload_correlations(file_path: str, store_key: str, columns: List[str], row_count: int) -> Optional[Dict[str, Any]]:
+    """
+    Correlations of the numeric ``columns`` of a CSV upload, cached by its
+    store key (content hash) in memory and on disk. None on failure.
+    """
+    key = _cache_key(store_key)
+    result = _memory_cache.get(key)
+    if result is not None:
+        return result
+
+    result = _read_cached(key)
+    if result is None:
+        try:
+            block, sampled = load_numeric_sample(file_path, store_key, columns, row_count)
+            result = compute_correlations(block, columns)
+            result['sampled'] = sampled
+        except Exception as e:
+            logging.error(f"Error computing correlations: {str(e)}")
+            return None
+        _write_cached(key, result)
+
+    _memory_cache.put(key, result)
+    return result
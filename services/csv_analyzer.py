@@ -1,54 +1,231 @@
+import os
+import warnings
 import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, List, Any, Optional
+from services.column_store import has_column_store, load_column, write_column_store
+from services.csv_profiler import profile_csv_stream
 
-def analyze_csv(file_path: str) -> Optional[Dict[str, Any]]:
-    """Analyze CSV file and return comprehensive statistics and insights."""
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+LOADER_MODES = ('default', 'optimized', 'pyarrow')
+# Text columns with at most this share of distinct values in the sample are read as categories
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+# Numeric columns are profiled in float64 blocks of about this many bytes
+NUMERIC_BLOCK_BYTES = 64 * 1024 * 1024
+NUMERIC_STATS = ('mean', 'median', 'std', 'min', 'max', 'q25', 'q75')
+# Histogram bins of the charts precomputed at upload time; other bin counts are computed on demand
+DEFAULT_CHART_BINS = 20
+MAX_CHART_BINS = 200
+
+# Files from this size on are profiled in chunks instead of loaded whole
+_settings: Dict[str, Any] = {
+    'streaming_threshold': 64 * 1024 * 1024,
+    'chunk_rows': 100_000,
+    'loader_mode': 'optimized',
+    'sample_rows': 10_000,
+}
+
+def configure_csv_analysis(streaming_threshold: Optional[int] = None, chunk_rows: Optional[int] = None,
+                           loader_mode: Optional[str] = None, sample_rows: Optional[int] = None) -> None:
+    """
+    Configure CSV loading and profiling.
+
+    ``streaming_threshold`` is the file size (bytes) from which CSVs are
+    profiled in chunks of ``chunk_rows`` rows. ``loader_mode`` is one of
+    LOADER_MODES, see load_csv; ``sample_rows`` rows are sampled to pick
+    column types.
+    """
+    if streaming_threshold is not None:
+        _settings['streaming_threshold'] = max(int(streaming_threshold), 0)
+    if chunk_rows is not None:
+        _settings['chunk_rows'] = max(int(chunk_rows), 1)
+    if loader_mode is not None:
+        if loader_mode not in LOADER_MODES:
+            raise ValueError(f"Unknown CSV loader mode: {loader_mode}")
+        _settings['loader_mode'] = loader_mode
+    if sample_rows is not None:
+        _settings['sample_rows'] = max(int(sample_rows), 1)
+
+def _sample_dtypes(file_path: str, usecols: Optional[List[str]] = None, arrow_strings: bool = False) -> Dict[str, str]:
+    """Compact dtypes for the text columns, picked from the first rows of the file."""
+    sample = pd.read_csv(file_path, nrows=_settings['sample_rows'], usecols=usecols)
+    dtypes = {}
+    for column in sample.columns:
+        if sample[column].dtype != object:
+            continue
+        values = sample[column].dropna()
+        if len(values) and values.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(values):
+            dtypes[column] = 'category'
+        elif arrow_strings:
+            dtypes[column] = 'string[pyarrow]'
+    return dtypes
+
+def _downcast_integers(df: pd.DataFrame) -> pd.DataFrame:
+    # Integers shrink losslessly; floats stay float64 so statistics do not change
+    for column in df.columns:
+        if pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+def load_csv(file_path: str, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read a CSV file into a DataFrame using the configured loader mode.
+
+    ``default`` is a plain ``pd.read_csv``. ``optimized`` reads repetitive
+    text columns as categories and downcasts integer columns. ``pyarrow``
+    also parses with the pyarrow engine and keeps other text columns as
+    Arrow strings; it behaves like ``optimized`` when pyarrow is not installed.
+    """
+    mode = _settings['loader_mode']
+    if mode == 'default':
+        return pd.read_csv(file_path, usecols=usecols)
+    
+    use_arrow = mode == 'pyarrow' and PYARROW_AVAILABLE
+    dtypes = _sample_dtypes(file_path, usecols, arrow_strings=use_arrow)
+    options = {'engine': 'pyarrow'} if use_arrow else {}
+    df = pd.read_csv(file_path, usecols=usecols, dtype=dtypes or None, **options)
+    return _downcast_integers(df)
+
+def read_csv_chunks(file_path: str, usecols: Optional[List[str]] = None):
+    """Iterate over a CSV file in DataFrames of the configured chunk size."""
+    return pd.read_csv(file_path, usecols=usecols, chunksize=_settings['chunk_rows'])
+
+def _reported_dtype(series: pd.Series) -> str:
+    """The column's type as plain read_csv would report it, whatever the loader mode."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype):
+        return 'object'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int64'
+    return str(dtype)
+
+def is_large_csv(file_path: str) -> bool:
+    return os.path.getsize(file_path) >= _settings['streaming_threshold']
+
+def _numeric_block_stats(block: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Statistics of every column of a 2-D float64 block (NaN for missing values).
+
+    The arithmetic follows pandas' own reductions (sum of the NaN-zeroed
+    values, two-pass variance with ddof=1, numpy's median and linear
+    percentiles), so results are the same as calling them column by column.
+    """
+    missing = np.isnan(block)
+    counts = block.shape[0] - missing.sum(axis=0)
+    filled = np.where(missing, 0.0, block)
+
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        # All-NaN columns give NaN, reported as None
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = filled.sum(axis=0) / counts
+        squares = (mean - filled) ** 2
+        squares[missing] = 0.0
+        std = np.sqrt(squares.sum(axis=0) / np.where(counts > 1, counts - 1, np.nan))
+        median = np.nanmedian(block, axis=0)
+        q25, q75 = np.nanpercentile(block, [25, 75], axis=0)
+        return {
+            'mean': mean,
+            'median': median,
+            'std': std,
+            'min': np.nanmin(block, axis=0),
+            'max': np.nanmax(block, axis=0),
+            'q25': q25,
+            'q75': q75,
+        }
+
+def numeric_column_stats(df: pd.DataFrame, columns: List[Any],
+                         charts: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[Any, Dict[str, Optional[float]]]:
+    """
+    Rounded mean, median, std, min, max and quartiles of numeric columns.
+
+    Columns are converted to float64 blocks (Fortran order, so every column
+    is contiguous) and reduced together, a batch of columns at a time to keep
+    each block under NUMERIC_BLOCK_BYTES. Given a ``charts`` dict, the
+    default histogram of each column is added to it from the same block.
+    """
+    results: Dict[Any, Dict[str, Optional[float]]] = {}
+    batch_size = max(NUMERIC_BLOCK_BYTES // (8 * max(len(df), 1)), 1)
+    for start in range(0, len(columns), batch_size):
+        batch = columns[start:start + batch_size]
+        block = np.asfortranarray(df[batch].to_numpy(dtype=np.float64, na_value=np.nan))
+        block_stats = _numeric_block_stats(block)
+        for index, column in enumerate(batch):
+            results[column] = {
+                name: None if np.isnan(block_stats[name][index]) else float(round(block_stats[name][index], 2))
+                for name in NUMERIC_STATS
+            }
+            if charts is not None:
+                try:
+                    charts[str(column)] = _histogram_chart(block[:, index], str(column))
+                except Exception as e:
+                    # Only this chart is lost; it is computed again when requested
+                    logging.error(f"Error building chart of {column}: {str(e)}")
+    return results
+
+def analyze_csv(file_path: str, store_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Analyze CSV file and return comprehensive statistics and insights.
+
+    The result includes the default chart payload of every column under
+    ``charts``. With a ``store_key``, the parsed file is also kept in the
+    column store so other charts do not parse the CSV again. Large files are
+    profiled in chunks, in bounded memory, without charts, and are not added
+    to the column store.
+    """
+    if is_large_csv(file_path):
+        return profile_csv_stream(file_path, _settings['chunk_rows'])
+    
     try:
         # Read CSV file
-        df = pd.read_csv(file_path)
+        df = load_csv(file_path)
         
         if df.empty:
             logging.error("CSV file is empty")
             return None
         
+        if store_key:
+            write_column_store(df, store_key)
+        
         # Basic info
         row_count, column_count = df.shape
         
         # Analyze columns
         columns_info = {}
         stats = {}
+        numeric_columns = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column])]
+        charts: Dict[str, Dict[str, Any]] = {}
+        numeric_stats = numeric_column_stats(df, numeric_columns, charts)
+        non_null_counts = df.count()
         
-        for column in df.columns:
+        for position, column in enumerate(df.columns):
+            non_null_count = int(non_null_counts.iloc[position])
             col_info = {
                 'name': str(column),
-                'type': str(df[column].dtype),
-                'non_null_count': int(df[column].count()),
-                'null_count': int(df[column].isnull().sum()),
+                'type': _reported_dtype(df[column]),
+                'non_null_count': non_null_count,
+                'null_count': int(row_count - non_null_count),
                 'unique_count': int(df[column].nunique())
             }
             
             # Determine if column is numeric
-            if pd.api.types.is_numeric_dtype(df[column]):
+            if column in numeric_stats:
                 col_info['is_numeric'] = True
-                # Check if all values are null
-                all_null = df[column].isnull().all()
-                col_stats = {
-                    'mean': float(round(df[column].mean(), 2)) if not all_null and not pd.isna(df[column].mean()) else None,
-                    'median': float(round(df[column].median(), 2)) if not all_null and not pd.isna(df[column].median()) else None,
-                    'std': float(round(df[column].std(), 2)) if not all_null and not pd.isna(df[column].std()) else None,
-                    'min': float(round(df[column].min(), 2)) if not all_null and not pd.isna(df[column].min()) else None,
-                    'max': float(round(df[column].max(), 2)) if not all_null and not pd.isna(df[column].max()) else None,
-                    'q25': float(round(df[column].quantile(0.25), 2)) if not all_null and not pd.isna(df[column].quantile(0.25)) else None,
-                    'q75': float(round(df[column].quantile(0.75), 2)) if not all_null and not pd.isna(df[column].quantile(0.75)) else None
-                }
+                col_stats = numeric_stats[column]
                 col_info.update(col_stats)
                 stats[column] = col_stats
             else:
                 col_info['is_numeric'] = False
                 # For categorical data, get value counts
-                value_counts = df[column].value_counts().head(10)
+                all_value_counts = _value_counts(df[column])
+                charts[str(column)] = _bar_chart(all_value_counts, str(column))
+                value_counts = all_value_counts.head(10)
                 # Convert to regular Python types
                 top_values_dict = {str(k): int(v) for k, v in value_counts.items()}
                 col_info['top_values'] = top_values_dict
@@ -64,6 +241,7 @@ def analyze_csv(file_path: str) -> Optional[Dict[str, Any]]:
             'column_count': int(column_count),
             'columns_info': columns_info,
             'stats': stats,
+            'charts': charts,
             'memory_usage': f"{float(df.memory_usage(deep=True).sum()) / 1024:.1f} KB"
         }
         
@@ -71,37 +249,76 @@ def analyze_csv(file_path: str) -> Optional[Dict[str, Any]]:
         logging.error(f"Error analyzing CSV: {str(e)}")
         return None
 
-def get_column_chart_data(file_path: str, column: str) -> Dict[str, Any]:
-    """Get chart data for a specific column."""
+def _histogram_chart(values, column: str, bins: int = DEFAULT_CHART_BINS) -> Dict[str, Any]:
+    # For numeric data, create histogram of the finite values (NaN and inf have no bin)
+    values = np.asarray(values, dtype=np.float64)
+    hist_data, bin_edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    labels = [f"{bin_edges[i]:.1f}-{bin_edges[i+1]:.1f}" for i in range(len(hist_data))]
+    
+    return {
+        'type': 'histogram',
+        'labels': [str(label) for label in labels],
+        'data': [int(x) for x in hist_data.tolist()],
+        'title': f'Distribution of {column}'
+    }
+
+def _value_counts(series: pd.Series) -> pd.Series:
+    """
+    Counts per value, most common first, ties in order of first appearance.
+
+    Unlike ``Series.value_counts``, the order does not depend on the dtype
+    (category columns would break ties in category order), so every loader
+    mode and the column store report the same top values.
+    """
+    codes, uniques = pd.factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    order = np.argsort(-counts, kind='stable')
+    return pd.Series(counts[order], index=[uniques[i] for i in order])
+
+def _bar_chart(value_counts: pd.Series, column: str) -> Dict[str, Any]:
+    # For categorical data, create bar chart
+    value_counts = value_counts.head(15)
+    
+    return {
+        'type': 'bar',
+        'labels': [str(x) for x in value_counts.index.tolist()],
+        'data': [int(x) for x in value_counts.values.tolist()],
+        'title': f'Top Values in {column}'
+    }
+
+def get_column_chart_data(file_path: str, column: str, store_key: Optional[str] = None,
+                          bins: int = DEFAULT_CHART_BINS) -> Dict[str, Any]:
+    """
+    Get chart data for a specific column, with ``bins`` histogram bins for numeric columns.
+
+    With a ``store_key``, only that column is read, memory-mapped from the
+    column store; the store is built from the CSV file first if needed
+    (except for large files, of which just the column is parsed).
+    """
     try:
-        df = pd.read_csv(file_path)
+        if store_key:
+            if not has_column_store(store_key) and not is_large_csv(file_path):
+                write_column_store(load_csv(file_path), store_key)
+            try:
+                stored = load_column(store_key, column)
+            except KeyError:
+                return {'error': 'Column not found'}
+            
+            if stored is not None:
+                if stored.is_numeric:
+                    return _histogram_chart(stored.non_null_values(), column, bins)
+                return _bar_chart(stored.value_counts(), column)
         
-        if column not in df.columns:
+        # No column store: read the header, then just the requested column
+        if column not in pd.read_csv(file_path, nrows=0).columns:
             return {'error': 'Column not found'}
         
-        col_data = df[column].dropna()
+        col_data = load_csv(file_path, usecols=[column])[column].dropna()
         
         if pd.api.types.is_numeric_dtype(col_data):
-            # For numeric data, create histogram
-            hist_data, bin_edges = np.histogram(col_data, bins=20)
-            labels = [f"{bin_edges[i]:.1f}-{bin_edges[i+1]:.1f}" for i in range(len(hist_data))]
-            
-            return {
-                'type': 'histogram',
-                'labels': [str(label) for label in labels],
-                'data': [int(x) for x in hist_data.tolist()],
-                'title': f'Distribution of {column}'
-            }
+            return _histogram_chart(col_data, column, bins)
         else:
-            # For categorical data, create bar chart
-            value_counts = col_data.value_counts().head(15)
-            
-            return {
-                'type': 'bar',
-                'labels': [str(x) for x in value_counts.index.tolist()],
-                'data': [int(x) for x in value_counts.values.tolist()],
-                'title': f'Top Values in {column}'
-            }
+            return _bar_chart(_value_counts(col_data), column)
             
     except Exception as e:
         logging.error(f"Error getting chart data: {str(e)}")
@@ -0,0 +1,165 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.sketches import DistinctCounter, FrequentItems, KLLSketch, RunningMoments
+
+# Literals pandas parses as booleans
+_BOOLEAN_VALUES = {'True', 'TRUE', 'true', 'False', 'FALSE', 'false'}
+
+class ColumnProfile:
+    """Bounded-memory profile of one CSV column, fed chunk by chunk."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.non_null_count = 0
+        self.null_count = 0
+        self.memory_bytes = 0
+        # Type evidence, as pandas would infer it from the whole column
+        self.numeric = True
+        self.integer = True
+        self.boolean = True
+        self.moments = RunningMoments()
+        self.quantiles = KLLSketch()
+        self.distinct = DistinctCounter()
+        self.frequent = FrequentItems()
+
+    def update(self, raw: pd.Series) -> None:
+        """Add a chunk of the column, read as strings (missing values as NaN)."""
+        values = raw.dropna()
+        had_values = self.non_null_count > 0
+        self.non_null_count += len(values)
+        self.null_count += len(raw) - len(values)
+        if len(values):
+            self.distinct.update(values.to_numpy())
+            self.frequent.update(values.value_counts(sort=False))
+
+            if self.boolean and not values.isin(_BOOLEAN_VALUES).all():
+                self.boolean = False
+                # Earlier chunks held boolean literals, which are not numbers
+                if had_values:
+                    self._make_text()
+
+            if self.boolean:
+                self._add_numbers(values.isin(('True', 'TRUE', 'true')).to_numpy(dtype=np.float64))
+            elif self.numeric:
+                numbers = pd.to_numeric(values, errors='coerce')
+                if numbers.isna().any():
+                    # A single non-numeric value makes the whole column text
+                    self._make_text()
+                else:
+                    # to_numeric only gives integers when every value is written as one
+                    self.integer = self.integer and numbers.dtype.kind in 'iu'
+                    self._add_numbers(numbers.to_numpy(dtype=np.float64))
+
+        if self.numeric:
+            self.memory_bytes += 8 * len(raw)
+        else:
+            self.memory_bytes += int(raw.memory_usage(deep=True, index=False))
+
+    def _add_numbers(self, numbers: np.ndarray) -> None:
+        self.moments.update(numbers)
+        self.quantiles.update(numbers)
+
+    def _make_text(self) -> None:
+        self.numeric = False
+        self.moments = self.quantiles = None
+
+    @property
+    def dtype(self) -> str:
+        """The dtype pandas would give the whole column."""
+        if self.boolean and self.non_null_count:
+            # Booleans with missing values stay objects
+            return 'object' if self.null_count else 'bool'
+        if not self.numeric:
+            return 'object'
+        if self.integer and self.non_null_count and not self.null_count:
+            return 'int64'
+        return 'float64'
+
+    def info(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """The column's ``columns_info`` entry and ``stats``, in analyze_csv's format."""
+        col_info = {
+            'name': self.name,
+            'type': self.dtype,
+            'non_null_count': self.non_null_count,
+            'null_count': self.null_count,
+            'unique_count': self.distinct.count(),
+        }
+
+        if self.dtype in ('bool', 'int64', 'float64'):
+            col_info['is_numeric'] = True
+            has_values = self.moments is not None and self.moments.count > 0
+            # Integer and boolean columns get quantiles they actually contain
+            discrete = self.integer or self.boolean
+            median, q25, q75 = (self.quantiles.quantiles((0.5, 0.25, 0.75), interpolate=not discrete)
+                                if has_values else (None, None, None))
+            col_stats = {
+                'mean': _rounded(self.moments.mean) if has_values else None,
+                'median': _rounded(median),
+                'std': _rounded(self.moments.std()) if has_values else None,
+                'min': _rounded(self.moments.min) if has_values else None,
+                'max': _rounded(self.moments.max) if has_values else None,
+                'q25': _rounded(q25),
+                'q75': _rounded(q75),
+            }
+            col_info.update(col_stats)
+            return col_info, col_stats
+
+        col_info['is_numeric'] = False
+        top_values = {str(value): int(count) for value, count in self.frequent.most_common(10)}
+        col_info['top_values'] = top_values
+        col_stats = {
+            'top_values': top_values,
+            'most_common': next(iter(top_values), None),
+        }
+        return col_info, col_stats
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    if value is None or np.isnan(value):
+        return None
+    return float(round(value, 2))
+
+def profile_csv_stream(file_path: str, chunk_rows: int = 100_000) -> Optional[Dict[str, Any]]:
+    """
+    Profile a CSV file in chunks, in memory bounded by the chunk size.
+
+    Returns the same structure as ``analyze_csv``. Counts and types are
+    exact; mean, std, min and max are exact up to floating point; quantiles
+    come from a KLL sketch and distinct counts from HyperLogLog once a column
+    has more than 16384 distinct values; top values are exact for columns
+    with up to 1000 distinct values.
+    """
+    try:
+        profiles: Optional[List[ColumnProfile]] = None
+        row_count = 0
+        for chunk in pd.read_csv(file_path, dtype=str, chunksize=chunk_rows):
+            if profiles is None:
+                profiles = [ColumnProfile(str(column)) for column in chunk.columns]
+            row_count += len(chunk)
+            for profile, column in zip(profiles, chunk.columns):
+                profile.update(chunk[column])
+
+        if not profiles or row_count == 0:
+            logging.error("CSV file is empty")
+            return None
+
+        columns_info = {}
+        stats = {}
+        for profile in profiles:
+            columns_info[profile.name], stats[profile.name] = profile.info()
+
+        memory_bytes = sum(profile.memory_bytes for profile in profiles) + 128  # plus a RangeIndex
+        return {
+            'row_count': row_count,
+            'column_count': len(profiles),
+            'columns_info': columns_info,
+            'stats': stats,
+            'memory_usage': f"{memory_bytes / 1024:.1f} KB"
+        }
+
+    except Exception as e:
+        logging.error(f"Error profiling CSV: {str(e)}")
+        return None
@@ -0,0 +1,267 @@
+import os
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from flask import current_app
+from sqlalchemy import and_, func, or_
+from app import db
+from models import AnalysisJob
+from services.csv_analyzer import analyze_csv
+from services.resume_pipeline import process_resume_upload
+from services.worker_pool import TaskTimeoutError
+from services.uploads import discard_upload, find_cached_analysis, find_extracted_resume, reuse_csv_upload, \
+    save_resume_analysis, save_csv_upload
+
+# Stages a job goes through, in order, per kind of upload
+JOB_STAGES = {
+    'resume': ('queued', 'parsing', 'language', 'scoring', 'saved'),
+    'csv': ('queued', 'parsing', 'profiling', 'saved'),
+}
+FINISHED_STATUSES = ('done', 'failed')
+
+TRUNCATED_RESUME_NOTICE = 'Your resume is very long, so only its first part was analyzed.'
+
+# Seconds a claimed job stays leased without a heartbeat from its worker
+DEFAULT_JOB_LEASE = 300
+# Claims of a job before it is given up (e.g. a file that kills every worker)
+MAX_JOB_ATTEMPTS = 3
+
+class JobError(Exception):
+    """A job failure whose message can be shown to the user."""
+
+_wakeup = threading.Event()
+_workers_lock = threading.Lock()
+_workers_pid: Optional[int] = None
+
+def enqueue_job(kind: str, filename: str, original_filename: str, user_id: Optional[int] = None,
+                file_type: Optional[str] = None, job_description: Optional[str] = None,
+                content_hash: Optional[str] = None) -> AnalysisJob:
+    """Record a stored upload as a queued job and wake up the local job workers."""
+    job = AnalysisJob(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        kind=kind,
+        status='queued',
+        stage='queued',
+        filename=filename,
+        original_filename=original_filename,
+        file_type=file_type,
+        content_hash=content_hash,
+        job_description=job_description
+    )
+    db.session.add(job)
+    db.session.commit()
+    _wakeup.set()
+    return job
+
+def job_progress(job: AnalysisJob) -> int:
+    """Rough completion percentage derived from the job's stage."""
+    if job.status == 'done':
+        return 100
+    stages = JOB_STAGES.get(job.kind, ('queued',))
+    position = stages.index(job.stage) if job.stage in stages else 0
+    return int(position / max(len(stages) - 1, 1) * 100)
+
+def job_to_dict(job: AnalysisJob) -> Dict[str, Any]:
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'stage': job.stage,
+        'progress': job_progress(job),
+        'result_id': job.result_id,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'updated_at': job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+def _update_job(job_id: str, **fields: Any) -> None:
+    fields['updated_at'] = datetime.utcnow()
+    AnalysisJob.query.filter_by(id=job_id).update(fields, synchronize_session=False)
+    db.session.commit()
+
+def _claimable(now: datetime, lease_seconds: float):
+    """Queued jobs, and running jobs whose worker stopped renewing their lease."""
+    stale = or_(AnalysisJob.lease_expires_at < now,
+                # Claimed before leases were recorded
+                and_(AnalysisJob.lease_expires_at.is_(None),
+                     AnalysisJob.updated_at < now - timedelta(seconds=lease_seconds)))
+    return or_(AnalysisJob.status == 'queued', and_(AnalysisJob.status == 'running', stale))
+
+def claim_next_job(lease_seconds: float = DEFAULT_JOB_LEASE) -> Optional[str]:
+    """
+    Mark the oldest claimable job as running and return its id.
+
+    The conditional UPDATE makes claiming safe when several threads or
+    processes consume the same queue. A claim leases the job for
+    ``lease_seconds``; jobs whose lease ran out, because the process running
+    them died, are claimed again, up to MAX_JOB_ATTEMPTS times.
+    """
+    while True:
+        now = datetime.utcnow()
+        candidate = (db.session.query(AnalysisJob.id, AnalysisJob.attempts)
+                     .filter(_claimable(now, lease_seconds))
+                     .order_by(AnalysisJob.created_at)
+                     .first())
+        if candidate is None:
+            db.session.rollback()
+            return None
+
+        if (candidate.attempts or 0) >= MAX_JOB_ATTEMPTS:
+            (AnalysisJob.query
+             .filter(AnalysisJob.id == candidate.id, _claimable(now, lease_seconds))
+             .update({'status': 'failed', 'updated_at': now,
+                      'error': 'An error occurred while processing your file. Please try again.'},
+                     synchronize_session=False))
+            db.session.commit()
+            continue
+
+        claimed = (AnalysisJob.query
+                   .filter(AnalysisJob.id == candidate.id, _claimable(now, lease_seconds))
+                   .update({'status': 'running', 'updated_at': now,
+                            'lease_expires_at': now + timedelta(seconds=lease_seconds),
+                            'attempts': func.coalesce(AnalysisJob.attempts, 0) + 1},
+                           synchronize_session=False))
+        db.session.commit()
+        if claimed:
+            return candidate.id
+
+def _renew_lease(app, job_id: str, lease_seconds: float, stop_event: threading.Event) -> None:
+    """Heartbeat of a running job: extend its lease until ``stop_event`` is set."""
+    with app.app_context():
+        try:
+            while not stop_event.wait(lease_seconds / 3):
+                (AnalysisJob.query
+                 .filter_by(id=job_id, status='running')
+                 .update({'lease_expires_at': datetime.utcnow() + timedelta(seconds=lease_seconds)},
+                         synchronize_session=False))
+                db.session.commit()
+        except Exception as e:
+            logging.error(f"Lease renewal of job {job_id} failed: {str(e)}")
+        finally:
+            db.session.remove()
+
+def _run_resume_job(job: AnalysisJob, file_path: str) -> int:
+    job_description = job.job_description or ''
+    if job.content_hash:
+        cached = find_cached_analysis(job.content_hash, job_description, job.user_id)
+        if cached is not None:
+            return cached.id
+    extracted = find_extracted_resume(job.content_hash) if job.content_hash else None
+
+    # Extraction and scoring run in the worker pool, under its timeout, as for synchronous uploads;
+    # progress callbacks cannot cross processes, so the stage moves on once the task is done
+    try:
+        processed = process_resume_upload(
+            file_path, job_description,
+            text_content=extracted.text_content if extracted else None,
+            language=extracted.language if extracted else None,
+            content_hash=job.content_hash
+        )
+    except TaskTimeoutError:
+        raise JobError('Your resume took too long to process. Please try a smaller file.')
+    _update_job(job.id, stage='scoring')
+    if processed['analysis'] is None:
+        raise JobError('Could not extract text from the file. Please ensure it contains readable text.')
+
+    analysis = save_resume_analysis(
+        processed, job.user_id, job.filename, job.original_filename, job.file_type, job_description,
+        content_hash=job.content_hash
+    )
+    if processed['truncated']:
+        _update_job(job.id, notice=TRUNCATED_RESUME_NOTICE)
+    return analysis.id
+
+def _run_csv_job(job: AnalysisJob, file_path: str) -> int:
+    if job.content_hash:
+        reused = reuse_csv_upload(job.content_hash, job.user_id, job.original_filename)
+        if reused is not None:
+            return reused.id
+
+    _update_job(job.id, stage='profiling')
+    analysis_result = analyze_csv(file_path, store_key=job.content_hash)
+    if analysis_result is None:
+        raise JobError("Error analyzing CSV file. Please ensure it's a valid CSV with proper formatting.")
+
+    csv_upload = save_csv_upload(analysis_result, job.user_id, job.filename, job.original_filename,
+                                 content_hash=job.content_hash)
+    return csv_upload.id
+
+def run_job(job_id: str, upload_folder: str, lease_seconds: float = DEFAULT_JOB_LEASE) -> None:
+    """Process a claimed job, recording each stage and the final outcome, and keep its lease alive meanwhile."""
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None:
+        return
+    filename = job.filename
+    file_path = os.path.join(upload_folder, filename)
+
+    heartbeat_stop = threading.Event()
+    threading.Thread(target=_renew_lease, args=(current_app._get_current_object(), job_id, lease_seconds, heartbeat_stop),
+                     name=f'job-lease-{job_id}', daemon=True).start()
+    try:
+        _update_job(job_id, stage='parsing')
+        if job.kind == 'resume':
+            result_id = _run_resume_job(job, file_path)
+        elif job.kind == 'csv':
+            result_id = _run_csv_job(job, file_path)
+        else:
+            raise JobError(f"Unknown job kind: {job.kind}")
+        _update_job(job_id, status='done', stage='saved', result_id=result_id)
+
+    except Exception as e:
+        db.session.rollback()
+        if isinstance(e, JobError):
+            message = str(e)
+        else:
+            logging.error(f"Error processing job {job_id}: {str(e)}")
+            message = 'An error occurred while processing your file. Please try again.'
+        _update_job(job_id, status='failed', error=message)
+        discard_upload(upload_folder, filename)
+    finally:
+        heartbeat_stop.set()
+
+def work_jobs(app, poll_interval: float = 5.0, stop_event: Optional[threading.Event] = None) -> None:
+    """Consume queued jobs until ``stop_event`` is set (forever if it is None)."""
+    stop_event = stop_event or threading.Event()
+    lease_seconds = app.config.get('JOB_LEASE_SECONDS', DEFAULT_JOB_LEASE)
+    with app.app_context():
+        while not stop_event.is_set():
+            try:
+                job_id = claim_next_job(lease_seconds)
+                if job_id is None:
+                    # Local enqueues wake us immediately; polling picks up other processes' jobs
+                    _wakeup.wait(poll_interval)
+                    _wakeup.clear()
+                    continue
+                run_job(job_id, app.config['UPLOAD_FOLDER'], lease_seconds)
+            except Exception as e:
+                logging.error(f"Job worker error: {str(e)}")
+                stop_event.wait(poll_interval)
+            finally:
+                db.session.remove()
+
+def ensure_job_workers(app) -> None:
+    """
+    Start this process' background job worker threads, once.
+
+    Cheap after the first call, so it can run on every request. Threads do not
+    survive a fork, so a forked web worker starts its own.
+    """
+    global _workers_pid
+    count = app.config.get('JOB_WORKER_THREADS', 0)
+    if count <= 0 or _workers_pid == os.getpid():
+        return
+    with _workers_lock:
+        if _workers_pid == os.getpid():
+            return
+        for index in range(count):
+            thread = threading.Thread(
+                target=work_jobs,
+                args=(app, app.config.get('JOB_POLL_INTERVAL', 5.0)),
+                name=f'job-worker-{index}',
+                daemon=True
+            )
+            thread.start()
+        _workers_pid = os.getpid()
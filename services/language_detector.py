@@ -1,6 +1,6 @@
 import logging
-from typing import Optional
-import re
+from typing import Dict, Optional, Union
+from services.text_normalizer import NormalizedDocument, as_document
 
 try:
     from langdetect import detect, DetectorFactory
@@ -10,23 +10,64 @@ try:
 except ImportError:
     LANGDETECT_AVAILABLE = False
 
-def detect_language(text: str) -> str:
+# Share of letters from which a script decides the language on its own
+DECISIVE_SCRIPT_RATIO = 0.3
+# Share of Latin letters from which text is taken as English
+DECISIVE_LATIN_RATIO = 0.95
+# Characters of mixed-script text handed to langdetect, taken from evenly spaced windows
+LANGDETECT_SAMPLE_CHARS = 2000
+LANGDETECT_SAMPLE_WINDOWS = 4
+
+def classify_by_script(histogram: Dict[str, int]) -> Optional[str]:
+    """
+    Decide the language from the letter counts per script, if they are decisive.
+
+    Georgian and Cyrillic are only used by one supported language each, and
+    Latin-only text can only be English. Returns None for mixed-script text,
+    e.g. a few Cyrillic words among mostly Latin ones.
+    """
+    total_chars = histogram['latin'] + histogram['cyrillic'] + histogram['georgian']
+    if total_chars == 0:
+        return 'en'
+    
+    georgian_ratio = histogram['georgian'] / total_chars
+    cyrillic_ratio = histogram['cyrillic'] / total_chars
+    
+    if max(georgian_ratio, cyrillic_ratio) >= DECISIVE_SCRIPT_RATIO:
+        return 'ka' if georgian_ratio >= cyrillic_ratio else 'ru'
+    if histogram['latin'] / total_chars >= DECISIVE_LATIN_RATIO:
+        return 'en'
+    return None
+
+def _langdetect_sample(text: str) -> str:
+    """A bounded sample of ``text``: evenly spaced windows, so not only the header is seen."""
+    if len(text) <= LANGDETECT_SAMPLE_CHARS:
+        return text
+    window = LANGDETECT_SAMPLE_CHARS // LANGDETECT_SAMPLE_WINDOWS
+    step = (len(text) - window) // (LANGDETECT_SAMPLE_WINDOWS - 1)
+    return ' '.join(text[i * step:i * step + window] for i in range(LANGDETECT_SAMPLE_WINDOWS))
+
+def detect_language(text: Union[str, NormalizedDocument]) -> str:
     """
     Detect the language of the given text.
     Returns 'en' for English, 'ru' for Russian, 'ka' for Georgian, or 'en' as default.
     """
-    if not text or not text.strip():
+    # Reuse the normalized document when the caller already built one
+    document = as_document(text)
+    if document.is_empty:
         return 'en'
     
-    # Clean text for better detection
-    clean_text = re.sub(r'[^\w\s]', ' ', text.lower().strip())
+    # The script mix settles nearly every resume without langdetect
+    language = classify_by_script(document.script_histogram)
+    if language is not None:
+        return language
     
     if not LANGDETECT_AVAILABLE:
         # Fallback: Simple character-based detection
-        return detect_language_fallback(clean_text)
+        return detect_language_fallback(document)
     
     try:
-        detected = detect(clean_text)
+        detected = detect(_langdetect_sample(document.text))
         
         # Map detected languages to supported ones
         if detected in ['en']:
@@ -37,23 +78,35 @@ def detect_language(text: str) -> str:
             return 'ka'
         else:
             # Check for language-specific patterns
-            return detect_language_fallback(clean_text)
+            return detect_language_fallback(document)
             
     except Exception as e:
         logging.warning(f"Language detection failed: {str(e)}")
-        return detect_language_fallback(clean_text)
+        return detect_language_fallback(document)
+
+def warm_up() -> None:
+    """
+    Load langdetect's language profiles now instead of on the first request.
+    """
+    if LANGDETECT_AVAILABLE:
+        try:
+            detect('warm up the language profiles')
+        except Exception as e:
+            logging.warning(f"Language detector warm-up failed: {str(e)}")
 
-def detect_language_fallback(text: str) -> str:
+def detect_language_fallback(text: Union[str, NormalizedDocument]) -> str:
     """
     Fallback language detection based on character patterns.
     """
-    if not text:
+    document = as_document(text)
+    if document.is_empty:
         return 'en'
     
-    # Count character types
-    cyrillic_count = len(re.findall(r'[а-яё]', text, re.IGNORECASE))
-    georgian_count = len(re.findall(r'[ა-ჰ]', text))
-    latin_count = len(re.findall(r'[a-z]', text, re.IGNORECASE))
+    # Count character types from the document's script histogram
+    histogram = document.script_histogram
+    cyrillic_count = histogram['cyrillic']
+    georgian_count = histogram['georgian']
+    latin_count = histogram['latin']
     
     total_chars = cyrillic_count + georgian_count + latin_count
     
@@ -74,7 +127,7 @@ def detect_language_fallback(text: str) -> str:
         return 'en'
     else:
         # Check for language-specific keywords
-        return detect_by_keywords(text)
+        return detect_by_keywords(document.text)
 
 def detect_by_keywords(text: str) -> str:
     """
@@ -1,6 +1,12 @@
 import os
+import re
+import time
 import logging
-from typing import Optional
+import zipfile
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from services.text_cache import get_text_cache, hash_file
 
 try:
     import PyPDF2
@@ -12,51 +18,323 @@ try:
 except ImportError:
     Document = None
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF file using PyPDF2."""
+# Bump when extraction output changes, so cached text is extracted again
+PARSER_VERSION = '3'
+
+class ExtractedText(NamedTuple):
+    """Text extracted from a document; ``truncated`` if an extraction budget was hit."""
+    text: str
+    truncated: bool = False
+
+# Budgets for PDF extraction, see configure_pdf_extraction
+_pdf_settings: Dict[str, Any] = {
+    'max_pages': 50,
+    'max_chars': 200_000,
+    'time_budget': 20.0,
+    'parallel_min_pages': 16,
+    'pages_per_task': 8,
+}
+
+def configure_pdf_extraction(max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                             time_budget: Optional[float] = None, parallel_min_pages: Optional[int] = None,
+                             pages_per_task: Optional[int] = None) -> None:
+    """
+    Configure PDF extraction budgets.
+
+    At most ``max_pages`` pages and ``max_chars`` characters are extracted,
+    within ``time_budget`` seconds. Documents of ``parallel_min_pages`` pages
+    or more are extracted ``pages_per_task`` pages at a time in the worker
+    pool, when one is available in this process. None keeps the current value.
+    """
+    for key, value in (('max_pages', max_pages), ('max_chars', max_chars),
+                       ('parallel_min_pages', parallel_min_pages), ('pages_per_task', pages_per_task)):
+        if value is not None:
+            _pdf_settings[key] = max(int(value), 1)
+    if time_budget is not None:
+        _pdf_settings['time_budget'] = max(float(time_budget), 0.0)
+
+def _read_pages(reader, start: int, stop: int, max_chars: int, deadline: float) -> Tuple[List[str], bool]:
+    """Extract pages ``start:stop``; the flag is False if a budget stopped extraction early."""
+    pages: List[str] = []
+    chars = 0
+    for index in range(start, stop):
+        if chars >= max_chars or time.monotonic() > deadline:
+            return pages, False
+        page_text = reader.pages[index].extract_text() or ""
+        pages.append(page_text)
+        chars += len(page_text)
+    return pages, True
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int, max_chars: int,
+                       time_budget: float) -> Tuple[List[str], bool]:
+    """Extract a range of pages in a pool worker."""
+    deadline = time.monotonic() + time_budget
+    with open(file_path, 'rb') as file:
+        return _read_pages(PyPDF2.PdfReader(file), start, stop, max_chars, deadline)
+
+def _read_pages_parallel(file_path: str, reader, page_count: int, max_chars: int,
+                         deadline: float) -> Tuple[List[str], bool]:
+    """
+    Extract pages in ranges spread over the worker pool.
+
+    Ranges run in pool workers, which are killed if a range is still running
+    at the deadline, so a single slow page cannot outlast the time budget.
+    Ranges the pool cannot take (saturated or unavailable) are extracted here,
+    where the deadline is only checked between pages. Pages are returned in
+    order, up to the first range that did not finish within the budget.
+    """
+    from services.worker_pool import abandon_task, submit_task
+
+    per_task = _pdf_settings['pages_per_task']
+    ranges = [(start, min(start + per_task, page_count)) for start in range(0, page_count, per_task)]
+
+    futures = {}
+    for page_range in ranges:
+        futures[page_range] = submit_task(
+            _extract_pdf_pages, file_path, *page_range, max_chars, max(deadline - time.monotonic(), 0)
+        )
+
+    results: Dict[Tuple[int, int], Tuple[List[str], bool]] = {}
+    for page_range in ranges:
+        if futures[page_range] is None:
+            results[page_range] = _read_pages(reader, *page_range, max_chars, deadline)
+
+    pages: List[str] = []
+    chars = 0
+    complete = True
+    for page_range in ranges:
+        if chars >= max_chars:
+            complete = False
+            break
+        if page_range not in results:
+            future = futures[page_range]
+            try:
+                results[page_range] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeoutError:
+                complete = False
+                break
+            except Exception as e:
+                logging.error(f"Error extracting PDF pages {page_range[0]}-{page_range[1]}: {str(e)}")
+                complete = False
+                break
+
+        range_pages, range_complete = results[page_range]
+        pages.extend(range_pages)
+        chars += sum(len(page) for page in range_pages)
+        if not range_complete:
+            complete = False
+            break
+
+    # Do not leave queued or stuck ranges behind once the result is decided
+    for future in futures.values():
+        if future is not None:
+            abandon_task(future)
+
+    return pages, complete
+
+def splits_pdf_extraction(file_path: str) -> bool:
+    """
+    Whether a file is a PDF long enough to be extracted in page ranges from this process.
+
+    Only the process owning the worker pool can spread the pages over it, so
+    callers extract such files themselves rather than in a single pool task.
+    """
+    from services.worker_pool import pool_enabled
+
+    if PyPDF2 is None or not file_path.lower().endswith('.pdf') or not pool_enabled():
+        return False
+    try:
+        with open(file_path, 'rb') as file:
+            page_count = len(PyPDF2.PdfReader(file).pages)
+    except Exception as e:
+        logging.error(f"Error reading PDF page count: {str(e)}")
+        return False
+    return min(page_count, _pdf_settings['max_pages']) >= _pdf_settings['parallel_min_pages']
+
+def extract_pdf(file_path: str) -> ExtractedText:
+    """
+    Extract text from a PDF file using PyPDF2, within the configured budgets.
+
+    Long documents are split over the worker pool when this process has one.
+    Returns the text of the pages extracted before a budget ran out, with
+    ``truncated`` set.
+    """
+    from services.worker_pool import pool_enabled
+
     if PyPDF2 is None:
         logging.error("PyPDF2 not available. Install with: pip install PyPDF2")
-        return ""
+        return ExtractedText("")
+    
+    max_chars = _pdf_settings['max_chars']
+    deadline = time.monotonic() + _pdf_settings['time_budget']
     
     try:
-        text = ""
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+            total_pages = len(pdf_reader.pages)
+            page_count = min(total_pages, _pdf_settings['max_pages'])
+            
+            if page_count >= _pdf_settings['parallel_min_pages'] and pool_enabled():
+                pages, complete = _read_pages_parallel(file_path, pdf_reader, page_count, max_chars, deadline)
+            else:
+                pages, complete = _read_pages(pdf_reader, 0, page_count, max_chars, deadline)
+        
+        text = "\n".join(pages)
+        truncated = not complete or page_count < total_pages or len(text) > max_chars
+        if truncated:
+            logging.warning(f"PDF extraction budget reached for {file_path}: "
+                            f"{len(pages)} of {total_pages} pages extracted")
+        return ExtractedText(text[:max_chars].strip(), truncated)
     except Exception as e:
         logging.error(f"Error extracting text from PDF: {str(e)}")
-        return ""
+        return ExtractedText("")
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """Extract text from PDF file using PyPDF2."""
+    return extract_pdf(file_path).text
+
+# WordprocessingML parts and tags read by the streaming DOCX extractor
+DOCX_BODY_PART = 'word/document.xml'
+DOCX_HEADER_FOOTER_PART = re.compile(r'^word/(header|footer)\d*\.xml$')
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+_DOCX_PARAGRAPH = _W + 'p'
+_DOCX_RUN = _W + 'r'
+_DOCX_TEXT = _W + 't'
+# Characters written as elements of a run (a w:tab outside one is a tab stop definition)
+_DOCX_CHARACTERS = {_W + 'tab': '\t', _W + 'ptab': '\t', _W + 'br': '\n', _W + 'cr': '\n',
+                    _W + 'noBreakHyphen': '-'}
+# Elements whose finished children can be dropped from memory
+_DOCX_CONTAINERS = {_W + 'body', _W + 'hdr', _W + 'ftr'}
+
+def _iter_docx_part_lines(part):
+    """
+    Yield the paragraphs of a WordprocessingML part as lines, streaming.
+
+    Covers paragraphs in tables and text boxes (a text box paragraph comes
+    before the paragraph anchoring it). The legacy copy of text boxes kept
+    for older readers (``mc:Fallback``) is skipped so text is not doubled.
+    """
+    open_elements = []
+    paragraphs = []  # Text pieces of the open (possibly nested) paragraphs
+    runs = []  # Number of open runs of each open paragraph
+    fallback_depth = 0
+
+    for event, elem in ElementTree.iterparse(part, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            if elem.tag == _MC_FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                pass
+            elif elem.tag == _DOCX_PARAGRAPH:
+                paragraphs.append([])
+                runs.append(0)
+            elif elem.tag == _DOCX_RUN and runs:
+                runs[-1] += 1
+            continue
+
+        open_elements.pop()
+        if elem.tag == _MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth or not paragraphs:
+            pass
+        elif elem.tag == _DOCX_RUN:
+            runs[-1] -= 1
+        elif elem.tag == _DOCX_TEXT:
+            if elem.text:
+                paragraphs[-1].append(elem.text)
+        elif elem.tag in _DOCX_CHARACTERS and runs[-1]:
+            paragraphs[-1].append(_DOCX_CHARACTERS[elem.tag])
+        elif elem.tag == _DOCX_PARAGRAPH:
+            runs.pop()
+            yield ''.join(paragraphs.pop())
+
+        # Finished top-level blocks are not needed any more
+        if open_elements and open_elements[-1].tag in _DOCX_CONTAINERS:
+            open_elements[-1].clear()
+
+def _docx_part_order(name: str) -> tuple:
+    # Headers first, then the body, then footers, like the printed page
+    kind = 0 if 'header' in name else 2 if 'footer' in name else 1
+    return kind, name
+
+def stream_docx_text(file_path: str) -> str:
+    """Extract text from the body, headers and footers of a DOCX file, read straight from the zip."""
+    lines = []
+    with zipfile.ZipFile(file_path) as archive:
+        names = [name for name in archive.namelist()
+                 if name == DOCX_BODY_PART or DOCX_HEADER_FOOTER_PART.match(name)]
+        if DOCX_BODY_PART not in names:
+            raise ValueError(f"Not a Word document: {DOCX_BODY_PART} is missing")
+        for name in sorted(names, key=_docx_part_order):
+            with archive.open(name) as part:
+                lines.extend(_iter_docx_part_lines(part))
+    return "\n".join(lines).strip()
 
 def extract_text_from_docx(file_path: str) -> str:
-    """Extract text from DOCX file using python-docx."""
+    """Extract text from DOCX file, falling back to python-docx if streaming fails."""
+    try:
+        return stream_docx_text(file_path)
+    except Exception as e:
+        logging.warning(f"Streaming DOCX extraction failed, using python-docx: {str(e)}")
+    
     if Document is None:
         logging.error("python-docx not available. Install with: pip install python-docx")
         return ""
     
     try:
         doc = Document(file_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
     except Exception as e:
         logging.error(f"Error extracting text from DOCX: {str(e)}")
         return ""
 
-def extract_text_from_file(file_path: str) -> str:
-    """Extract text from file based on extension."""
-    if not os.path.exists(file_path):
-        logging.error(f"File not found: {file_path}")
-        return ""
-    
+def _extract_text(file_path: str) -> ExtractedText:
     file_ext = os.path.splitext(file_path)[1].lower()
     
     if file_ext == '.pdf':
-        return extract_text_from_pdf(file_path)
+        return extract_pdf(file_path)
     elif file_ext == '.docx':
-        return extract_text_from_docx(file_path)
+        return ExtractedText(extract_text_from_docx(file_path))
     else:
         logging.error(f"Unsupported file type: {file_ext}")
-        return ""
+        return ExtractedText("")
+
+def lookup_extracted_text(content_hash: str) -> Optional[str]:
+    """Text previously extracted from a document with this content hash, if cached."""
+    cache = get_text_cache()
+    if cache is None:
+        return None
+    return cache.get(content_hash, PARSER_VERSION)
+
+def extract_text(file_path: str, content_hash: Optional[str] = None) -> ExtractedText:
+    """
+    Extract text from file based on extension, reporting whether it was truncated.
+
+    Uses the extracted-text cache when it is enabled; ``content_hash`` saves
+    hashing the file when the caller already knows it. Truncated and empty
+    results are not cached, as they can come from a busy or failing worker.
+    """
+    if not os.path.exists(file_path):
+        logging.error(f"File not found: {file_path}")
+        return ExtractedText("")
+    
+    cache = get_text_cache()
+    if cache is None:
+        return _extract_text(file_path)
+    
+    content_hash = content_hash or hash_file(file_path)
+    cached_text = cache.get(content_hash, PARSER_VERSION)
+    if cached_text is not None:
+        return ExtractedText(cached_text)
+    
+    result = _extract_text(file_path)
+    if result.text and not result.truncated:
+        cache.put(content_hash, PARSER_VERSION, result.text)
+    return result
+
+def extract_text_from_file(file_path: str, content_hash: Optional[str] = None) -> str:
+    """Extract text from file based on extension."""
+    return extract_text(file_path, content_hash).text
@@ -1,8 +1,17 @@
 import os
 import json
+import html
 import logging
-from typing import Optional
-from flask import current_app
+import tempfile
+import zipfile
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from services.worker_pool import pool_enabled, submit_background_task
 
 try:
     from reportlab.lib.pagesizes import letter, A4
@@ -24,159 +33,387 @@ except ImportError:
     colors = None
     SimpleDocTemplate = None
 
-def generate_pdf_report(analysis) -> Optional[str]:
-    """Generate a PDF report for resume analysis."""
+# Bump when the report layout changes; stored reports of other versions are not served
+REPORT_TEMPLATE_VERSION = '1'
+# Seconds a download waits for a report already being generated before building it itself
+REPORT_WAIT_TIMEOUT = 30
+# Reports waiting for a background slot of the worker pool; beyond this, the oldest are
+# left to be built when downloaded
+REPORT_QUEUE_SIZE = 200
+
+_reports_folder: Optional[str] = None
+_pending: Dict[int, Future] = {}
+_queued: 'deque[Dict[str, Any]]' = deque(maxlen=REPORT_QUEUE_SIZE)
+# Reentrant: a report's done callback starts the next queued one
+_pending_lock = threading.RLock()
+
+def configure_reports(folder: Optional[str]) -> None:
+    """Store generated reports in ``folder``."""
+    global _reports_folder
+    _reports_folder = folder or None
+    if _reports_folder:
+        os.makedirs(_reports_folder, exist_ok=True)
+
+def report_path(analysis_id: int, extension: str = 'pdf') -> str:
+    """Stored report of an analysis, for the current report template version."""
+    if _reports_folder is None:
+        raise RuntimeError("Reports folder is not configured")
+    filename = f"resume_report_{analysis_id}_v{REPORT_TEMPLATE_VERSION}.{extension}"
+    return os.path.join(_reports_folder, filename)
+
+def find_report(analysis_id: int) -> Optional[str]:
+    """The stored report of an analysis (PDF, or the HTML fallback), None if not generated yet."""
+    for extension in ('pdf', 'html'):
+        path = report_path(analysis_id, extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def report_data(analysis) -> Dict[str, Any]:
+    """Everything a report shows, parsed once, as a plain picklable dict."""
+    return {
+        'id': analysis.id,
+        'ats_score': analysis.ats_score,
+        'skills': json.loads(analysis.extracted_skills) if analysis.extracted_skills else {'technical': [], 'soft': []},
+        'missing_keywords': json.loads(analysis.missing_keywords) if analysis.missing_keywords else [],
+        'suggestions': json.loads(analysis.suggestions) if analysis.suggestions else [],
+        'job_description': analysis.job_description or '',
+        'analysis_time': analysis.analysis_time.strftime('%Y-%m-%d %H:%M:%S') if analysis.analysis_time else '',
+    }
+
+def _write_atomically(path: str, write) -> None:
+    # Readers never see a partly written report
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
     try:
-        report_filename = f"resume_report_{analysis.id}.pdf"
-        report_path = os.path.join(current_app.config['REPORTS_FOLDER'], report_filename)
-        
-        if not REPORTLAB_AVAILABLE:
-            # Generate HTML report instead
-            return generate_html_report(analysis)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(report_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
+        with os.fdopen(fd, 'wb') as file:
+            write(file)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+@lru_cache(maxsize=1)
+def _report_styles() -> Dict[str, Any]:
+    """The report's paragraph styles, built once per process."""
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
             fontSize=24,
             spaceAfter=30,
             alignment=TA_CENTER,
             textColor=colors.darkblue
-        )
-        story.append(Paragraph("Resume Analysis Report", title_style))
-        story.append(Spacer(1, 20))
-        
-        # ATS Score section
-        ats_style = ParagraphStyle(
+        ),
+        'ats': ParagraphStyle(
             'ATSScore',
             parent=styles['Heading2'],
             fontSize=18,
             spaceAfter=15,
             textColor=colors.darkgreen
-        )
-        story.append(Paragraph(f"ATS Score: {analysis.ats_score}%", ats_style))
+        ),
+        'heading': styles['Heading2'],
+        'normal': styles['Normal'],
+    }
+
+def _build_pdf(data: Dict[str, Any], path: str) -> None:
+    styles = _report_styles()
+    story = []
+
+    # Title
+    story.append(Paragraph("Resume Analysis Report", styles['title']))
+    story.append(Spacer(1, 20))
+
+    # ATS Score section
+    story.append(Paragraph(f"ATS Score: {data['ats_score']}%", styles['ats']))
+    story.append(Spacer(1, 15))
+
+    # Skills section
+    story.append(Paragraph("Extracted Skills", styles['heading']))
+    skills = data['skills']
+
+    if skills.get('technical'):
+        story.append(Paragraph("<b>Technical Skills:</b>", styles['normal']))
+        story.append(Paragraph(escape(", ".join(skills['technical'])), styles['normal']))
+        story.append(Spacer(1, 10))
+
+    if skills.get('soft'):
+        story.append(Paragraph("<b>Soft Skills:</b>", styles['normal']))
+        story.append(Paragraph(escape(", ".join(skills['soft'])), styles['normal']))
         story.append(Spacer(1, 15))
-        
-        # Skills section
-        story.append(Paragraph("Extracted Skills", styles['Heading2']))
-        skills = json.loads(analysis.extracted_skills) if analysis.extracted_skills else {'technical': [], 'soft': []}
-        
-        if skills.get('technical'):
-            story.append(Paragraph("<b>Technical Skills:</b>", styles['Normal']))
-            tech_skills_text = ", ".join(skills['technical'])
-            story.append(Paragraph(tech_skills_text, styles['Normal']))
-            story.append(Spacer(1, 10))
-        
-        if skills.get('soft'):
-            story.append(Paragraph("<b>Soft Skills:</b>", styles['Normal']))
-            soft_skills_text = ", ".join(skills['soft'])
-            story.append(Paragraph(soft_skills_text, styles['Normal']))
-            story.append(Spacer(1, 15))
-        
-        # Missing keywords section
-        missing_keywords = json.loads(analysis.missing_keywords) if analysis.missing_keywords else []
-        if missing_keywords:
-            story.append(Paragraph("Missing Keywords", styles['Heading2']))
-            missing_text = ", ".join(missing_keywords[:10])  # Limit to first 10
-            story.append(Paragraph(missing_text, styles['Normal']))
-            story.append(Spacer(1, 15))
-        
-        # Suggestions section
-        suggestions = json.loads(analysis.suggestions) if analysis.suggestions else []
-        if suggestions:
-            story.append(Paragraph("LinkedIn Headline Suggestions", styles['Heading2']))
-            for i, suggestion in enumerate(suggestions, 1):
-                story.append(Paragraph(f"{i}. {suggestion}", styles['Normal']))
-            story.append(Spacer(1, 15))
-        
-        # Job description section (if provided)
-        if analysis.job_description:
-            story.append(Paragraph("Job Description Used", styles['Heading2']))
-            job_desc_text = analysis.job_description[:500] + "..." if len(analysis.job_description) > 500 else analysis.job_description
-            story.append(Paragraph(job_desc_text, styles['Normal']))
-        
-        # Build PDF
-        doc.build(story)
-        
-        return report_path
-        
-    except Exception as e:
-        logging.error(f"Error generating PDF report: {str(e)}")
-        # Fallback to HTML report
-        return generate_html_report(analysis)
 
-def generate_html_report(analysis) -> Optional[str]:
-    """Generate an HTML report as fallback when PDF generation fails."""
+    # Missing keywords section
+    if data['missing_keywords']:
+        story.append(Paragraph("Missing Keywords", styles['heading']))
+        story.append(Paragraph(escape(", ".join(data['missing_keywords'][:10])), styles['normal']))  # Limit to first 10
+        story.append(Spacer(1, 15))
+
+    # Suggestions section
+    if data['suggestions']:
+        story.append(Paragraph("LinkedIn Headline Suggestions", styles['heading']))
+        for i, suggestion in enumerate(data['suggestions'], 1):
+            story.append(Paragraph(f"{i}. {escape(suggestion)}", styles['normal']))
+        story.append(Spacer(1, 15))
+
+    # Job description section (if provided)
+    job_description = data['job_description']
+    if job_description:
+        story.append(Paragraph("Job Description Used", styles['heading']))
+        job_desc_text = job_description[:500] + "..." if len(job_description) > 500 else job_description
+        story.append(Paragraph(escape(job_desc_text), styles['normal']))
+
+    _write_atomically(path, lambda file: SimpleDocTemplate(file, pagesize=letter).build(story))
+
+def _build_html(data: Dict[str, Any], path: str) -> None:
+    skills = data['skills']
+    missing_keywords = [html.escape(keyword) for keyword in data['missing_keywords']]
+    suggestions = [html.escape(suggestion) for suggestion in data['suggestions']]
+    job_description = data['job_description']
+    job_desc_text = html.escape(job_description[:500] + "..." if len(job_description) > 500 else job_description)
+    technical = html.escape(", ".join(skills.get("technical", [])))
+    soft = html.escape(", ".join(skills.get("soft", [])))
+
+    html_content = f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Resume Analysis Report</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }}
+            .header {{ text-align: center; color: #1e40af; margin-bottom: 30px; }}
+            .score {{ font-size: 24px; color: #059669; font-weight: bold; margin: 20px 0; }}
+            .section {{ margin: 20px 0; }}
+            .section h2 {{ color: #374151; border-bottom: 2px solid #e5e7eb; padding-bottom: 5px; }}
+            .skills {{ background: #f3f4f6; padding: 15px; border-radius: 5px; margin: 10px 0; }}
+            .suggestion {{ background: #eff6ff; padding: 10px; margin: 5px 0; border-left: 4px solid #3b82f6; }}
+            .keywords {{ color: #dc2626; }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Resume Analysis Report</h1>
+            <div class="score">ATS Score: {data['ats_score']}%</div>
+        </div>
+
+        <div class="section">
+            <h2>Extracted Skills</h2>
+            {f'<div class="skills"><strong>Technical Skills:</strong> {technical}</div>' if technical else ''}
+            {f'<div class="skills"><strong>Soft Skills:</strong> {soft}</div>' if soft else ''}
+        </div>
+
+        {f'''<div class="section">
+            <h2>Missing Keywords</h2>
+            <div class="keywords">{", ".join(missing_keywords[:15])}</div>
+        </div>''' if missing_keywords else ''}
+
+        {f'''<div class="section">
+            <h2>LinkedIn Headline Suggestions</h2>
+            {"".join([f'<div class="suggestion">{i}. {suggestion}</div>' for i, suggestion in enumerate(suggestions, 1)])}
+        </div>''' if suggestions else ''}
+
+        {f'''<div class="section">
+            <h2>Job Description Used</h2>
+            <p>{job_desc_text}</p>
+        </div>''' if job_description else ''}
+
+        <div class="section">
+            <small>Report generated on {data['analysis_time']}</small>
+        </div>
+    </body>
+    </html>
+    """
+
+    _write_atomically(path, lambda file: file.write(html_content.encode('utf-8')))
+
+def render_report(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Build and store the report of an analysis (see report_data), returning its path.
+
+    Writes a PDF, or an HTML report when ReportLab is not installed or fails.
+    Runs in pool workers as well as in the web process.
+    """
+    if REPORTLAB_AVAILABLE:
+        try:
+            path = report_path(data['id'], 'pdf')
+            _build_pdf(data, path)
+            return path
+        except Exception as e:
+            logging.error(f"Error generating PDF report: {str(e)}")
+
+    # Fallback to HTML report
     try:
-        report_filename = f"resume_report_{analysis.id}.html"
-        report_path = os.path.join(current_app.config['REPORTS_FOLDER'], report_filename)
-        
-        skills = json.loads(analysis.extracted_skills) if analysis.extracted_skills else {'technical': [], 'soft': []}
-        missing_keywords = json.loads(analysis.missing_keywords) if analysis.missing_keywords else []
-        suggestions = json.loads(analysis.suggestions) if analysis.suggestions else []
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Resume Analysis Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto; padding: 20px; }}
-                .header {{ text-align: center; color: #1e40af; margin-bottom: 30px; }}
-                .score {{ font-size: 24px; color: #059669; font-weight: bold; margin: 20px 0; }}
-                .section {{ margin: 20px 0; }}
-                .section h2 {{ color: #374151; border-bottom: 2px solid #e5e7eb; padding-bottom: 5px; }}
-                .skills {{ background: #f3f4f6; padding: 15px; border-radius: 5px; margin: 10px 0; }}
-                .suggestion {{ background: #eff6ff; padding: 10px; margin: 5px 0; border-left: 4px solid #3b82f6; }}
-                .keywords {{ color: #dc2626; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>Resume Analysis Report</h1>
-                <div class="score">ATS Score: {analysis.ats_score}%</div>
-            </div>
-            
-            <div class="section">
-                <h2>Extracted Skills</h2>
-                {f'<div class="skills"><strong>Technical Skills:</strong> {", ".join(skills.get("technical", []))}</div>' if skills.get("technical") else ''}
-                {f'<div class="skills"><strong>Soft Skills:</strong> {", ".join(skills.get("soft", []))}</div>' if skills.get("soft") else ''}
-            </div>
-            
-            {f'''<div class="section">
-                <h2>Missing Keywords</h2>
-                <div class="keywords">{", ".join(missing_keywords[:15])}</div>
-            </div>''' if missing_keywords else ''}
-            
-            {f'''<div class="section">
-                <h2>LinkedIn Headline Suggestions</h2>
-                {"".join([f'<div class="suggestion">{i}. {suggestion}</div>' for i, suggestion in enumerate(suggestions, 1)])}
-            </div>''' if suggestions else ''}
-            
-            {f'''<div class="section">
-                <h2>Job Description Used</h2>
-                <p>{analysis.job_description[:500] + "..." if len(analysis.job_description) > 500 else analysis.job_description}</p>
-            </div>''' if analysis.job_description else ''}
-            
-            <div class="section">
-                <small>Report generated on {analysis.analysis_time.strftime('%Y-%m-%d %H:%M:%S')}</small>
-            </div>
-        </body>
-        </html>
-        """
-        
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        return report_path
-        
+        path = report_path(data['id'], 'html')
+        _build_html(data, path)
+        return path
     except Exception as e:
         logging.error(f"Error generating HTML report: {str(e)}")
         return None
+
+def _render_into(future: Future, data: Dict[str, Any]) -> None:
+    try:
+        future.set_result(render_report(data))
+    except BaseException as e:
+        future.set_exception(e)
+
+def _start_report(data: Dict[str, Any]) -> bool:
+    """
+    Start generating a report in a background slot of the worker pool, or in a
+    thread when there is no pool. False if every background slot is taken.
+    """
+    future = submit_background_task(render_report, data)
+    if future is None:
+        if pool_enabled():
+            return False
+        future = Future()
+        threading.Thread(target=_render_into, args=(future, data), name=f"report-{data['id']}", daemon=True).start()
+    _pending[data['id']] = future
+    future.add_done_callback(lambda _: _report_done(data['id'], future))
+    return True
+
+def schedule_report(analysis) -> None:
+    """
+    Generate an analysis' report in the background.
+
+    Reports have their own slots in the worker pool, so they never take an
+    upload's; when those are all taken, the report waits for one in a queue.
+    Without a pool, it is generated in a thread of this process.
+    """
+    # Read once: the callback below runs after the instance has left its session
+    analysis_id = analysis.id
+    if _reports_folder is None or find_report(analysis_id):
+        return
+    data = report_data(analysis)
+    with _pending_lock:
+        if analysis_id in _pending or any(queued['id'] == analysis_id for queued in _queued):
+            return
+        if not _start_report(data):
+            _queued.append(data)
+
+def _report_done(analysis_id: int, future: Future) -> None:
+    with _pending_lock:
+        if _pending.get(analysis_id) is future:
+            del _pending[analysis_id]
+        # The freed slot goes to the next queued report still missing
+        while _queued:
+            data = _queued.popleft()
+            if data['id'] in _pending or find_report(data['id']):
+                continue
+            if not _start_report(data):
+                _queued.appendleft(data)
+            break
+
+def generate_pdf_report(analysis) -> Optional[str]:
+    """
+    Path of the report of an analysis.
+
+    Served from the report store when it was generated before; waits for a
+    background generation in progress, otherwise builds the report now.
+    """
+    path = find_report(analysis.id)
+    if path:
+        return path
+
+    with _pending_lock:
+        future = _pending.get(analysis.id)
+    if future is not None:
+        try:
+            path = future.result(timeout=REPORT_WAIT_TIMEOUT)
+            if path:
+                return path
+        except Exception as e:
+            logging.error(f"Background report generation failed: {str(e)}")
+
+    return render_report(report_data(analysis))
+
+def render_reports(reports: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, Optional[str]]]:
+    """
+    Yield ``(analysis_id, path)`` for several analyses (see report_data) as
+    their reports become available; ``path`` is None if generation failed.
+
+    Stored reports come first. Missing ones are rendered in the worker pool,
+    as many at a time as its background slots allow, and yielded in order of
+    completion;
+    when the pool has no room and nothing is in flight, one is rendered here.
+    """
+    waiting: List[Dict[str, Any]] = []
+    in_flight: Dict[Future, int] = {}
+    for data in reports:
+        path = find_report(data['id'])
+        if path:
+            yield data['id'], path
+            continue
+        with _pending_lock:
+            future = _pending.get(data['id'])
+        if future is not None:
+            # Already being generated in the background
+            in_flight[future] = data['id']
+        else:
+            waiting.append(data)
+
+    waiting.reverse()
+    while waiting or in_flight:
+        while waiting:
+            future = submit_background_task(render_report, waiting[-1])
+            if future is None:
+                break
+            in_flight[future] = waiting.pop()['id']
+
+        if not in_flight:
+            data = waiting.pop()
+            yield data['id'], render_report(data)
+            continue
+
+        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+        for future in done:
+            analysis_id = in_flight.pop(future)
+            try:
+                yield analysis_id, future.result()
+            except Exception as e:
+                logging.error(f"Error generating report {analysis_id}: {str(e)}")
+                yield analysis_id, None
+
+class _ZipStream:
+    """Write-only file object collecting what ZipFile writes, to be drained in chunks."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_reports_zip(reports: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    A ZIP archive of the reports of several analyses, produced in pieces.
+
+    Each report is added as soon as it is available (see render_reports)
+    and its bytes are yielded right away, so neither the archive nor the
+    reports are held in memory at once. Failed reports are listed in
+    ``errors.txt``.
+    """
+    stream = _ZipStream()
+    failed: List[int] = []
+    # Not seekable: ZipFile writes sizes after each entry instead of going back
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for analysis_id, path in render_reports(reports):
+            if path is None:
+                failed.append(analysis_id)
+                continue
+            extension = os.path.splitext(path)[1]
+            archive.write(path, arcname=f"resume_analysis_report_{analysis_id}{extension}")
+            yield stream.drain()
+        if failed:
+            archive.writestr('errors.txt', ''.join(f"Could not generate the report of analysis {analysis_id}\n"
+                                                   for analysis_id in failed))
+    yield stream.drain()
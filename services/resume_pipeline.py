@@ -0,0 +1,68 @@
+from typing import Any, Callable, Dict, Optional
+from services.parser import extract_text, splits_pdf_extraction
+from services.worker_pool import run_task
+from services.language_detector import detect_language
+from services.ats_engine import analyze_resume, extract_index_terms
+from services.text_normalizer import NormalizedDocument
+
+def process_resume_file(file_path: str, job_description: str = "",
+                        progress: Optional[Callable[[str], None]] = None,
+                        text_content: Optional[str] = None, language: Optional[str] = None,
+                        content_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract, detect the language of and analyze a resume file.
+
+    Runs every CPU-bound step of an upload in one call, so it can be handed to
+    a pool worker as a single task. Does not touch the database. ``progress``,
+    if given, is called with the name of each stage as it starts. ``analysis``
+    is None when no text could be extracted. ``text_content`` and ``language``
+    reuse the results of an earlier upload of the same file; ``content_hash``
+    is the file's SHA-256, if known, for the extracted-text cache. ``truncated`` is
+    set when extraction stopped at a budget and only part of the file was read.
+    """
+    report = progress or (lambda stage: None)
+    
+    report('parsing')
+    truncated = False
+    if text_content is None:
+        text_content, truncated = extract_text(file_path, content_hash)
+    if not text_content.strip():
+        return {'text_content': text_content, 'language': None, 'analysis': None, 'index_terms': {},
+                'truncated': truncated}
+    
+    # Normalize the resume once for language detection, analysis and indexing
+    document = NormalizedDocument(text_content)
+    
+    report('language')
+    if language is None:
+        language = detect_language(document)
+    
+    report('scoring')
+    analysis = analyze_resume(document, NormalizedDocument(job_description), language)
+    
+    return {
+        'text_content': text_content,
+        'language': language,
+        'analysis': analysis,
+        'index_terms': dict(extract_index_terms(document, language)),
+        'truncated': truncated,
+    }
+
+def process_resume_upload(file_path: str, job_description: str = "", text_content: Optional[str] = None,
+                          language: Optional[str] = None, content_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run :func:`process_resume_file` for an upload in the worker pool.
+
+    Long PDFs are extracted here first, so their pages can be spread over the
+    pool (a pool worker cannot submit tasks of its own); everything else is a
+    single pool task. Raises TaskTimeoutError when that task runs out of time.
+    """
+    truncated = False
+    if text_content is None and splits_pdf_extraction(file_path):
+        text_content, truncated = extract_text(file_path, content_hash)
+    processed = run_task(
+        process_resume_file, file_path, job_description,
+        text_content=text_content, language=language, content_hash=content_hash
+    )
+    processed['truncated'] = processed['truncated'] or truncated
+    return processed
@@ -0,0 +1,149 @@
+import math
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import load_only, selectinload
+
+from app import db
+from models import Resume, ResumeTerm
+from services.ats_engine import MAX_INDEX_TERM_LENGTH, extract_index_terms, extract_job_keywords
+from services.text_normalizer import NormalizedDocument, as_document
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_SEARCH_RESULTS = 100
+
+def index_resume(resume: Resume, document: Union[str, NormalizedDocument, None] = None,
+                 frequencies: Optional[Dict[str, int]] = None) -> int:
+    """
+    Add (or replace) a resume's postings in the search index.
+
+    Term frequencies are computed from ``document`` (or the stored text) unless
+    they were already computed, e.g. by a pool worker. The resume must have an
+    id (flushed). The caller commits the session. Returns the number of
+    distinct terms indexed.
+    """
+    if frequencies is None:
+        document = as_document(document if document is not None else resume.text_content)
+        frequencies = extract_index_terms(document, resume.language or 'en')
+
+    ResumeTerm.query.filter_by(resume_id=resume.id).delete(synchronize_session=False)
+    db.session.bulk_insert_mappings(ResumeTerm, [
+        {'term': term, 'resume_id': resume.id, 'term_frequency': count}
+        for term, count in frequencies.items()
+    ])
+    resume.indexed_length = sum(frequencies.values())
+    return len(frequencies)
+
+def reindex_resumes(batch_size: int = 200, only_missing: bool = True) -> int:
+    """Index stored resumes in batches (e.g. after enabling search on an existing database)."""
+    query = Resume.query.options(selectinload(Resume.stored_text)).order_by(Resume.id)
+    if only_missing:
+        query = query.filter(Resume.indexed_length.is_(None))
+
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = query.filter(Resume.id > last_id).limit(batch_size).all()
+        if not batch:
+            break
+        for resume in batch:
+            index_resume(resume)
+        db.session.commit()
+        indexed += len(batch)
+        last_id = batch[-1].id
+    return indexed
+
+def search_resumes(job_description: Union[str, NormalizedDocument], language: str = 'en',
+                   limit: int = 20, user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Rank indexed resumes against a job description with BM25.
+
+    Query terms are the job description's keywords. Document frequencies come
+    from the posting lists of those terms only, and the scoring itself runs as a
+    single aggregate query, so cost grows with the postings of the query terms
+    rather than with the number of stored resumes. With a ``user_id``, only
+    that user's resumes are ranked (term statistics stay corpus-wide).
+    """
+    terms = [term for term in extract_job_keywords(job_description, language) if len(term) <= MAX_INDEX_TERM_LENGTH]
+    if not terms:
+        return []
+    limit = max(1, min(int(limit), MAX_SEARCH_RESULTS))
+
+    total_documents, average_length = db.session.query(
+        func.count(Resume.id), func.avg(Resume.indexed_length)
+    ).filter(Resume.indexed_length.isnot(None)).one()
+    if not total_documents:
+        return []
+    average_length = float(average_length or 0) or 1.0
+
+    document_frequencies = dict(
+        db.session.query(ResumeTerm.term, func.count(ResumeTerm.resume_id))
+        .filter(ResumeTerm.term.in_(terms))
+        .group_by(ResumeTerm.term)
+        .all()
+    )
+    if not document_frequencies:
+        return []
+
+    idf = {
+        term: math.log(1 + (total_documents - frequency + 0.5) / (frequency + 0.5))
+        for term, frequency in document_frequencies.items()
+    }
+
+    term_frequency = ResumeTerm.term_frequency
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * Resume.indexed_length / average_length)
+    term_score = case(idf, value=ResumeTerm.term, else_=0.0) * term_frequency * (BM25_K1 + 1) / (term_frequency + length_norm)
+    score = func.sum(term_score).label('score')
+
+    postings = (
+        db.session.query(ResumeTerm.resume_id, score)
+        .join(Resume, Resume.id == ResumeTerm.resume_id)
+        .filter(ResumeTerm.term.in_(list(idf)))
+    )
+    if user_id is not None:
+        postings = postings.filter(Resume.user_id == user_id)
+    ranked = (
+        postings
+        .group_by(ResumeTerm.resume_id)
+        .order_by(score.desc(), ResumeTerm.resume_id)
+        .limit(limit)
+        .all()
+    )
+    if not ranked:
+        return []
+
+    resume_ids = [resume_id for resume_id, _ in ranked]
+    matched_terms: Dict[int, List[str]] = {}
+    for resume_id, term in (db.session.query(ResumeTerm.resume_id, ResumeTerm.term)
+                            .filter(ResumeTerm.resume_id.in_(resume_ids), ResumeTerm.term.in_(list(idf)))):
+        matched_terms.setdefault(resume_id, []).append(term)
+
+    resumes = {
+        resume.id: resume
+        for resume in Resume.query.options(
+            load_only(Resume.id, Resume.original_filename, Resume.language, Resume.upload_time)
+        ).filter(Resume.id.in_(resume_ids))
+    }
+
+    results = []
+    for resume_id, resume_score in ranked:
+        resume = resumes.get(resume_id)
+        if resume is None:
+            continue
+        # Report matched terms in query order
+        matched = set(matched_terms.get(resume_id, []))
+        results.append({
+            'resume_id': resume_id,
+            'original_filename': resume.original_filename,
+            'language': resume.language,
+            'upload_time': resume.upload_time.isoformat() if resume.upload_time else None,
+            'score': round(float(resume_score), 4),
+            'matched_terms': [term for term in terms if term in matched],
+        })
+
+    logging.debug(f"BM25 search over {total_documents} resumes with {len(idf)} terms")
+    return results
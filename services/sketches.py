@@ -0,0 +1,191 @@
+import math
+import random
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max of a stream of numbers.
+
+    Batches are folded in with Chan et al.'s pairwise form of Welford's
+    algorithm, so the result is numerically stable and needs O(1) memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values (without NaN)."""
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        batch_min, batch_max = float(values.min()), float(values.max())
+
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = batch_min if self.min is None else min(self.min, batch_min)
+        self.max = batch_max if self.max is None else max(self.max, batch_max)
+
+    def std(self) -> Optional[float]:
+        """Sample standard deviation (ddof=1), like pandas."""
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty) over a stream of numbers.
+
+    Keeps O(k log n) values; rank error is about 1.7/k with high probability.
+    Exact while the stream fits in the first compactor.
+    """
+
+    def __init__(self, k: int = 256, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values (without NaN)."""
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], np.asarray(values, dtype=np.float64)])
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays at this level
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._random.randint(0, 1)::2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, qs: Sequence[float], interpolate: bool = True) -> List[Optional[float]]:
+        """
+        Approximate quantiles, interpolated between neighbours like numpy's default.
+
+        ``interpolate=False`` returns the retained item of nearest rank instead:
+        interpolating between sampled items of a discrete column (integers,
+        booleans) gives values the column never takes.
+        """
+        if self.count == 0:
+            return [None for _ in qs]
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.float64)
+                                  for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+
+        # Position of each retained value in the full (virtual) sorted stream
+        positions = np.cumsum(weights) - (weights + 1) / 2
+        total = weights.sum()
+        if interpolate:
+            return [float(np.interp(q * (total - 1), positions, values)) for q in qs]
+        return [float(values[np.abs(positions - q * (total - 1)).argmin()]) for q in qs]
+
+class DistinctCounter:
+    """
+    Number of distinct values in a stream: exact while small, then HyperLogLog.
+
+    Values are hashed with ``pandas.util.hash_array``. The exact set of hashes
+    is kept until it exceeds the size of the HyperLogLog registers
+    (``2 ** precision`` bytes), so low-cardinality columns are counted exactly.
+    """
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self._exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+        self._registers: Optional[np.ndarray] = None
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a batch of values (without missing values)."""
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        if self._exact is not None:
+            self._exact = np.union1d(self._exact, hashes)
+            if len(self._exact) <= 2 ** self.precision:
+                return
+            hashes, self._exact = self._exact, None
+            self._registers = np.zeros(2 ** self.precision, dtype=np.uint8)
+        self._add_to_registers(hashes)
+
+    def _add_to_registers(self, hashes: np.ndarray) -> None:
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Rank: position of the first 1 bit in the remaining 64 - p bits
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        bit_length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (64 - p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self._registers, index, rank)
+
+    def count(self) -> int:
+        if self._exact is not None:
+            return int(len(self._exact))
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self._registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self._registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+class FrequentItems:
+    """
+    Misra-Gries summary of the most frequent values of a stream.
+
+    Keeps at most ``capacity`` counters. Counts are exact while the stream has
+    no more than ``capacity`` distinct values, otherwise they are lower bounds
+    off by at most n / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._counts: Optional[pd.Series] = None
+
+    def update(self, counts: pd.Series) -> None:
+        """Merge a batch's exact value counts."""
+        if self._counts is None:
+            merged = counts
+        else:
+            # Keeps values in order of first appearance, for stable ties
+            merged = pd.concat([self._counts, counts]).groupby(level=0, sort=False).sum()
+        if len(merged) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            threshold = merged.nlargest(self.capacity + 1).iloc[-1]
+            merged = merged[merged > threshold] - threshold
+        self._counts = merged
+
+    def most_common(self, n: int) -> List[tuple]:
+        if self._counts is None:
+            return []
+        top = self._counts.sort_values(ascending=False, kind='stable').head(n)
+        return list(top.items())
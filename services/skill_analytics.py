@@ -0,0 +1,204 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import exists, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+
+from app import db
+from models import Analysis, AnalysisKeyword, AnalysisSkill, Resume, Skill
+
+SKILL_KINDS = ('technical', 'soft')
+# Keyword status -> key of the analysis result listing those keywords
+KEYWORD_STATUSES = {'matched': 'matched_keywords', 'missing': 'missing_keywords'}
+
+MAX_SKILL_NAME_LENGTH = 100
+MAX_ANALYTICS_RESULTS = 100
+# Names per IN clause, well below SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+def skill_name(label: str) -> str:
+    """Lookup key of a skill or keyword: 'Python' and 'python' are the same skill."""
+    return ' '.join(str(label).split()).lower()
+
+def analysis_labels(result: Dict[str, Any]) -> List[str]:
+    """Skills and keywords of an analysis result, as displayed."""
+    skills = result.get('skills') or {}
+    labels = [label for kind in SKILL_KINDS for label in skills.get(kind, [])] if isinstance(skills, dict) else []
+    for key in KEYWORD_STATUSES.values():
+        labels.extend(result.get(key) or [])
+    return labels
+
+def _lookup_ids(names: List[str]) -> Dict[str, int]:
+    ids = {}
+    for start in range(0, len(names), LOOKUP_CHUNK_SIZE):
+        chunk = names[start:start + LOOKUP_CHUNK_SIZE]
+        ids.update(db.session.query(Skill.name, Skill.id).filter(Skill.name.in_(chunk)).all())
+    return ids
+
+def skill_ids(labels: Iterable[str]) -> Dict[str, int]:
+    """
+    Ids of skills by lookup name, adding the ones not stored yet.
+
+    New skills are committed right away, so call this before adding rows that
+    reference them. Names longer than a skill can be are left out.
+    """
+    labels_by_name = {}
+    for label in labels:
+        name = skill_name(label)
+        if name and len(name) <= MAX_SKILL_NAME_LENGTH:
+            labels_by_name.setdefault(name, ' '.join(str(label).split()))
+    if not labels_by_name:
+        return {}
+
+    ids = _lookup_ids(list(labels_by_name))
+    new_names = [name for name in labels_by_name if name not in ids]
+    if new_names:
+        try:
+            db.session.bulk_insert_mappings(Skill, [
+                {'name': name, 'label': labels_by_name[name]} for name in new_names
+            ])
+            db.session.commit()
+        except IntegrityError:
+            # Some were added concurrently: read them back below
+            db.session.rollback()
+        ids.update(_lookup_ids(new_names))
+    return ids
+
+def add_analysis_terms(analysis_id: int, result: Dict[str, Any], ids: Dict[str, int]) -> None:
+    """
+    Add the normalized skill and keyword rows of an analysis.
+
+    ``ids`` maps lookup names to skill ids, see :func:`skill_ids`. A skill
+    listed under both kinds keeps the first; a keyword both matched and missing
+    counts as matched. The caller commits the session.
+    """
+    skills = result.get('skills') or {}
+    skill_kinds = {}
+    for kind in SKILL_KINDS:
+        for label in (skills.get(kind, []) if isinstance(skills, dict) else []):
+            skill_id = ids.get(skill_name(label))
+            if skill_id is not None:
+                skill_kinds.setdefault(skill_id, kind)
+
+    keyword_statuses = {}
+    for status, key in KEYWORD_STATUSES.items():
+        for label in result.get(key) or []:
+            skill_id = ids.get(skill_name(label))
+            if skill_id is not None:
+                keyword_statuses.setdefault(skill_id, status)
+
+    db.session.bulk_insert_mappings(AnalysisSkill, [
+        {'analysis_id': analysis_id, 'skill_id': skill_id, 'kind': kind}
+        for skill_id, kind in skill_kinds.items()
+    ])
+    db.session.bulk_insert_mappings(AnalysisKeyword, [
+        {'analysis_id': analysis_id, 'skill_id': skill_id, 'status': status}
+        for skill_id, status in keyword_statuses.items()
+    ])
+
+def _stored_result(analysis: Analysis) -> Dict[str, Any]:
+    """Skills and missing keywords of a stored analysis (matched keywords were never stored)."""
+    try:
+        skills = json.loads(analysis.extracted_skills) if analysis.extracted_skills else {}
+        missing_keywords = json.loads(analysis.missing_keywords) if analysis.missing_keywords else []
+    except ValueError as e:
+        logging.error(f"Unreadable skills of analysis {analysis.id}: {str(e)}")
+        return {}
+    return {'skills': skills, 'missing_keywords': missing_keywords}
+
+def backfill_analysis_terms(batch_size: int = 200) -> int:
+    """Fill the skill and keyword tables from the JSON columns of analyses stored before them."""
+    query = (Analysis.query
+             .options(load_only(Analysis.id, Analysis.extracted_skills, Analysis.missing_keywords))
+             .filter(~exists().where(AnalysisSkill.analysis_id == Analysis.id),
+                     ~exists().where(AnalysisKeyword.analysis_id == Analysis.id))
+             .order_by(Analysis.id))
+
+    filled = 0
+    last_id = 0
+    while True:
+        batch = query.filter(Analysis.id > last_id).limit(batch_size).all()
+        if not batch:
+            break
+        results = [(analysis.id, _stored_result(analysis)) for analysis in batch]
+        last_id = batch[-1].id
+        ids = skill_ids(label for _, result in results for label in analysis_labels(result))
+        for analysis_id, result in results:
+            add_analysis_terms(analysis_id, result, ids)
+        db.session.commit()
+        filled += len(batch)
+    return filled
+
+def _limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_ANALYTICS_RESULTS))
+
+def _scoped(query, analysis_id_column, user_id: Optional[int], since: Optional[datetime],
+            until: Optional[datetime]):
+    """Restrict a query to analyses of a user's resumes (if given) made in ``[since, until)``."""
+    if user_id is None and since is None and until is None:
+        return query
+    query = query.join(Analysis, Analysis.id == analysis_id_column)
+    if user_id is not None:
+        query = query.join(Resume, Resume.id == Analysis.resume_id).filter(Resume.user_id == user_id)
+    if since is not None:
+        query = query.filter(Analysis.analysis_time >= since)
+    if until is not None:
+        query = query.filter(Analysis.analysis_time < until)
+    return query
+
+def _labelled(counts) -> List[Dict[str, Any]]:
+    """Attach display labels to ``(skill_id, count)`` rows, keeping their order."""
+    labels = dict(db.session.query(Skill.id, Skill.label).filter(Skill.id.in_([row[0] for row in counts])).all())
+    return [{'skill': labels.get(skill_id), 'count': count} for skill_id, count in counts]
+
+def top_skills(kind: Optional[str] = None, since: Optional[datetime] = None,
+               until: Optional[datetime] = None, limit: int = 20,
+               user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Skills found in the most analyses, optionally of one kind, time range and user."""
+    count = func.count(AnalysisSkill.analysis_id)
+    query = db.session.query(AnalysisSkill.skill_id, count)
+    if kind:
+        query = query.filter(AnalysisSkill.kind == kind)
+    query = _scoped(query, AnalysisSkill.analysis_id, user_id, since, until)
+    return _labelled(query.group_by(AnalysisSkill.skill_id).order_by(count.desc(), AnalysisSkill.skill_id)
+                     .limit(_limit(limit)).all())
+
+def top_keywords(status: str = 'missing', since: Optional[datetime] = None,
+                 until: Optional[datetime] = None, limit: int = 20,
+                 user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Job keywords most often missed (or matched) by analyzed resumes, optionally of one user."""
+    count = func.count(AnalysisKeyword.analysis_id)
+    query = db.session.query(AnalysisKeyword.skill_id, count).filter(AnalysisKeyword.status == status)
+    query = _scoped(query, AnalysisKeyword.analysis_id, user_id, since, until)
+    return _labelled(query.group_by(AnalysisKeyword.skill_id).order_by(count.desc(), AnalysisKeyword.skill_id)
+                     .limit(_limit(limit)).all())
+
+def analyses_with_skill(label: str, kind: Optional[str] = None, limit: int = 50,
+                        user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Latest analyses whose resume has a skill, e.g. every analysis mentioning Kubernetes, optionally of one user."""
+    skill_id = db.session.query(Skill.id).filter(Skill.name == skill_name(label)).scalar()
+    if skill_id is None:
+        return []
+
+    query = (db.session.query(Analysis.id, Analysis.resume_id, Analysis.ats_score, Analysis.analysis_time,
+                              AnalysisSkill.kind)
+             .join(AnalysisSkill, AnalysisSkill.analysis_id == Analysis.id)
+             .filter(AnalysisSkill.skill_id == skill_id))
+    if kind:
+        query = query.filter(AnalysisSkill.kind == kind)
+    if user_id is not None:
+        query = query.join(Resume, Resume.id == Analysis.resume_id).filter(Resume.user_id == user_id)
+    rows = query.order_by(Analysis.id.desc()).limit(_limit(limit)).all()
+    return [
+        {
+            'analysis_id': analysis_id,
+            'resume_id': resume_id,
+            'ats_score': ats_score,
+            'analysis_time': analysis_time.isoformat() if analysis_time else None,
+            'kind': skill_kind,
+        }
+        for analysis_id, resume_id, ats_score, analysis_time, skill_kind in rows
+    ]
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
+from services.skill_matcher import SkillMatcher, normalize_skill
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.json')
+FALLBACK_LANGUAGE = 'en'
+SKILL_KINDS = ('technical', 'soft')
+
+def _flatten(entries: Union[List[str], Dict[str, List[str]]]) -> List[str]:
+    """Lexicon entries may be a flat list or grouped into named categories."""
+    if isinstance(entries, dict):
+        return [skill for group in entries.values() for skill in group]
+    return list(entries)
+
+def _dedupe(skills: List[str]) -> Tuple[str, ...]:
+    normalized = (normalize_skill(skill) for skill in skills)
+    return tuple(dict.fromkeys(skill for skill in normalized if skill))
+
+class SkillLexicon:
+    """
+    Immutable snapshot of the skill lexicon.
+
+    Every per-language skill list is normalized once and frozen as a tuple, with
+    the English fallback already merged for non-English languages. Matchers are
+    built up front, so a snapshot can be shared freely between threads.
+    """
+
+    def __init__(self, data: Dict[str, Dict[str, object]], version: str, source: Optional[str] = None):
+        self.version = version
+        self.source = source
+
+        own: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        for kind in SKILL_KINDS:
+            own[kind] = {language: _dedupe(_flatten(entries)) for language, entries in data.get(kind, {}).items()}
+            own[kind].setdefault(FALLBACK_LANGUAGE, ())
+
+        self.languages = tuple(sorted(set(own['technical']) | set(own['soft'])))
+
+        merged: Dict[str, Dict[str, Tuple[str, ...]]] = {kind: {} for kind in SKILL_KINDS}
+        for kind in SKILL_KINDS:
+            for language in self.languages:
+                skills = own[kind].get(language, ())
+                if language != FALLBACK_LANGUAGE:
+                    skills = tuple(dict.fromkeys(skills + own[kind][FALLBACK_LANGUAGE]))
+                merged[kind][language] = skills
+
+        self._own = MappingProxyType({kind: MappingProxyType(own[kind]) for kind in SKILL_KINDS})
+        self._merged = MappingProxyType({kind: MappingProxyType(merged[kind]) for kind in SKILL_KINDS})
+        self._matchers: Mapping[str, SkillMatcher] = MappingProxyType({
+            language: SkillMatcher({kind: merged[kind][language] for kind in SKILL_KINDS})
+            for language in self.languages
+        })
+
+    def _resolve(self, language: str) -> str:
+        return language if language in self.languages else FALLBACK_LANGUAGE
+
+    def technical(self, language: str = 'en') -> Tuple[str, ...]:
+        """Technical skills for a language, English fallback included."""
+        return self._merged['technical'][self._resolve(language)]
+
+    def soft(self, language: str = 'en') -> Tuple[str, ...]:
+        """Soft skills for a language, English fallback included."""
+        return self._merged['soft'][self._resolve(language)]
+
+    def default_keywords(self, language: str = 'en') -> Tuple[str, ...]:
+        """Common industry keywords used when no job description is given."""
+        language = language if language in self._own['technical'] else FALLBACK_LANGUAGE
+        technical = self._own['technical'].get(language, ())
+        soft = self._own['soft'].get(language) or self._own['soft'][FALLBACK_LANGUAGE]
+        return technical[:30] + soft[:15]
+
+    def matcher(self, language: str = 'en') -> SkillMatcher:
+        """Precompiled matcher covering both skill kinds for a language."""
+        return self._matchers[self._resolve(language)]
+
+    def __repr__(self):
+        return f'<SkillLexicon {self.version}>'
+
+def load_lexicon(path: str) -> SkillLexicon:
+    """Load a lexicon snapshot from a JSON data file."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = json.loads(raw.decode('utf-8'))
+    version = hashlib.sha256(raw).hexdigest()[:12]
+    return SkillLexicon(data, version, source=path)
+
+class LexiconRegistry:
+    """
+    Holds the active lexicon and swaps it atomically when the data file changes.
+
+    Readers only ever see a complete snapshot: a reload builds the new lexicon
+    off to the side and then replaces a single reference. The data file's
+    modification time is checked at most once per ``check_interval`` seconds,
+    so edits are picked up by running workers without a restart.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEXICON_PATH, check_interval: float = 30.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._lexicon: Optional[SkillLexicon] = None
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+
+    def current(self) -> SkillLexicon:
+        """Return the active lexicon, reloading it first if the data file changed."""
+        lexicon = self._lexicon
+        if lexicon is None or (self.check_interval >= 0 and time.monotonic() >= self._next_check):
+            lexicon = self._refresh()
+        return lexicon
+
+    def reload(self) -> SkillLexicon:
+        """Force a reload of the data file."""
+        return self._refresh(force=True)
+
+    def _refresh(self, force: bool = False) -> SkillLexicon:
+        with self._lock:
+            self._next_check = time.monotonic() + max(self.check_interval, 0)
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError as e:
+                if self._lexicon is None:
+                    raise
+                logging.error(f"Skill lexicon not readable, keeping version {self._lexicon.version}: {str(e)}")
+                return self._lexicon
+
+            if not force and self._lexicon is not None and mtime == self._mtime:
+                return self._lexicon
+
+            try:
+                lexicon = load_lexicon(self.path)
+            except (OSError, ValueError) as e:
+                if self._lexicon is None:
+                    raise
+                logging.error(f"Failed to reload skill lexicon, keeping version {self._lexicon.version}: {str(e)}")
+                return self._lexicon
+
+            if self._lexicon is None or lexicon.version != self._lexicon.version:
+                logging.info(f"Loaded skill lexicon version {lexicon.version} from {self.path}")
+            self._lexicon = lexicon
+            self._mtime = mtime
+            return lexicon
+
+_registry = LexiconRegistry(os.environ.get('SKILL_LEXICON_PATH') or DEFAULT_LEXICON_PATH)
+
+def configure_lexicon(path: Optional[str] = None, check_interval: Optional[float] = None) -> None:
+    """Point the shared registry at a lexicon file (called from the app factory)."""
+    global _registry
+    path = path or _registry.path
+    if check_interval is None:
+        check_interval = _registry.check_interval
+    if path != _registry.path:
+        _registry = LexiconRegistry(path, check_interval)
+    else:
+        _registry.check_interval = check_interval
+
+def get_lexicon() -> SkillLexicon:
+    """Return the active skill lexicon snapshot."""
+    return _registry.current()
+
+def reload_lexicon() -> SkillLexicon:
+    """Reload the skill lexicon from disk."""
+    return _registry.reload()
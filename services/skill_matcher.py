@@ -0,0 +1,117 @@
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+
+class SkillMatch(NamedTuple):
+    skill: str
+    kind: str
+    start: int
+    end: int
+
+
+def normalize_skill(skill: str) -> str:
+    """Normalize a lexicon entry the same way resume text is normalized."""
+    return ' '.join(skill.lower().split())
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over a skill lexicon.
+
+    The automaton is built once and then finds every lexicon entry in a single
+    pass over normalized text. A match only counts when it sits on word
+    boundaries, so 'r' does not match inside 'career' and 'java' does not
+    match inside 'javascript'. Boundaries are only enforced on the sides where
+    the skill itself starts or ends with a word character, which keeps entries
+    such as 'c++' or '.net' matchable.
+    """
+
+    def __init__(self, skills: Dict[str, Sequence[str]]):
+        # Patterns are (kind, normalized skill) pairs, kept in lexicon order
+        self._patterns: List[Tuple[str, str]] = []
+        seen = set()
+        for kind, entries in skills.items():
+            for skill in entries:
+                pattern = (kind, normalize_skill(skill))
+                if pattern[1] and pattern not in seen:
+                    seen.add(pattern)
+                    self._patterns.append(pattern)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _build(self) -> None:
+        for index, (_, pattern) in enumerate(self._patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        # Breadth-first pass to compute failure links and merged outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[SkillMatch]:
+        """Yield every boundary-respecting match in ``text`` in order of end position."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self._patterns
+        text_length = len(text)
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+
+            for index in output[state]:
+                kind, pattern = patterns[index]
+                start = position - len(pattern) + 1
+                end = position + 1
+                if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(pattern[-1]) and end < text_length and _is_word_char(text[end]):
+                    continue
+                yield SkillMatch(pattern, kind, start, end)
+
+    def find_all(self, text: str) -> List[SkillMatch]:
+        """Return all matches in ``text`` with their positions."""
+        return list(self.iter_matches(text))
+
+    def find_skills(self, text: str) -> Dict[str, List[str]]:
+        """Return the distinct skills found in ``text`` grouped by kind, in lexicon order."""
+        found = {match[:2] for match in self.iter_matches(text)}
+        grouped: Dict[str, List[str]] = {}
+        for kind, pattern in self._patterns:
+            if (pattern, kind) in found:
+                grouped.setdefault(kind, []).append(pattern)
+        return grouped
+
@@ -0,0 +1,181 @@
+import os
+import zlib
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Entry header byte naming the compression of the rest of the file
+CODEC_ZLIB = b'z'
+CODEC_ZSTD = b's'
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _compress(text: str) -> bytes:
+    data = text.encode('utf-8')
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return CODEC_ZLIB + zlib.compress(data, 6)
+
+def _decompress(blob: bytes) -> Optional[str]:
+    codec, payload = blob[:1], blob[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if codec == CODEC_ZSTD and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(payload).decode('utf-8')
+    return None
+
+class TextCache:
+    """
+    Compressed on-disk store of extracted document text.
+
+    Entries are keyed by the document's content hash and the parser version,
+    and sharded into subdirectories by the first two hash characters. When
+    the store grows past ``max_bytes``, the least recently read entries are
+    removed. Several processes may share one directory; each keeps its own
+    estimate of the store size and rescans it when evicting.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max(int(max_bytes), 0)
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, content_hash: str, version: str) -> str:
+        return os.path.join(self.directory, content_hash[:2], f"{content_hash}-v{version}.txt")
+
+    def get(self, content_hash: str, version: str) -> Optional[str]:
+        """Return the cached text for a document, or None on a miss."""
+        path = self.path_for(content_hash, version)
+        try:
+            with open(path, 'rb') as file:
+                text = _decompress(file.read())
+        except FileNotFoundError:
+            text = None
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            logging.error(f"Unreadable text cache entry {path}: {str(e)}")
+            text = None
+
+        if text is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            # The modification time doubles as the last read time for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def put(self, content_hash: str, version: str, text: str) -> None:
+        """Store a document's text, evicting old entries if the store is over its size limit."""
+        if self.max_bytes == 0:
+            return
+        path = self.path_for(content_hash, version)
+        blob = _compress(text)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+            with os.fdopen(fd, 'wb') as file:
+                file.write(blob)
+            try:
+                # An entry being overwritten no longer counts towards the size
+                replaced_size = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.error(f"Could not write text cache entry {path}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(blob) - replaced_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.txt'):
+                    yield entry
+
+    def _scan_size(self) -> int:
+        try:
+            return sum(entry.stat().st_size for entry in self._entries())
+        except OSError:
+            return 0
+
+    def _evict(self) -> None:
+        """Remove the least recently read entries until the store is at 90% of its limit."""
+        try:
+            entries = []
+            for entry in self._entries():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError as e:
+            logging.error(f"Could not scan text cache: {str(e)}")
+            return
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, entry_size, path in sorted(entries):
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'directory': self.directory,
+            'max_bytes': self.max_bytes,
+            'size': self._size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'codec': 'zstd' if zstandard is not None else 'zlib',
+        }
+
+_text_cache: Optional[TextCache] = None
+
+def configure_text_cache(directory: Optional[str], max_bytes: Optional[int] = None) -> None:
+    """Enable the extracted-text cache in ``directory`` (None disables it)."""
+    global _text_cache
+    if not directory:
+        _text_cache = None
+        return
+    if max_bytes is None:
+        _text_cache = TextCache(directory)
+    else:
+        _text_cache = TextCache(directory, max_bytes)
+
+def get_text_cache() -> Optional[TextCache]:
+    return _text_cache
@@ -0,0 +1,102 @@
+import re
+from collections import Counter
+from functools import cached_property
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple, Union
+
+MAX_NGRAM = 3
+
+# Characters outside words and whitespace are dropped, except the ones used in
+# skill names such as c++, c#, node.js, ci/cd and scikit-learn
+_SPECIAL_CHARS = re.compile(r'[^\w\s.+#/-]')
+_WHITESPACE = re.compile(r'\s+')
+_TOKEN = re.compile(r'[\w+#]+(?:[./-][\w+#]+)*')
+
+# Letter ranges of the supported scripts (the text is already casefolded)
+_SCRIPT_RANGES = (
+    ('latin', 'a', 'z'),
+    ('cyrillic', 'а', 'я'),
+    ('cyrillic', 'ё', 'ё'),
+    ('georgian', 'ა', 'ჰ'),
+)
+
+def _script_of(char: str) -> Optional[str]:
+    for script, first, last in _SCRIPT_RANGES:
+        if first <= char <= last:
+            return script
+    return None
+
+class Token(NamedTuple):
+    text: str
+    start: int
+    end: int
+
+def normalize_text(text: str) -> str:
+    """Casefold text, drop special characters and collapse whitespace."""
+    text = _SPECIAL_CHARS.sub(' ', text.casefold())
+    return _WHITESPACE.sub(' ', text).strip()
+
+class NormalizedDocument:
+    """
+    A resume or job description normalized once and shared by every analysis step.
+
+    Holds the casefolded text, its tokens with offsets into that text, the
+    script histogram used for language detection and the set of word n-grams
+    used for keyword matching. Skill matches are cached per lexicon version and
+    language, so extracting skills and scoring reuse the same scan.
+    """
+
+    def __init__(self, text: str):
+        self.text = normalize_text(text or '')
+        self.tokens: Tuple[Token, ...] = tuple(
+            Token(match.group(), match.start(), match.end()) for match in _TOKEN.finditer(self.text)
+        )
+        self._skills: Dict[Tuple[str, str], Dict[str, List[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.text
+
+    @cached_property
+    def words(self) -> List[str]:
+        """Distinct token texts in order of first occurrence."""
+        return list(dict.fromkeys(token.text for token in self.tokens))
+
+    @cached_property
+    def script_histogram(self) -> Dict[str, int]:
+        """Number of Latin, Cyrillic and Georgian letters in the text."""
+        histogram = {'latin': 0, 'cyrillic': 0, 'georgian': 0}
+        # One counting pass in C, then a lookup per distinct character
+        for char, count in Counter(self.text).items():
+            script = _script_of(char)
+            if script is not None:
+                histogram[script] += count
+        return histogram
+
+    @cached_property
+    def ngrams(self) -> FrozenSet[str]:
+        """All word n-grams up to ``MAX_NGRAM`` words long."""
+        words = [token.text for token in self.tokens]
+        grams: Set[str] = set(words)
+        for size in range(2, MAX_NGRAM + 1):
+            grams.update(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+        return frozenset(grams)
+
+    def find_skills(self, lexicon, language: str = 'en') -> Dict[str, List[str]]:
+        """Skills found in the text by the lexicon's matcher, computed once per lexicon version."""
+        key = (lexicon.version, language)
+        if key not in self._skills:
+            self._skills[key] = lexicon.matcher(language).find_skills(self.text)
+        return self._skills[key]
+
+    def contains(self, phrase: str) -> bool:
+        """Whether a normalized phrase occurs in the text as whole words."""
+        return phrase in self.ngrams
+
+def as_document(text: Union[str, NormalizedDocument, None]) -> NormalizedDocument:
+    """Return ``text`` as a NormalizedDocument, normalizing it only if needed."""
+    if isinstance(text, NormalizedDocument):
+        return text
+    return NormalizedDocument(text or '')
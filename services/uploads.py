@@ -0,0 +1,260 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only, selectinload
+from app import db
+from models import Resume, Analysis, CSVUpload, CSVChart, AnalysisJob
+from services.report_generator import schedule_report
+from services.search_index import index_resume
+from services.skill_analytics import add_analysis_terms, analysis_labels, skill_ids
+from services.skill_lexicon import get_lexicon
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def store_upload(file, upload_folder: str, extension: str) -> Tuple[str, str]:
+    """
+    Stream an uploaded file to disk, hashing it on the way.
+
+    Files are stored under their SHA-256, so identical content is kept once.
+    Returns ``(filename, content_hash)``.
+    """
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=upload_folder, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                output.write(chunk)
+
+        content_hash = digest.hexdigest()
+        filename = f"{content_hash}.{extension}"
+        target_path = os.path.join(upload_folder, filename)
+        if os.path.exists(target_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, target_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return filename, content_hash
+
+def discard_upload(upload_folder: str, filename: str) -> None:
+    """Remove a stored upload unless a saved record or a pending job still uses it."""
+    in_use = (
+        db.session.query(Resume.id).filter_by(filename=filename).first() or
+        db.session.query(CSVUpload.id).filter_by(filename=filename).first() or
+        db.session.query(AnalysisJob.id).filter(
+            AnalysisJob.filename == filename, AnalysisJob.status.in_(('queued', 'running'))
+        ).first()
+    )
+    file_path = os.path.join(upload_folder, filename)
+    if not in_use and os.path.exists(file_path):
+        os.remove(file_path)
+
+def job_description_hash(job_description: str) -> str:
+    """
+    Cache key of an analysis' job description.
+
+    Includes the skill lexicon version, so cached analyses are not reused
+    after the lexicon changes.
+    """
+    key = f"{get_lexicon().version}\0{job_description.strip()}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def find_cached_analysis(content_hash: str, job_description: str, user_id: Optional[int]) -> Optional[Analysis]:
+    """
+    The user's latest analysis of identical resume content against the same job description.
+
+    Anonymous uploads are never matched: unrelated visitors would otherwise
+    share each other's results.
+    """
+    if user_id is None:
+        return None
+    return (Analysis.query
+            .join(Resume, Resume.id == Analysis.resume_id)
+            .filter(Resume.content_hash == content_hash,
+                    Resume.user_id == user_id,
+                    Analysis.job_description_hash == job_description_hash(job_description))
+            .order_by(Analysis.id.desc())
+            .first())
+
+def find_extracted_resume(content_hash: str) -> Optional[Resume]:
+    """A stored resume with identical content, whose text and language can be reused."""
+    return (Resume.query
+            .filter(Resume.content_hash == content_hash,
+                    or_(Resume.stored_text.has(), Resume.legacy_text_content.isnot(None)))
+            .order_by(Resume.id.desc())
+            .first())
+
+def migrate_resume_texts(batch_size: int = 200) -> int:
+    """Move resume text stored in the resumes table into compressed resume_texts rows."""
+    query = (Resume.query
+             .options(load_only(Resume.id, Resume.legacy_text_content), selectinload(Resume.stored_text))
+             .filter(Resume.legacy_text_content.isnot(None))
+             .order_by(Resume.id))
+
+    moved = 0
+    last_id = 0
+    while True:
+        batch = query.filter(Resume.id > last_id).limit(batch_size).all()
+        if not batch:
+            break
+        for resume in batch:
+            # The setter compresses the text into resume_texts and clears the old column
+            resume.text_content = resume.legacy_text_content
+        db.session.commit()
+        moved += len(batch)
+        last_id = batch[-1].id
+    return moved
+
+def save_resume_analysis(processed: Dict[str, Any], user_id: Optional[int], filename: str,
+                         original_filename: str, file_type: str, job_description: str = "",
+                         content_hash: Optional[str] = None) -> Analysis:
+    """
+    Store a processed resume, its search index entries and its analysis.
+
+    A user's re-upload of identical content gets a new analysis on the
+    resume already stored for it; anonymous uploads always get their own.
+    """
+    analysis_result = processed['analysis']
+
+    resume = None
+    if content_hash and user_id is not None:
+        resume = Resume.query.filter_by(content_hash=content_hash, user_id=user_id).first()
+
+    if resume is None:
+        # Save to database
+        resume = Resume(
+            user_id=user_id,
+            filename=filename,
+            original_filename=original_filename,
+            file_type=file_type,
+            content_hash=content_hash,
+            text_content=processed['text_content'],
+            language=processed['language']
+        )
+        db.session.add(resume)
+        db.session.flush()
+
+        # Add the resume to the search index in the same transaction
+        index_resume(resume, frequencies=processed['index_terms'])
+        db.session.commit()
+
+    # Ensure data is JSON serializable
+    try:
+        skills_json = json.dumps(analysis_result.get('skills', {}))
+        missing_keywords_json = json.dumps(analysis_result.get('missing_keywords', []))
+        suggestions_json = json.dumps(analysis_result.get('suggestions', []))
+    except (TypeError, ValueError) as e:
+        logging.error(f"JSON serialization error: {str(e)}")
+        # Fallback to string representations
+        skills_json = json.dumps({})
+        missing_keywords_json = json.dumps([])
+        suggestions_json = json.dumps([])
+
+    # New skills are committed on their own, before the analysis referencing them
+    term_ids = skill_ids(analysis_labels(analysis_result))
+
+    # Save analysis
+    analysis = Analysis(
+        resume_id=resume.id,
+        job_description=job_description,
+        job_description_hash=job_description_hash(job_description),
+        ats_score=float(analysis_result.get('ats_score', 0)),
+        extracted_skills=skills_json,
+        missing_keywords=missing_keywords_json,
+        suggestions=suggestions_json
+    )
+    db.session.add(analysis)
+    db.session.flush()
+    add_analysis_terms(analysis.id, analysis_result, term_ids)
+    db.session.commit()
+
+    # Have the downloadable report ready before it is asked for
+    schedule_report(analysis)
+
+    return analysis
+
+def csv_store_key(csv_upload: CSVUpload) -> str:
+    """Column store key of a CSV upload: its content hash, or its stored file name for older uploads."""
+    return csv_upload.content_hash or os.path.splitext(csv_upload.filename)[0]
+
+def reuse_csv_upload(content_hash: str, user_id: Optional[int], original_filename: str) -> Optional[CSVUpload]:
+    """
+    Reuse the profile of identical CSV content instead of analyzing it again.
+
+    Returns the user's own upload of the content if there is one, otherwise a
+    new upload copying another upload's profile, or None if the content is new.
+    Anonymous uploads always get a new upload of their own.
+    """
+    if user_id is not None:
+        own_upload = CSVUpload.query.filter_by(content_hash=content_hash, user_id=user_id).first()
+        if own_upload is not None:
+            return own_upload
+
+    source = CSVUpload.query.filter_by(content_hash=content_hash).order_by(CSVUpload.id.desc()).first()
+    if source is None:
+        return None
+
+    csv_upload = CSVUpload(
+        user_id=user_id,
+        filename=source.filename,
+        original_filename=original_filename,
+        content_hash=content_hash,
+        columns_info=source.columns_info,
+        stats_summary=source.stats_summary,
+        row_count=source.row_count,
+        column_count=source.column_count,
+        charts=[CSVChart(column=chart.column, payload=chart.payload) for chart in source.charts]
+    )
+    db.session.add(csv_upload)
+    db.session.commit()
+
+    return csv_upload
+
+def save_csv_upload(analysis_result: Dict[str, Any], user_id: Optional[int], filename: str,
+                    original_filename: str, content_hash: Optional[str] = None) -> CSVUpload:
+    """Store the profile of an analyzed CSV upload, with its precomputed chart payloads."""
+    csv_upload = CSVUpload(
+        user_id=user_id,
+        filename=filename,
+        original_filename=original_filename,
+        content_hash=content_hash,
+        columns_info=json.dumps(analysis_result['columns_info']),
+        stats_summary=json.dumps(analysis_result['stats']),
+        row_count=analysis_result['row_count'],
+        column_count=analysis_result['column_count'],
+        charts=[CSVChart(column=column, payload=json.dumps(chart))
+                for column, chart in analysis_result.get('charts', {}).items()]
+    )
+    db.session.add(csv_upload)
+    db.session.commit()
+
+    return csv_upload
+
+def find_chart_payload(upload_id: int, column: str) -> Optional[str]:
+    """The stored chart payload (a JSON string) of an upload's column, None if there is none."""
+    return (db.session.query(CSVChart.payload)
+            .filter_by(upload_id=upload_id, column=column)
+            .scalar())
+
+def save_chart(upload_id: int, column: str, chart: Dict[str, Any]) -> str:
+    """
+    Store a column's chart payload computed on demand, for uploads profiled
+    without one (large files and uploads from before charts were stored).
+    """
+    payload = json.dumps(chart)
+    try:
+        db.session.merge(CSVChart(upload_id=upload_id, column=column, payload=payload))
+        db.session.commit()
+    except IntegrityError:
+        # Stored by a concurrent request
+        db.session.rollback()
+    return payload
@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+
+from app import db
+from models import Analysis, CSVUpload, Resume
+
+HISTORY_PAGE_SIZE = 5
+
+# A page position: the (upload_time, id) of the last row shown
+Cursor = Tuple[datetime, int]
+
+def encode_cursor(upload_time: datetime, row_id: int) -> str:
+    return f"{upload_time.isoformat()}_{row_id}"
+
+def decode_cursor(value: Optional[str]) -> Optional[Cursor]:
+    """The position encoded by :func:`encode_cursor`, or None (the first page) for anything else."""
+    if not value:
+        return None
+    try:
+        upload_time, row_id = value.rsplit('_', 1)
+        return datetime.fromisoformat(upload_time), int(row_id)
+    except ValueError:
+        return None
+
+def activity_counts(user_id: int) -> Dict[str, int]:
+    """Numbers of resumes and CSV uploads of a user, counted in one query."""
+    resumes = select(func.count(Resume.id)).where(Resume.user_id == user_id).scalar_subquery()
+    csv_uploads = select(func.count(CSVUpload.id)).where(CSVUpload.user_id == user_id).scalar_subquery()
+    resume_count, csv_count = db.session.execute(select(resumes, csv_uploads)).one()
+    return {'resumes': resume_count, 'csv_uploads': csv_count}
+
+def _page(query, model, before: Optional[Cursor], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of a user's uploads, newest first, and the cursor of the next page.
+
+    Keyset pagination: the page starts after the ``before`` position, so its
+    cost does not grow with the number of pages before it.
+    """
+    if before is not None:
+        upload_time, row_id = before
+        query = query.filter(or_(model.upload_time < upload_time,
+                                 and_(model.upload_time == upload_time, model.id < row_id)))
+    rows = query.order_by(model.upload_time.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].upload_time, rows[-1].id)
+
+def resume_history(user_id: int, before: Optional[Cursor] = None,
+                   limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[Any], Optional[str]]:
+    """
+    A page of a user's resumes with the id and score of each one's latest analysis.
+
+    Rows carry only the listed columns (never the resume text), and the latest
+    analyses are joined in the same query.
+    """
+    latest_analysis = (select(func.max(Analysis.id))
+                       .where(Analysis.resume_id == Resume.id)
+                       .correlate(Resume)
+                       .scalar_subquery())
+    query = (db.session.query(Resume.id, Resume.original_filename, Resume.upload_time, Resume.language,
+                              Analysis.id.label('analysis_id'), Analysis.ats_score)
+             .outerjoin(Analysis, Analysis.id == latest_analysis)
+             .filter(Resume.user_id == user_id))
+    return _page(query, Resume, before, limit)
+
+def csv_history(user_id: int, before: Optional[Cursor] = None,
+                limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[Any], Optional[str]]:
+    """A page of a user's CSV uploads, without their stored profiles."""
+    query = (db.session.query(CSVUpload.id, CSVUpload.original_filename, CSVUpload.upload_time,
+                              CSVUpload.row_count, CSVUpload.column_count)
+             .filter(CSVUpload.user_id == user_id))
+    return _page(query, CSVUpload, before, limit)
@@ -0,0 +1,237 @@
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Set
+
+class TaskTimeoutError(TimeoutError):
+    """Raised when a pooled task does not finish within its timeout."""
+
+_settings: Dict[str, Any] = {
+    'workers': 0,
+    'task_timeout': 60.0,
+    'max_pending': 0,
+    'background_slots': 1,
+    'service_settings': {},
+}
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+# Separate budget of background work (reports), so it never takes an upload's slot
+_background_slots: Optional[threading.BoundedSemaphore] = None
+# Tasks in flight per pool, so a retired pool is only stopped once they are done. A
+# lock of its own: cancelling futures under _lock runs their done callbacks
+_pool_futures: Dict[ProcessPoolExecutor, Set[Future]] = {}
+_futures_lock = threading.Lock()
+
+def configure_worker_pool(workers: int, task_timeout: float = 60.0, max_pending: Optional[int] = None,
+                          service_settings: Optional[Dict[str, Any]] = None, background_slots: int = 1) -> None:
+    """
+    Configure the analysis process pool.
+
+    ``workers`` processes run CPU-bound tasks; at most ``workers + max_pending``
+    tasks are in flight at once, beyond that tasks run inline in the caller.
+    Background tasks (see :func:`submit_background_task`) have their own
+    ``background_slots`` (at least one) instead. ``service_settings`` is applied in every
+    worker on start-up. The pool itself is created lazily, per process, on
+    first use.
+    """
+    global _slots, _background_slots
+    workers = max(int(workers), 0)
+    max_pending = workers if max_pending is None else max(int(max_pending), 0)
+    background_slots = max(int(background_slots), 1)
+    with _lock:
+        _shutdown_pool()
+        _settings.update(
+            workers=workers,
+            task_timeout=float(task_timeout),
+            max_pending=max_pending,
+            background_slots=background_slots,
+            service_settings=dict(service_settings or {}),
+        )
+        _slots = threading.BoundedSemaphore(workers + max_pending) if workers else None
+        _background_slots = threading.BoundedSemaphore(background_slots) if workers else None
+
+def _init_worker(service_settings: Dict[str, Any]) -> None:
+    """Configure services in a new worker and load the expensive resources up front."""
+    from services.config import configure_services
+    from services.skill_lexicon import get_lexicon
+    from services.language_detector import warm_up as warm_up_language_detector
+    import services.parser  # noqa: F401  (imports the PDF/DOCX libraries)
+
+    configure_services(service_settings)
+    get_lexicon()
+    warm_up_language_detector()
+
+def _ready() -> int:
+    return os.getpid()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    with _lock:
+        # A pool inherited through fork belongs to the parent process
+        if _pool is None or _pool_pid != os.getpid():
+            # Spawned workers do not inherit the web process' threads, sockets or DB connections
+            _pool = ProcessPoolExecutor(
+                max_workers=_settings['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(_settings['service_settings'],),
+            )
+            _pool_pid = os.getpid()
+            # Pre-warm every worker so the first uploads do not pay the start-up cost
+            for _ in range(_settings['workers']):
+                _pool.submit(_ready)
+        return _pool
+
+def _shutdown_pool() -> None:
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _pool_pid = None
+
+def _stop_pool(pool: ProcessPoolExecutor, stuck: Future) -> None:
+    """Let a retired pool's other tasks finish, then kill its processes, the stuck one included."""
+    with _futures_lock:
+        others = _pool_futures.get(pool, set()) - {stuck}
+    if others:
+        # Tasks still running after their own timeout are stuck as well
+        wait_futures(others, timeout=_settings['task_timeout'])
+    # The executor has no way to stop a running task: terminate its processes
+    for process in list((getattr(pool, '_processes', None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+    with _futures_lock:
+        _pool_futures.pop(pool, None)
+
+def _retire_pool(stuck: Future) -> None:
+    """
+    Replace the pool running a task that timed out.
+
+    A started task cannot be cancelled, so new tasks go to a fresh pool and
+    the old one is stopped in the background once its other tasks are done.
+    """
+    global _pool, _pool_pid
+    with _futures_lock:
+        pool = next((pool for pool, futures in _pool_futures.items() if stuck in futures), None)
+    if pool is None:
+        return
+    with _lock:
+        if pool is _pool:
+            _pool = None
+            _pool_pid = None
+    threading.Thread(target=_stop_pool, args=(pool, stuck), name='worker-pool-retire', daemon=True).start()
+
+def _release_once(slots: threading.BoundedSemaphore) -> Callable[[], None]:
+    """Release a slot at most once, whether the task finishes or is given up on first."""
+    lock = threading.Lock()
+    released = []
+    def release() -> None:
+        with lock:
+            if released:
+                return
+            released.append(True)
+        slots.release()
+    return release
+
+def pool_enabled() -> bool:
+    """Whether this process has a worker pool to submit tasks to (pool workers do not)."""
+    return bool(_settings['workers']) and _slots is not None
+
+def _submit(slots: Optional[threading.BoundedSemaphore], func: Callable[..., Any],
+            args: tuple, kwargs: Dict[str, Any]) -> Optional[Future]:
+    if not _settings['workers'] or slots is None:
+        return None
+
+    if not slots.acquire(blocking=False):
+        logging.warning(f"Worker pool saturated, not running {func.__name__} in it")
+        return None
+
+    try:
+        pool = _get_pool()
+        future: Future = pool.submit(func, *args, **kwargs)
+    except (BrokenProcessPool, RuntimeError) as e:
+        slots.release()
+        logging.error(f"Worker pool unavailable, not running {func.__name__} in it: {str(e)}")
+        with _lock:
+            _shutdown_pool()
+        return None
+
+    with _futures_lock:
+        _pool_futures.setdefault(pool, set()).add(future)
+    future.release_slot = _release_once(slots)
+    future.add_done_callback(_task_done)
+    return future
+
+def submit_task(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Optional[Future]:
+    """
+    Submit ``func(*args, **kwargs)`` to the worker pool without waiting for it.
+
+    Returns None when the pool is disabled, saturated or broken; the caller
+    then runs the work itself.
+    """
+    return _submit(_slots, func, args, kwargs)
+
+def submit_background_task(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Optional[Future]:
+    """
+    Submit work no upload waits on, such as report generation, to the worker pool.
+
+    Like :func:`submit_task`, but counted against the background slots, so a
+    burst of it cannot push uploads out of the pool. Returns None when the
+    pool is disabled, broken or has no background slot free.
+    """
+    return _submit(_background_slots, func, args, kwargs)
+
+def _task_done(future: Future) -> None:
+    future.release_slot()
+    with _futures_lock:
+        for pool, futures in list(_pool_futures.items()):
+            futures.discard(future)
+            # Forget pools that were shut down or replaced once they have nothing running
+            if not futures and pool is not _pool:
+                del _pool_futures[pool]
+
+def abandon_task(future: Future) -> None:
+    """
+    Give up on a submitted task.
+
+    A task that has not started is cancelled. A running one has its slot
+    released and the pool replaced, so the worker running it is killed.
+    """
+    if future.done() or future.cancel():
+        return
+    future.release_slot()
+    _retire_pool(future)
+
+def run_task(func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+    """
+    Run ``func(*args, **kwargs)`` in the worker pool and wait for its result.
+
+    Falls back to running inline when the pool is disabled, saturated or
+    broken. Raises TaskTimeoutError if the task takes longer than ``timeout``
+    (default: the configured task timeout); its slot is released right away
+    and the worker running it is killed, see :func:`abandon_task`.
+    """
+    future = submit_task(func, *args, **kwargs)
+    if future is None:
+        return func(*args, **kwargs)
+
+    try:
+        return future.result(timeout=timeout if timeout is not None else _settings['task_timeout'])
+    except FutureTimeoutError:
+        logging.error(f"{func.__name__} did not finish in time, replacing its worker")
+        abandon_task(future)
+        raise TaskTimeoutError(f"{func.__name__} did not finish in time")
+    except BrokenProcessPool as e:
+        logging.error(f"Worker pool broke while running {func.__name__}, running inline: {str(e)}")
+        with _lock:
+            _shutdown_pool()
+        return func(*args, **kwargs)
+
+atexit.register(_shutdown_pool)
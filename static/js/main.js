@@ -91,12 +91,14 @@ function showFileName(name, dropArea) {
 }
 
 function validateFile(file, input) {
-    const maxSize = 16 * 1024 * 1024; // 16MB
+    // 16MB unless the input sets its own limit
+    const maxSize = input.dataset.maxSize ? parseInt(input.dataset.maxSize, 10) : 16 * 1024 * 1024;
     const allowedTypes = input.accept ? input.accept.split(',').map(t => t.trim()) : [];
     
     // Check file size
     if (file.size > maxSize) {
-        showError('File size exceeds 16MB limit. Please choose a smaller file.');
+        const maxMegabytes = Math.round(maxSize / (1024 * 1024));
+        showError(`File size exceeds ${maxMegabytes}MB limit. Please choose a smaller file.`);
         input.value = '';
         return false;
     }
@@ -130,10 +132,114 @@ function initializeFormValidation() {
             
             // Show loading state
             showLoadingState(form);
+            
+            // Process in the background and follow the job's progress
+            if (form.dataset.asyncUpload !== undefined && window.fetch && window.EventSource) {
+                e.preventDefault();
+                submitAsyncUpload(form);
+            }
         });
     });
 }
 
+// Async uploads
+const JOB_STAGE_MESSAGES = {
+    queued: 'Waiting to be processed...',
+    parsing: 'Reading your file...',
+    language: 'Detecting language...',
+    scoring: 'Scoring your resume...',
+    profiling: 'Profiling your data...',
+    saved: 'Done! Loading results...'
+};
+
+function submitAsyncUpload(form) {
+    const formData = new FormData(form);
+    formData.append('async', '1');
+    
+    fetch(form.action, {
+        method: 'POST',
+        body: formData,
+        headers: { 'Accept': 'application/json' }
+    })
+        .then(response => response.json().then(data => ({ ok: response.ok, data })))
+        .then(({ ok, data }) => {
+            if (!ok) {
+                throw new Error(data.error || 'Upload failed. Please try again.');
+            }
+            // Identical uploads are answered with their existing result
+            if (!handleJobUpdate(data, form)) {
+                followJob(data, form);
+            }
+        })
+        .catch(error => handleJobFailure(form, error.message));
+}
+
+function followJob(job, form) {
+    // Progress streams are only offered when the server enables them
+    if (!job.events_url) {
+        pollJob(job.status_url, form);
+        return;
+    }
+    const source = new EventSource(job.events_url);
+    
+    source.addEventListener('progress', function(e) {
+        const data = JSON.parse(e.data);
+        if (handleJobUpdate(data, form)) {
+            source.close();
+        }
+    });
+    
+    // Stream unavailable or timed out: fall back to polling the status endpoint
+    source.onerror = function() {
+        source.close();
+        pollJob(job.status_url, form);
+    };
+}
+
+function pollJob(statusUrl, form) {
+    fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+        .then(response => response.json())
+        .then(data => {
+            if (!handleJobUpdate(data, form)) {
+                setTimeout(() => pollJob(statusUrl, form), 1000);
+            }
+        })
+        .catch(() => handleJobFailure(form, 'Lost track of your upload. Please try again.'));
+}
+
+// Returns true once the job has finished
+function handleJobUpdate(data, form) {
+    updateLoadingMessage(JOB_STAGE_MESSAGES[data.stage] || 'Processing your request...');
+    
+    if (data.status === 'done') {
+        window.location.href = data.result_url;
+        return true;
+    }
+    if (data.status === 'failed') {
+        handleJobFailure(form, data.error || 'Processing failed. Please try again.');
+        return true;
+    }
+    return false;
+}
+
+function handleJobFailure(form, message) {
+    const overlay = document.querySelector('.loading-overlay');
+    if (overlay) overlay.remove();
+    
+    const submitBtn = form.querySelector('button[type="submit"]');
+    if (submitBtn && submitBtn.dataset.originalText) {
+        submitBtn.innerHTML = submitBtn.dataset.originalText;
+        submitBtn.disabled = false;
+    }
+    
+    showError(message);
+}
+
+function updateLoadingMessage(message) {
+    const messageEl = document.querySelector('.loading-overlay .loading-message');
+    if (messageEl) messageEl.textContent = message;
+}
+
 function showLoadingState(form) {
     const submitBtn = form.querySelector('button[type="submit"]');
     if (submitBtn) {
@@ -155,7 +261,7 @@ function showLoadingOverlay() {
     overlay.innerHTML = `
         <div class="text-center">
             <div class="loading-spinner"></div>
-            <p class="mt-4 text-gray-600">Processing your request...</p>
+            <p class="mt-4 text-gray-600 loading-message">Processing your request...</p>
         </div>
     `;
     document.body.appendChild(overlay);
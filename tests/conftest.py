@@ -0,0 +1,101 @@
+import io
+import os
+import sys
+import hashlib
+import itertools
+import tempfile
+from urllib.parse import urlsplit
+
+import pytest
+from flask.testing import FlaskClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app module creates the application on import: point it at an in-memory
+# database and temporary stores, with the worker pool and job worker threads
+# disabled (tests run queued jobs themselves), before anything imports it
+STORE_FOLDER = tempfile.mkdtemp(prefix='career-insights-tests-')
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['ANALYSIS_POOL_WORKERS'] = '0'
+os.environ['JOB_WORKER_THREADS'] = '0'
+for variable in ('TEXT_CACHE_FOLDER', 'COLUMN_STORE_FOLDER', 'CORRELATION_CACHE_FOLDER', 'REPORTS_FOLDER'):
+    os.environ[variable] = os.path.join(STORE_FOLDER, variable.lower())
+
+from app import app as flask_app  # noqa: E402
+
+PASSWORD = 'correct horse'
+_names = itertools.count()
+
+class RequestContextClient(FlaskClient):
+    """
+    Test client whose requests get an app context (and ``g``) of their own, as
+    they do when served, rather than sharing the one the tests run in.
+    """
+
+    def open(self, *args, **kwargs):
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+@pytest.fixture(scope='session')
+def app():
+    flask_app.config['TESTING'] = True
+    flask_app.config['UPLOAD_FOLDER'] = os.path.join(STORE_FOLDER, 'uploads')
+    os.makedirs(flask_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    flask_app.test_client_class = RequestContextClient
+    with flask_app.app_context():
+        yield flask_app
+
+@pytest.fixture
+def make_user(app):
+    """Create a user with a unique name and the test password."""
+    from app import db
+    from models import User
+
+    def make_user():
+        name = f'user{next(_names)}'
+        user = User(username=name, email=f'{name}@example.com')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+def login(app, user):
+    """A test client signed in as ``user``."""
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': user.username, 'password': PASSWORD})
+    assert response.status_code == 302
+    return client
+
+def save_resume(user, text, job_description=''):
+    """Analyze resume text as an upload of ``user`` (None for anonymous) and store it."""
+    from services.resume_pipeline import process_resume_file
+    from services.uploads import save_resume_analysis
+
+    processed = process_resume_file('resume.pdf', job_description, text_content=text)
+    content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return save_resume_analysis(
+        processed, user.id if user else None, f'{content_hash}.pdf', 'resume.pdf', 'pdf', job_description,
+        content_hash=content_hash
+    )
+
+def make_pdf(lines):
+    """A PDF document with one line of text per entry of ``lines``, as bytes."""
+    from reportlab.pdfgen import canvas
+
+    output = io.BytesIO()
+    pdf = canvas.Canvas(output)
+    for number, line in enumerate(lines):
+        pdf.drawString(72, 720 - 14 * number, line)
+    pdf.save()
+    return output.getvalue()
+
+def upload_resume(client, pdf, job_description=''):
+    """Upload a resume through the form; returns the id of the analysis it redirects to."""
+    response = client.post('/upload-resume', content_type='multipart/form-data', data={
+        'resume_file': (io.BytesIO(pdf), 'resume.pdf'),
+        'job_description': job_description,
+    })
+    assert response.status_code == 302, response.get_data(as_text=True)
+    path = urlsplit(response.headers['Location']).path
+    return int(path.rstrip('/').rsplit('/', 1)[1])
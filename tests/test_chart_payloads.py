@@ -0,0 +1,56 @@
+import io
+import json
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from models import CSVChart
+from services import csv_analyzer
+
+FRAME = pd.DataFrame({
+    'score': [3.5, 7.25, np.inf, 1.0, 9.5, -np.inf, 4.0, 6.5],
+    'level': ['junior', 'senior', 'middle', 'senior', 'junior', 'senior', 'lead', 'middle'],
+})
+
+def upload_csv(client, frame, filename='scores.csv'):
+    response = client.post('/upload-csv', content_type='multipart/form-data', data={
+        'csv_file': (io.BytesIO(frame.to_csv(index=False).encode()), filename),
+    })
+    assert response.status_code == 302, response.get_data(as_text=True)
+    return int(urlsplit(response.headers['Location']).path.rstrip('/').rsplit('/', 1)[1])
+
+def fail(*args, **kwargs):
+    raise AssertionError('the stored chart should have been served')
+
+def test_charts_are_stored_with_the_upload(app, tmp_path, monkeypatch):
+    client = app.test_client()
+    upload_id = upload_csv(client, FRAME)
+    charts = {chart.column: json.loads(chart.payload) for chart in CSVChart.query.filter_by(upload_id=upload_id)}
+    assert set(charts) == {'score', 'level'}
+
+    # Infinite values are left out of the histogram instead of failing the upload
+    assert charts['score']['type'] == 'histogram'
+    assert sum(charts['score']['data']) == int(np.isfinite(FRAME['score']).sum())
+
+    # The same charts as computed from the file
+    path = tmp_path / 'scores.csv'
+    FRAME.to_csv(path, index=False)
+    for column, chart in charts.items():
+        assert chart == csv_analyzer.get_column_chart_data(str(path), column)
+
+    monkeypatch.setattr(csv_analyzer, 'get_column_chart_data', fail)
+    for column, chart in charts.items():
+        response = client.get(f'/api/chart-data/{upload_id}/{column}')
+        assert response.status_code == 200
+        assert response.get_json() == chart
+
+def test_other_bin_counts_are_computed(app):
+    client = app.test_client()
+    upload_id = upload_csv(client, FRAME.assign(score=FRAME['score'] + 0.125), 'shifted.csv')
+
+    chart = client.get(f'/api/chart-data/{upload_id}/score?bins=3').get_json()
+    assert len(chart['data']) == 3
+    assert sum(chart['data']) == 6
+    assert client.get(f'/api/chart-data/{upload_id}/score?bins=0').status_code == 400
+    assert client.get(f'/api/chart-data/{upload_id}/missing').status_code == 404
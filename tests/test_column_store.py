@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import column_store
+from services.column_store import has_column_store, load_column, write_column_store
+from services.csv_analyzer import get_column_chart_data
+
+FRAME = pd.DataFrame({
+    'age': [34, 28, 45, 28, 51, 39],
+    'salary': [72000.5, np.nan, 98000.0, 61000.25, np.nan, 83000.0],
+    'city': ['Tbilisi', 'Berlin', None, 'Berlin', 'Tbilisi', 'Berlin'],
+    'team': ['data', 'web', 'data', 'ops', 'web', 'data'],
+})
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(column_store, '_store_root', None)
+    column_store.configure_column_store(str(tmp_path / 'columns'))
+    return tmp_path
+
+def test_columns_round_trip(store):
+    assert write_column_store(FRAME, 'upload')
+    assert has_column_store('upload')
+
+    age = load_column('upload', 'age')
+    assert age.is_numeric
+    assert isinstance(age.values, np.memmap)
+    np.testing.assert_array_equal(age.values, FRAME['age'].to_numpy())
+
+    salary = load_column('upload', 'salary')
+    np.testing.assert_array_equal(salary.values, FRAME['salary'].to_numpy())
+    np.testing.assert_array_equal(salary.non_null_values(), FRAME['salary'].dropna().to_numpy())
+
+    for name in ('city', 'team'):
+        stored = load_column('upload', name)
+        assert not stored.is_numeric
+        decoded = [stored.categories[code] if code >= 0 else None for code in stored.values]
+        assert decoded == FRAME[name].tolist()
+        pd.testing.assert_series_equal(stored.value_counts(), FRAME[name].value_counts(), check_names=False)
+
+    with pytest.raises(KeyError):
+        load_column('upload', 'missing')
+    assert load_column('other', 'age') is None
+
+def test_chart_data_matches_csv(store):
+    csv_path = store / 'upload.csv'
+    FRAME.to_csv(csv_path, index=False)
+
+    for column in FRAME.columns:
+        from_csv = get_column_chart_data(str(csv_path), column)
+        # The store is built from the file on first use
+        from_store = get_column_chart_data(str(csv_path), column, store_key='chart-upload')
+        assert from_store == from_csv
+    assert has_column_store('chart-upload')
+    assert get_column_chart_data(str(csv_path), 'missing', store_key='chart-upload') == {'error': 'Column not found'}
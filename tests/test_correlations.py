@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from services import correlations
+from services.correlations import compute_correlations, upload_correlations
+
+def make_frame(rows=200, missing=0.0, seed=1):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=rows)
+    frame = pd.DataFrame({
+        'a': base,
+        'b': 2 * base + rng.normal(scale=0.5, size=rows),
+        'c': np.exp(base) + rng.normal(scale=0.1, size=rows),
+        'd': rng.normal(size=rows),
+        'e': -base + rng.normal(scale=2.0, size=rows),
+    })
+    if missing:
+        frame = frame.mask(rng.random(frame.shape) < missing)
+    return frame
+
+def as_block(frame):
+    return np.asfortranarray(frame.to_numpy(dtype=np.float64))
+
+def test_matrices_match_pandas():
+    frame = make_frame()
+    result = compute_correlations(as_block(frame), list(frame.columns))
+
+    np.testing.assert_allclose(result['pearson'], frame.corr(method='pearson'), atol=1e-4)
+    np.testing.assert_allclose(result['spearman'], frame.corr(method='spearman'), atol=1e-4)
+    assert result['missing_counts'] == [0] * 5
+    # Pairs are ranked by the stronger coefficient: c is nearly a monotonic function of a
+    assert (result['top_pairs'][0]['x'], result['top_pairs'][0]['y']) == ('a', 'c')
+
+def test_pearson_with_missing_values_matches_pandas():
+    frame = make_frame(missing=0.2)
+    result = compute_correlations(as_block(frame), list(frame.columns))
+
+    np.testing.assert_allclose(result['pearson'], frame.corr(method='pearson', min_periods=3), atol=1e-4)
+    assert result['missing_counts'] == frame.isna().sum().tolist()
+    absent = frame.isna().to_numpy(dtype=int)
+    assert result['missing_together'] == (absent.T @ absent).tolist()
+
+def test_wide_tables_get_the_same_top_pairs(monkeypatch):
+    frame = make_frame(missing=0.1)
+    full = compute_correlations(as_block(frame), list(frame.columns))
+
+    monkeypatch.setitem(correlations._settings, 'max_columns', 2)
+    monkeypatch.setitem(correlations._settings, 'top_pairs', 4)
+    monkeypatch.setattr(correlations, 'PAIR_BLOCK_CELLS', 2 * frame.shape[1])
+    wide = compute_correlations(as_block(frame), list(frame.columns))
+
+    assert wide['pearson'] is None
+    assert wide['top_pairs'] == full['top_pairs'][:4]
+
+def test_upload_correlations_are_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(correlations, '_settings', dict(correlations._settings, cache_folder=str(tmp_path / 'cache')))
+    correlations._memory_cache.clear()
+    frame = make_frame()
+    csv_path = tmp_path / 'upload.csv'
+    frame.to_csv(csv_path, index=False)
+
+    result = upload_correlations(str(csv_path), 'correlated', list(frame.columns), len(frame))
+    np.testing.assert_allclose(result['pearson'], frame.corr(), atol=1e-4)
+    assert not result['sampled']
+
+    # Served from the disk cache without reading the file again
+    correlations._memory_cache.clear()
+    csv_path.unlink()
+    assert upload_correlations(str(csv_path), 'correlated', list(frame.columns), len(frame)) == result
@@ -0,0 +1,43 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from conftest import make_pdf
+
+def make_csv(rows):
+    values = np.random.default_rng(0).integers(0, 1000, rows)
+    return pd.DataFrame({'value': values, 'group': values % 7}).to_csv(index=False).encode()
+
+def post_file(client, url, field, content, filename):
+    return client.post(url, content_type='multipart/form-data',
+                       data={field: (io.BytesIO(content), filename)})
+
+def test_csv_uploads_have_their_own_size_limit(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 16 * 1024)
+    monkeypatch.setitem(app.config, 'CSV_MAX_CONTENT_LENGTH', 1024 * 1024)
+    client = app.test_client()
+    content = make_csv(20000)
+    assert 16 * 1024 < len(content) < 1024 * 1024
+
+    response = post_file(client, '/upload-csv', 'csv_file', content, 'values.csv')
+    assert response.status_code == 302 and '/csv-results/' in response.headers['Location']
+
+    # Other uploads keep MAX_CONTENT_LENGTH
+    resume = make_pdf(['Python developer'] * 40) + b' ' * 16 * 1024
+    assert post_file(client, '/upload-resume', 'resume_file', resume, 'resume.pdf').status_code != 302
+
+    monkeypatch.setitem(app.config, 'CSV_MAX_CONTENT_LENGTH', 16 * 1024)
+    assert post_file(client, '/upload-csv', 'csv_file', content, 'values.csv').status_code != 302
+
+def test_csvs_below_the_streaming_threshold_get_exact_statistics(app, tmp_path):
+    from services.csv_analyzer import analyze_csv, is_large_csv
+
+    path = tmp_path / 'values.csv'
+    path.write_bytes(make_csv(200000))
+    assert not is_large_csv(str(path))
+
+    stats = analyze_csv(str(path))['stats']['value']
+    values = pd.read_csv(path)['value']
+    assert stats['median'] == values.median()
+    assert stats['q25'] == values.quantile(0.25)
@@ -0,0 +1,44 @@
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.shared import Inches
+
+from services.parser import stream_docx_text
+
+def make_docx(path):
+    document = Document()
+    document.add_paragraph('Intro')
+    skills = document.add_paragraph('Skills')
+    skills.paragraph_format.tab_stops.add_tab_stop(Inches(2))
+    skills.paragraph_format.tab_stops.add_tab_stop(Inches(4))
+    skills.add_run('\tPython\tSQL')
+    experience = document.add_paragraph()
+    experience.paragraph_format.tab_stops.add_tab_stop(Inches(3))
+    run = experience.add_run('Acme Corp')
+    run.add_break(WD_BREAK.LINE)
+    experience.add_run('Senior developer\t2019-2024')
+    document.add_paragraph('')
+    document.add_paragraph('References on request')
+    document.save(str(path))
+    return document
+
+def test_matches_python_docx_with_tab_stops(tmp_path):
+    path = tmp_path / 'resume.docx'
+    make_docx(path)
+    expected = '\n'.join(paragraph.text for paragraph in Document(str(path)).paragraphs).strip()
+    assert stream_docx_text(str(path)) == expected
+    assert stream_docx_text(str(path)).startswith('Intro\nSkills\tPython\tSQL\n')
+
+def test_reads_tables_headers_and_footers(tmp_path):
+    path = tmp_path / 'resume.docx'
+    document = make_docx(path)
+    document.sections[0].header.paragraphs[0].text = 'Jane Doe'
+    document.sections[0].footer.paragraphs[0].text = 'Page footer'
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = 'Kubernetes'
+    table.cell(0, 1).text = 'Docker'
+    document.save(str(path))
+
+    lines = stream_docx_text(str(path)).split('\n')
+    assert lines[0] == 'Jane Doe'
+    assert lines[-1] == 'Page footer'
+    assert 'Kubernetes' in lines and 'Docker' in lines
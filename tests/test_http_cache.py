@@ -0,0 +1,67 @@
+from urllib.parse import parse_qs, urlsplit
+
+from conftest import login, make_pdf, upload_resume
+from http_cache import IMMUTABLE_MAX_AGE, result_version, versioned_url_for
+
+RESUME = make_pdf(['Sam Roe', 'Data engineer: Python, Spark, Airflow and SQL'])
+
+def test_result_page_revalidates_with_etag(app, make_user):
+    client = login(app, make_user())
+    analysis_id = upload_resume(client, RESUME)
+    url = f'/resume-results/{analysis_id}'
+    client.get(url)  # shows the upload's one-off messages
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert 'Cookie' in response.vary
+    etag = response.headers['ETag']
+
+    revalidated = client.get(url, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['ETag'] == etag
+    assert not revalidated.data
+
+    # The page shows who is signed in: another user's ETag differs
+    other = login(app, make_user())
+    assert other.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+def test_versioned_urls_are_immutable(app, make_user):
+    client = login(app, make_user())
+    analysis_id = upload_resume(client, RESUME)
+    with app.test_request_context():
+        page_url = versioned_url_for('main.resume_results', analysis_id=analysis_id)
+        report_url = versioned_url_for('main.download_report', analysis_id=analysis_id)
+    client.get(page_url)
+
+    page = client.get(page_url)
+    assert page.headers['Cache-Control'] == f'private, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    assert 'Cookie' in page.vary
+
+    report = client.get(report_url)
+    assert report.status_code == 200
+    assert report.headers['Cache-Control'] == f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    assert client.get(report_url, headers={'If-None-Match': report.headers['ETag']}).status_code == 304
+
+def test_version_bump_changes_urls(app, make_user, monkeypatch):
+    client = login(app, make_user())
+    analysis_id = upload_resume(client, RESUME)
+    with app.test_request_context():
+        old_url = versioned_url_for('main.resume_results', analysis_id=analysis_id)
+    client.get(old_url)
+    old_etag = client.get(old_url).headers['ETag']
+
+    monkeypatch.setitem(app.config, 'RESULT_CACHE_VERSION', 'bumped')
+    with app.test_request_context():
+        new_url = versioned_url_for('main.resume_results', analysis_id=analysis_id)
+        assert parse_qs(urlsplit(new_url).query)['v'] == [result_version('main.resume_results')]
+    assert new_url != old_url
+
+    # A stale link is no longer immutable, and its cached copy fails revalidation
+    stale = client.get(old_url, headers={'If-None-Match': old_etag})
+    assert stale.status_code == 200
+    assert stale.headers['Cache-Control'] == 'private, no-cache'
+
+    # Reports carry the report template version as well
+    with app.test_request_context():
+        assert result_version('main.download_report') != result_version('main.resume_results')
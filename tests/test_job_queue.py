@@ -0,0 +1,60 @@
+import io
+from datetime import datetime, timedelta
+
+from app import db
+from conftest import login, make_pdf
+from models import AnalysisJob
+from services.job_queue import MAX_JOB_ATTEMPTS, claim_next_job, enqueue_job, run_job
+
+RESUME = make_pdf(['Ana Lomidze', 'Android developer: Kotlin, Jetpack Compose and Firebase'])
+
+def run_queued_jobs(app):
+    while (job_id := claim_next_job()) is not None:
+        run_job(job_id, app.config['UPLOAD_FOLDER'])
+
+def test_async_upload_runs_as_a_job(app, make_user):
+    client = login(app, make_user())
+    response = client.post('/upload-resume?async=1', content_type='multipart/form-data', data={
+        'resume_file': (io.BytesIO(RESUME), 'resume.pdf'),
+        'job_description': 'Kotlin developer',
+    })
+    assert response.status_code == 202
+    job = response.get_json()
+    assert (job['status'], job['progress']) == ('queued', 0)
+
+    run_queued_jobs(app)
+    status = client.get(job['status_url']).get_json()
+    assert (status['status'], status['stage'], status['progress']) == ('done', 'saved', 100)
+    assert status['result_id']
+    assert f"/resume-results/{status['result_id']}" in status['result_url']
+    assert client.get(status['result_url']).status_code == 200
+
+def test_failed_job_reports_its_error(app):
+    client = app.test_client()
+    response = client.post('/upload-csv', content_type='multipart/form-data',
+                           headers={'Accept': 'application/json'},
+                           data={'csv_file': (io.BytesIO(b'\x00\x01\x02'), 'broken.csv')})
+    assert response.status_code == 202
+
+    run_queued_jobs(app)
+    status = client.get(response.get_json()['status_url']).get_json()
+    assert status['status'] == 'failed'
+    assert 'valid CSV' in status['error']
+
+def test_expired_leases_are_claimed_again(app):
+    job = enqueue_job('csv', 'missing.csv', 'missing.csv')
+    assert claim_next_job(lease_seconds=60) == job.id
+    assert claim_next_job(lease_seconds=60) is None
+
+    # The worker died: its lease runs out and another worker takes the job
+    AnalysisJob.query.filter_by(id=job.id).update({'lease_expires_at': datetime.utcnow() - timedelta(seconds=1)})
+    db.session.commit()
+    assert claim_next_job(lease_seconds=60) == job.id
+
+    # A job that kept killing its workers is given up
+    AnalysisJob.query.filter_by(id=job.id).update({'lease_expires_at': datetime.utcnow() - timedelta(seconds=1),
+                                                   'attempts': MAX_JOB_ATTEMPTS})
+    db.session.commit()
+    assert claim_next_job(lease_seconds=60) is None
+    db.session.expire_all()
+    assert db.session.get(AnalysisJob, job.id).status == 'failed'
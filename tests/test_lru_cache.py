@@ -0,0 +1,46 @@
+from services import ats_engine
+from services.ats_engine import extract_job_keywords, get_job_keyword_cache_stats
+from services.lru_cache import LRUCache
+
+JOB = 'Backend developer with Python, FastAPI and Redis; mentoring and communication skills'
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # b is now the least recently used
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 3, 'misses': 0, 'evictions': 1}
+
+    cache.resize(1)
+    assert list(cache._data) == ['c']
+
+def test_zero_size_disables_caching():
+    cache = LRUCache(maxsize=0)
+    calls = []
+    for _ in range(2):
+        assert cache.get_or_compute('key', lambda: calls.append(1) or 'value') == 'value'
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+def test_job_keywords_are_computed_once(monkeypatch):
+    monkeypatch.setattr(ats_engine, '_job_keyword_cache', LRUCache(maxsize=4))
+    calls = []
+    extract = ats_engine._extract_job_keywords
+    monkeypatch.setattr(ats_engine, '_extract_job_keywords', lambda *args: calls.append(args) or extract(*args))
+
+    first = extract_job_keywords(JOB)
+    assert extract_job_keywords(JOB) == first
+    assert len(calls) == 1
+    assert {'python', 'redis'} <= set(first)
+
+    # Callers may modify the list they get without changing the cached keywords
+    first.clear()
+    assert extract_job_keywords(JOB) == extract(*calls[0])
+    # Another language is another entry
+    extract_job_keywords(JOB, 'ru')
+    assert len(calls) == 2
+    assert get_job_keyword_cache_stats()['hits'] == 2
@@ -0,0 +1,77 @@
+import os
+import time
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from services import parser
+from services.parser import configure_pdf_extraction, extract_pdf, splits_pdf_extraction
+from services.worker_pool import configure_worker_pool
+
+LOG_VARIABLE = 'PARSER_TEST_LOG'
+
+def make_pdf(path, pages):
+    pdf = canvas.Canvas(str(path))
+    for number in range(pages):
+        pdf.drawString(72, 720, f"Page {number} python developer")
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+def page_numbers(text):
+    return [line.split()[1] for line in text.splitlines() if line]
+
+def recorded_pages(file_path, start, stop, max_chars, time_budget):
+    """Extract a page range in a pool worker, logging which process ran it and when."""
+    started = time.time()
+    if start == int(os.environ.get('PARSER_TEST_HANG_AT', -1)):
+        time.sleep(600)
+    time.sleep(0.5)
+    result = parser._extract_pdf_pages(file_path, start, stop, max_chars, time_budget)
+    with open(os.environ[LOG_VARIABLE], 'a') as log:
+        log.write(f"{os.getpid()} {start} {started} {time.time()}\n")
+    return result
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    # Workers are spawned on first use and inherit the environment
+    monkeypatch.setenv(LOG_VARIABLE, str(tmp_path / 'ranges.log'))
+    monkeypatch.setattr(parser, '_extract_pdf_pages', recorded_pages)
+    settings = dict(parser._pdf_settings)
+    configure_pdf_extraction(parallel_min_pages=8, pages_per_task=4, time_budget=30)
+    configure_worker_pool(2, task_timeout=30, max_pending=2)
+    yield tmp_path / 'ranges.log'
+    configure_worker_pool(0)
+    parser._pdf_settings.update(settings)
+
+def test_page_ranges_run_in_parallel_workers(tmp_path, pool):
+    path = make_pdf(tmp_path / 'long.pdf', 16)
+    assert splits_pdf_extraction(path)
+
+    result = extract_pdf(path)
+    assert not result.truncated
+    assert page_numbers(result.text) == [str(number) for number in range(16)]
+
+    ranges = [line.split() for line in pool.read_text().splitlines()]
+    assert sorted(int(start) for _, start, _, _ in ranges) == [0, 4, 8, 12]
+    pids = {int(pid) for pid, _, _, _ in ranges}
+    assert len(pids) == 2 and os.getpid() not in pids
+    # Some ranges were being extracted at the same time
+    spans = sorted((float(started), float(finished)) for _, _, started, finished in ranges)
+    assert any(later[0] < earlier[1] for earlier, later in zip(spans, spans[1:]))
+
+def test_hanging_page_is_cut_off_at_the_budget(tmp_path, pool, monkeypatch):
+    monkeypatch.setenv('PARSER_TEST_HANG_AT', '4')
+    path = make_pdf(tmp_path / 'long.pdf', 16)
+    configure_pdf_extraction(time_budget=8)
+
+    started = time.monotonic()
+    result = extract_pdf(path)
+    assert time.monotonic() - started < 12
+    assert result.truncated
+    assert page_numbers(result.text) == ['0', '1', '2', '3']
+
+def test_short_or_unpooled_pdfs_are_not_split(tmp_path, pool):
+    assert not splits_pdf_extraction(make_pdf(tmp_path / 'short.pdf', 4))
+    configure_worker_pool(0)
+    assert not splits_pdf_extraction(make_pdf(tmp_path / 'long.pdf', 16))
@@ -0,0 +1,43 @@
+import io
+import zipfile
+
+from conftest import login, save_resume
+
+def export(client, **payload):
+    response = client.post('/api/reports/export', json=payload)
+    if response.status_code != 200:
+        return response, None
+    return response, zipfile.ZipFile(io.BytesIO(response.get_data()))
+
+def test_export_zips_the_requested_reports(app, make_user):
+    user = make_user()
+    analyses = [save_resume(user, f'Go developer {number}: Kubernetes, gRPC and PostgreSQL') for number in range(3)]
+    client = login(app, user)
+
+    response, archive = export(client, ids=[analysis.id for analysis in analyses[:2]])
+    assert response.mimetype == 'application/zip'
+    assert archive.testzip() is None
+    names = sorted(archive.namelist())
+    assert names == [f'resume_analysis_report_{analysis.id}.pdf' for analysis in analyses[:2]]
+    assert all(archive.read(name).startswith(b'%PDF') for name in names)
+
+    # A date range exports every analysis of the user
+    day = analyses[0].analysis_time.strftime('%Y-%m-%d')
+    _, archive = export(client, since=day, until=day)
+    assert len(archive.namelist()) == 3
+
+def test_export_includes_only_own_reports(app, make_user):
+    owner, other = make_user(), make_user()
+    own = save_resume(owner, 'Rust developer: Tokio, WebAssembly and Linux')
+    foreign = save_resume(other, 'Rust engineer: Tokio, embedded Linux')
+
+    _, archive = export(login(app, owner), ids=[own.id, foreign.id])
+    assert archive.namelist() == [f'resume_analysis_report_{own.id}.pdf']
+
+    response, _ = export(login(app, owner), ids=[foreign.id])
+    assert response.status_code == 404
+
+def test_export_requires_a_filter_and_sign_in(app, make_user):
+    response, _ = export(login(app, make_user()))
+    assert response.status_code == 400
+    assert app.test_client().post('/api/reports/export', json={'ids': [1]}).status_code in (302, 401)
@@ -0,0 +1,35 @@
+import os
+import time
+
+import pytest
+
+from conftest import save_resume
+from services import report_generator
+from services.report_generator import configure_reports, find_report, schedule_report
+from services.worker_pool import configure_worker_pool, submit_task
+
+@pytest.fixture
+def reports(app, tmp_path):
+    configure_reports(str(tmp_path))
+    configure_worker_pool(1, task_timeout=60, max_pending=0, background_slots=1,
+                          service_settings={'REPORTS_FOLDER': str(tmp_path)})
+    yield
+    configure_worker_pool(0)
+    configure_reports(app.config['REPORTS_FOLDER'])
+
+def test_reports_queue_for_their_own_slots(reports, make_user):
+    user = make_user()
+    # Saving an analysis schedules its report
+    analyses = [save_resume(user, f'Python developer number {number} with SQL and Docker') for number in range(4)]
+    schedule_report(analyses[0])
+
+    # A burst of reports leaves the upload slot free
+    future = submit_task(os.getpid)
+    assert future is not None
+    future.result(timeout=60)
+
+    deadline = time.monotonic() + 60
+    while not all(find_report(analysis.id) for analysis in analyses) and time.monotonic() < deadline:
+        time.sleep(0.2)
+    assert all(find_report(analysis.id) for analysis in analyses)
+    assert not report_generator._queued
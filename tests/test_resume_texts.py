@@ -0,0 +1,47 @@
+import zlib
+
+from sqlalchemy import inspect, text
+
+from app import db
+from models import Resume, ResumeText
+from services.uploads import find_extracted_resume, migrate_resume_texts
+
+TEXT = 'Curriculum vitae\nSenior QA engineer: Selenium, Cypress, Python\n' * 40
+
+def add_resume(user, content_hash, **columns):
+    resume = Resume(user_id=user.id, filename=f'{content_hash}.pdf', original_filename='cv.pdf',
+                    file_type='pdf', content_hash=content_hash, **columns)
+    db.session.add(resume)
+    db.session.commit()
+    return resume
+
+def test_text_is_stored_compressed_and_loaded_on_read(app, make_user):
+    resume = add_resume(make_user(), 'a1' * 32, text_content=TEXT)
+    resume_id = resume.id
+    db.session.expire_all()
+
+    raw = db.session.execute(text('SELECT text_content FROM resumes WHERE id = :id'), {'id': resume_id}).scalar()
+    assert raw is None
+    stored = db.session.get(ResumeText, resume_id)
+    assert len(stored.compressed) < len(TEXT) / 4
+    assert zlib.decompress(stored.compressed).decode('utf-8') == TEXT
+
+    db.session.expire_all()
+    listed = Resume.query.filter_by(id=resume_id).one()
+    unloaded = inspect(listed).unloaded
+    assert {'stored_text', 'legacy_text_content'} <= unloaded
+    assert listed.text_content == TEXT
+    assert find_extracted_resume('a1' * 32).id == resume_id
+
+def test_legacy_text_is_migrated(app, make_user):
+    user = make_user()
+    legacy = [add_resume(user, f'{number:02d}' * 32, legacy_text_content=f'{TEXT}{number}') for number in range(3)]
+    assert all(resume.text_content.endswith(str(number)) for number, resume in enumerate(legacy))
+
+    assert migrate_resume_texts(batch_size=2) >= 3
+    db.session.expire_all()
+    for number, resume in enumerate(legacy):
+        assert resume.legacy_text_content is None
+        assert resume.stored_text is not None
+        assert resume.text_content == f'{TEXT}{number}'
+    assert migrate_resume_texts() == 0
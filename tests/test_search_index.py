@@ -0,0 +1,30 @@
+from conftest import login, save_resume
+from services.search_index import search_resumes
+
+JOB = 'Senior Python developer with Django, PostgreSQL and Kubernetes'
+
+def test_search_ranks_better_matches_first(app, make_user):
+    user = make_user()
+    weak = save_resume(user, 'Frontend developer: JavaScript, React and CSS, some Python scripting')
+    strong = save_resume(user, 'Python developer building Django services on PostgreSQL, deployed with Kubernetes')
+
+    results = search_resumes(JOB, 'en', user_id=user.id)
+    assert [result['resume_id'] for result in results] == [strong.resume_id, weak.resume_id]
+    assert results[0]['score'] > results[1]['score']
+    assert {'python', 'django', 'kubernetes'} <= set(results[0]['matched_terms'])
+
+def test_users_search_only_their_own_resumes(app, make_user):
+    owner, other = make_user(), make_user()
+    own = save_resume(owner, 'Python and Django developer running PostgreSQL on Kubernetes')
+    save_resume(other, 'Python and Django engineer, PostgreSQL and Kubernetes in production')
+
+    response = login(app, owner).post('/api/search', json={'job_description': JOB})
+    assert response.status_code == 200
+    assert [result['resume_id'] for result in response.get_json()['results']] == [own.resume_id]
+
+    response = login(app, make_user()).post('/api/search', json={'job_description': JOB})
+    assert response.get_json()['results'] == []
+
+def test_search_requires_sign_in(app):
+    response = app.test_client().post('/api/search', json={'job_description': JOB})
+    assert response.status_code in (302, 401)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sketches import DistinctCounter, FrequentItems, KLLSketch, RunningMoments
+
+QS = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+def batches(values, size=10000):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def test_moments_match_numpy():
+    values = np.random.default_rng(0).normal(50, 10, 100000)
+    moments = RunningMoments()
+    for batch in batches(values):
+        moments.update(batch)
+    assert moments.mean == pytest.approx(values.mean())
+    assert moments.std() == pytest.approx(values.std(ddof=1))
+
+def test_kll_exact_while_small():
+    values = np.random.default_rng(1).normal(size=200)
+    sketch = KLLSketch()
+    sketch.update(values)
+    assert sketch.quantiles(QS) == pytest.approx(np.quantile(values, QS))
+
+def test_kll_rank_error():
+    values = np.random.default_rng(2).lognormal(size=200000)
+    sketch = KLLSketch()
+    for batch in batches(values):
+        sketch.update(batch)
+    ordered = np.sort(values)
+    for q, estimate in zip(QS, sketch.quantiles(QS)):
+        rank = np.searchsorted(ordered, estimate) / len(ordered)
+        # About 1.7 / k with high probability
+        assert abs(rank - q) < 0.02
+
+def test_kll_discrete_quantiles_are_column_values():
+    values = (np.random.default_rng(3).random(200000) < 0.53).astype(np.float64)
+    sketch = KLLSketch()
+    for batch in batches(values):
+        sketch.update(batch)
+    assert sketch.quantiles((0.25, 0.5, 0.75), interpolate=False) == [0.0, 1.0, 1.0]
+
+def test_distinct_exact_while_small():
+    counter = DistinctCounter()
+    for batch in batches(np.arange(5000) % 1234, 1000):
+        counter.update(batch)
+    assert counter.count() == 1234
+
+@pytest.mark.parametrize('distinct', [50000, 500000])
+def test_distinct_hyperloglog_error(distinct):
+    values = np.random.default_rng(4).permutation(np.arange(distinct)).astype(str)
+    counter = DistinctCounter()
+    for batch in batches(values, 50000):
+        counter.update(batch)
+    # Standard error 1.04 / sqrt(2 ** 14), under 1%
+    assert abs(counter.count() - distinct) / distinct < 0.03
+
+def test_frequent_items_exact_under_capacity():
+    values = pd.Series(['a'] * 5 + ['b'] * 3 + ['c'] * 3 + ['d'])
+    items = FrequentItems(capacity=10)
+    for batch in batches(values, 4):
+        items.update(batch.value_counts(sort=False))
+    # Ties keep the order of first appearance
+    assert items.most_common(3) == [('a', 5), ('b', 3), ('c', 3)]
+
+def test_frequent_items_error_bound():
+    capacity = 100
+    values = pd.Series(np.random.default_rng(5).zipf(1.5, 200000) % 10000)
+    items = FrequentItems(capacity=capacity)
+    for batch in batches(values):
+        items.update(batch.value_counts(sort=False))
+    exact = values.value_counts()
+    bound = len(values) / (capacity + 1)
+    top = items.most_common(10)
+    assert [value for value, _ in top[:3]] == list(exact.index[:3])
+    for value, count in top:
+        assert exact[value] - bound <= count <= exact[value]
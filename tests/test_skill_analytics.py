@@ -0,0 +1,29 @@
+from conftest import login, save_resume
+from services.skill_analytics import analyses_with_skill, top_keywords, top_skills
+
+RESUME = 'Python developer with Django, Docker and team leadership'
+OTHER_RESUME = 'Java engineer using Spring and Kubernetes'
+
+def test_user_sees_only_own_analytics(app, make_user):
+    owner, other = make_user(), make_user()
+    analysis = save_resume(owner, RESUME, 'Python, Django and AWS')
+    save_resume(other, OTHER_RESUME, 'Java and Spring')
+
+    skills = {row['skill'] for row in top_skills(user_id=owner.id)}
+    assert {'Python', 'Django', 'Docker'} <= skills
+    assert not {'Java', 'Spring', 'Kubernetes'} & skills
+    assert [row['skill'] for row in top_keywords('missing', user_id=owner.id)] == ['Aws']
+    assert [row['analysis_id'] for row in analyses_with_skill('python', user_id=owner.id)] == [analysis.id]
+    assert analyses_with_skill('python', user_id=other.id) == []
+
+def test_second_user_cannot_see_first_users_data(app, make_user):
+    owner, other = make_user(), make_user()
+    save_resume(owner, RESUME)
+
+    client = login(app, other)
+    assert client.get('/api/analytics/skills/python/analyses').get_json()['analyses'] == []
+    assert 'Python' not in {row['skill'] for row in client.get('/api/analytics/skills').get_json()['skills']}
+
+    client = login(app, owner)
+    assert client.get('/api/analytics/skills/python/analyses').get_json()['count'] == 1
+    assert 'Python' in {row['skill'] for row in client.get('/api/analytics/skills').get_json()['skills']}
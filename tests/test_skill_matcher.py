@@ -0,0 +1,47 @@
+import re
+
+import pytest
+
+from services.skill_lexicon import get_lexicon
+from services.skill_matcher import SkillMatcher
+from services.text_normalizer import normalize_text
+
+TEXTS = [
+    "Senior Python developer: Django, Flask, PostgreSQL and Docker on AWS. Team leadership.",
+    "Career in JavaScript and TypeScript, not Java. Some R and C++ / C# work, CI/CD with Jenkins.",
+    "Built .NET services, node.js tooling and scikit-learn models; machine learning, problem solving.",
+    "Опыт разработки на Python и Go, лидерство и командная работа.",
+    "",
+]
+
+def legacy_find_skills(skills, text):
+    """The regex scan the automaton replaced: one word-boundary search per lexicon entry."""
+    found = {}
+    for kind, entries in skills.items():
+        for skill in entries:
+            pattern = re.escape(skill)
+            if re.match(r'\w', skill):
+                pattern = r'(?<!\w)' + pattern
+            if re.search(r'\w$', skill):
+                pattern += r'(?!\w)'
+            if re.search(pattern, text) and skill not in found.get(kind, []):
+                found.setdefault(kind, []).append(skill)
+    return found
+
+@pytest.mark.parametrize('language', ['en', 'ru', 'ka'])
+@pytest.mark.parametrize('text', TEXTS)
+def test_matches_legacy_regex(language, text):
+    lexicon = get_lexicon()
+    skills = {'technical': lexicon.technical(language), 'soft': lexicon.soft(language)}
+    text = normalize_text(text)
+    assert lexicon.matcher(language).find_skills(text) == legacy_find_skills(skills, text)
+
+def test_respects_word_boundaries():
+    matcher = SkillMatcher({'technical': ['r', 'java', 'c++', '.net']})
+    assert matcher.find_skills('career in javascript') == {}
+    assert matcher.find_skills('r, java, c++ and .net') == {'technical': ['r', 'java', 'c++', '.net']}
+
+def test_reports_positions():
+    text = 'python and sql'
+    matches = SkillMatcher({'technical': ['python', 'sql']}).find_all(text)
+    assert [(match.skill, text[match.start:match.end]) for match in matches] == [('python', 'python'), ('sql', 'sql')]
@@ -0,0 +1,47 @@
+import os
+import time
+
+from services.text_cache import TextCache, hash_file
+
+TEXT = 'Resume of Nino Beridze\nPython, SQL and data pipelines\nქართული და русский текст\n' * 50
+
+def test_text_round_trips_compressed(tmp_path):
+    cache = TextCache(str(tmp_path))
+    assert cache.get('ab' * 32, '3') is None
+
+    cache.put('ab' * 32, '3', TEXT)
+    assert cache.get('ab' * 32, '3') == TEXT
+    # Entries depend on the parser version
+    assert cache.get('ab' * 32, '2') is None
+
+    path = cache.path_for('ab' * 32, '3')
+    assert os.path.dirname(path) == os.path.join(str(tmp_path), 'ab')
+    assert os.path.getsize(path) < len(TEXT.encode('utf-8')) / 4
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def test_least_recently_read_entries_are_evicted(tmp_path):
+    cache = TextCache(str(tmp_path), max_bytes=10 ** 9)
+    keys = [f'{number:02d}' * 32 for number in range(4)]
+    for number, key in enumerate(keys):
+        cache.put(key, '3', f'{TEXT}{number}')
+        # Distinct read times, oldest first
+        os.utime(cache.path_for(key, '3'), (time.time() - 100 + number, time.time() - 100 + number))
+    cache.get(keys[0], '3')  # now the most recently read
+
+    entry_size = os.path.getsize(cache.path_for(keys[1], '3'))
+    cache.max_bytes = int(entry_size * 4.8)
+    cache.put(keys[1], '3', f'{TEXT}1')  # an overwrite does not grow the store
+    assert cache.evictions == 0
+
+    cache.put('ff' * 32, '3', f'{TEXT}new')
+    assert cache.get(keys[2], '3') is None
+    assert all(cache.get(key, '3') is not None for key in (keys[0], keys[1], keys[3], 'ff' * 32))
+    assert cache.stats()['size'] <= cache.max_bytes
+
+def test_hash_file_matches_content(tmp_path):
+    path = tmp_path / 'resume.pdf'
+    path.write_bytes(b'%PDF-1.4 ' * 300000)
+    first = hash_file(str(path))
+    assert len(first) == 64
+    path.write_bytes(b'%PDF-1.4 ' * 300000 + b'!')
+    assert hash_file(str(path)) != first
@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+import routes
+from conftest import login, make_pdf, upload_resume
+from services import resume_pipeline
+
+RESUME = make_pdf(['Jane Doe', 'Python developer: Django, PostgreSQL, Docker and AWS', 'Team leadership'])
+JOB = 'Python developer with Django and Kubernetes'
+
+def fail(*args, **kwargs):
+    raise AssertionError('the upload should have been served from earlier results')
+
+def test_signed_in_reupload_shows_existing_analysis(app, make_user, monkeypatch):
+    client = login(app, make_user())
+    analysis_id = upload_resume(client, RESUME, JOB)
+
+    monkeypatch.setattr(routes, 'process_resume_upload', fail)
+    assert upload_resume(client, RESUME, JOB) == analysis_id
+
+def test_identical_content_reuses_extracted_text(app, make_user, monkeypatch):
+    first_id = upload_resume(login(app, make_user()), RESUME, JOB)
+
+    # Another user's upload of the same file is analyzed without extracting it again
+    monkeypatch.setattr(resume_pipeline, 'extract_text', fail)
+    second_id = upload_resume(login(app, make_user()), RESUME, JOB)
+    assert second_id != first_id
+
+def test_anonymous_uploads_are_not_shared(app):
+    first_id = upload_resume(app.test_client(), RESUME, JOB)
+    second_id = upload_resume(app.test_client(), RESUME, JOB)
+    assert second_id != first_id
+
+    from app import db
+    from models import Analysis
+    assert db.session.get(Analysis, first_id).resume_id != db.session.get(Analysis, second_id).resume_id
+
+@pytest.mark.parametrize('signed_in', [True, False])
+def test_csv_reupload(app, make_user, signed_in):
+    client = login(app, make_user()) if signed_in else app.test_client()
+    content = b'age,city\n31,Tbilisi\n45,Batumi\n27,Tbilisi\n'
+
+    def upload():
+        response = client.post('/upload-csv', content_type='multipart/form-data',
+                               data={'csv_file': (io.BytesIO(content), 'people.csv')})
+        assert response.status_code == 302
+        return response.headers['Location']
+
+    first, second = upload(), upload()
+    assert (first == second) == signed_in
@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.user_history import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    upload_time = datetime(2024, 3, 1, 12, 30, 15, 250000)
+    assert decode_cursor(encode_cursor(upload_time, 42)) == (upload_time, 42)
+
+@pytest.mark.parametrize('value', [None, '', 'garbage', '2024-03-01T12:30:15_x', 'not-a-date_7'])
+def test_invalid_cursor_is_first_page(value):
+    assert decode_cursor(value) is None
+
+def test_pages_follow_cursors(app):
+    from app import db
+    from models import Resume, User
+    from services.user_history import resume_history
+
+    user = User(username='history', email='history@example.com', password_hash='-')
+    db.session.add(user)
+    db.session.flush()
+    start = datetime(2024, 1, 1)
+    # Pairs of uploads share a time, so pages must break ties by id
+    for i in range(12):
+        db.session.add(Resume(user_id=user.id, filename=f'{i}.pdf', original_filename=f'{i}.pdf',
+                              file_type='pdf', upload_time=start + timedelta(minutes=i // 2)))
+    db.session.commit()
+
+    expected = [row.id for row in Resume.query.filter_by(user_id=user.id)
+                .order_by(Resume.upload_time.desc(), Resume.id.desc())]
+    seen = []
+    cursor = None
+    while True:
+        rows, next_cursor = resume_history(user.id, before=decode_cursor(cursor), limit=5)
+        seen.extend(row.id for row in rows)
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+    assert seen == expected
@@ -0,0 +1,40 @@
+import os
+import time
+
+import pytest
+
+from services import worker_pool
+from services.worker_pool import TaskTimeoutError, configure_worker_pool, run_task
+
+@pytest.fixture
+def pool():
+    configure_worker_pool(1, task_timeout=5, max_pending=0)
+    yield
+    configure_worker_pool(0)
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+def test_hanging_task_is_killed_and_frees_its_slot(pool):
+    stuck_pid = run_task(os.getpid)
+    assert stuck_pid != os.getpid()
+
+    started = time.monotonic()
+    with pytest.raises(TaskTimeoutError):
+        run_task(time.sleep, 600, timeout=1)
+    assert time.monotonic() - started < 5
+
+    # The only slot is free again and the next task gets a new worker, not the caller
+    pid = run_task(os.getpid)
+    assert pid not in (os.getpid(), stuck_pid)
+
+    deadline = time.monotonic() + 10
+    while is_running(stuck_pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not is_running(stuck_pid)
+    assert worker_pool._slots.acquire(blocking=False)
+    worker_pool._slots.release()